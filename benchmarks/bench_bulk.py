@@ -0,0 +1,74 @@
+import os
+import sys
+import time
+import datetime as dt
+
+# Make the project root importable when run as `python benchmarks/bench_bulk.py`
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from main import Holiday, HolidayList
+
+# make_tuples: build (name, ordinal) holidays, one per day from 2000 on, repeating names every 1000
+#   n: (int) number of holidays
+#   offset: (int, def 0) index of the first holiday, so two sets can overlap by a chosen amount
+#   return: (list(tuple(str, int))) holidays
+def make_tuples(n, offset=0):
+    start = dt.date(2000, 1, 1).toordinal()
+    return [(f'Holiday {i % 1000}', start + i) for i in range(offset, offset + n)]
+
+# timed: run a function and time it
+#   func: (function) function to run
+#   return: (float) seconds taken
+def timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+# bench_bulk: time bulk operations on lists of a given size; the second list overlaps the first by half
+#   n: (int) size of each list
+#   engine: (str) storage engine
+#   return: (dict) operation -> microseconds per holiday
+def bench_bulk(n, engine):
+    rows = make_tuples(n)
+    other_rows = make_tuples(n, offset=n // 2)
+    results = {}
+
+    holidays = HolidayList(engine=engine)
+    results['add'] = timed(lambda: holidays.addHolidays(rows))
+    other = HolidayList(engine=engine)
+    other.addHolidays(other_rows)
+
+    # Each set operation starts from a fresh copy of the first list
+    for how in ('union', 'intersection', 'difference'):
+        copy = HolidayList(engine=engine)
+        copy.addHolidays(rows)
+        results[how] = timed(lambda: copy.merge(other, how))
+    results['remove half'] = timed(lambda: holidays.removeHolidays(rows[::2]))
+    return {name: seconds / n * 1e6 for name, seconds in results.items()}
+
+# bench_single: time adding and then removing half of the holidays one call at a time
+#   n: (int) number of holidays
+#   engine: (str) storage engine
+#   return: (dict) operation -> microseconds per holiday
+def bench_single(n, engine):
+    rows = make_tuples(n)
+    holidays = HolidayList(engine=engine)
+    add = timed(lambda: [holidays.addHoliday(Holiday(name, dt.date.fromordinal(ordinal).isoformat())) for name, ordinal in rows])
+    remove = timed(lambda: [holidays.removeHoliday(name, dt.date.fromordinal(ordinal).isoformat()) for name, ordinal in rows[::2]])
+    return {'add': add / n * 1e6, 'remove half': remove / n * 1e6}
+
+# main: print microseconds per holiday of each bulk operation as the lists grow; flat columns mean linear time
+def main():
+    operations = ('add', 'union', 'intersection', 'difference', 'remove half')
+    for engine in ('objects', 'columnar'):
+        print(f'engine: {engine} (us per holiday)')
+        print(f'{"size":>10} {"path":>8}' + ''.join(f'{name:>14}' for name in operations))
+        for n in (10000, 100000, 300000):
+            results = bench_bulk(n, engine)
+            print(f'{n:>10} {"bulk":>8}' + ''.join(f'{results[name]:>14.2f}' for name in operations))
+            if (n <= 100000):
+                single = bench_single(n, engine)
+                print(f'{n:>10} {"single":>8}' + ''.join(f'{single[name]:>14.2f}' if name in single else f'{"":>14}' for name in operations))
+        print()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import os
+import sys
+import threading
+import time
+import datetime as dt
+
+# Make the project root importable when run as `python benchmarks/bench_concurrency.py`
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from main import HolidayList
+from bench_index import make_rows
+
+# Day the writer puts the first holiday of each pair on; the second goes a week later, in the next ISO week
+PAIR_DAY = dt.date(2001, 6, 4)
+
+# stress: run reader threads against a writer that adds and removes holidays in pairs spanning two weeks
+#   concurrent: (bool) True for lock-free snapshot reads; False for locked reads
+#   readers: (int) number of reader threads
+#   seconds: (float) how long to run
+#   size: (int) number of holidays in the list before the writer starts
+#   return: (tuple(float, float, int)) reads per second, pair writes per second, and number of bad reads
+def stress(concurrent, readers, seconds=2.0, size=20000):
+    holidays = HolidayList(engine='columnar', concurrent=concurrent)
+    holidays._addRows([(name, dt.datetime.strptime(date, '%b %d, %Y').toordinal()) for name, date in make_rows(size)])
+
+    # Holidays each reader should always see in the weeks it reads, whatever the writer is doing
+    monday = PAIR_DAY - dt.timedelta(days=PAIR_DAY.weekday())
+    start_str, end_str = str(monday), str(monday + dt.timedelta(days=14))
+    base = [(holiday.name, holiday.date) for holiday in holidays.filterHolidaysByRange(start_str, end_str)]
+
+    stop = threading.Event()
+    counts = {'reads': 0, 'writes': 0, 'bad': 0}
+    lock = threading.Lock()
+
+    # Writer: each pair is added in one bulk change and removed in another, so readers must see both or neither
+    def writer():
+        first = PAIR_DAY.toordinal()
+        pair = 0
+        while (not stop.is_set()):
+            rows = [(f'Pair {pair}', first), (f'Pair {pair}', first + 7)]
+            holidays._addRows(rows)
+            if (pair >= 10):
+                holidays._removeRows([(f'Pair {pair - 10}', first), (f'Pair {pair - 10}', first + 7)])
+            pair += 1
+        with lock:
+            counts['writes'] += pair
+
+    # Reader: read both weeks at once and check the result is whole and in date order
+    def reader():
+        reads = 0
+        bad = 0
+        while (not stop.is_set()):
+            found = holidays.filterHolidaysByRange(start_str, end_str)
+            pairs = {}
+            rest = []
+            for holiday in found:
+                if (holiday.name.startswith('Pair ')):
+                    pairs[holiday.name] = pairs.get(holiday.name, 0) + 1
+                else:
+                    rest.append((holiday.name, holiday.date))
+            dates = [holiday.date for holiday in found]
+            if (rest != base or any(count != 2 for count in pairs.values()) or dates != sorted(dates)):
+                bad += 1
+            reads += 1
+        with lock:
+            counts['reads'] += reads
+            counts['bad'] += bad
+
+    threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader) for i in range(readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    # The list must end up holding the base holidays plus the last 10 pairs
+    if (holidays.numHolidays() != size + 20 or len(holidays.filterHolidaysByRange(start_str, end_str)) != len(base) + 20):
+        counts['bad'] += 1
+    return counts['reads'] / seconds, counts['writes'] / seconds, counts['bad']
+
+# main: compare locked and lock-free reads under a constant writer; exits with status 1 on any bad read
+def main():
+    print(f'{"mode":>10} {"readers":>10} {"reads/s":>10} {"writes/s":>10} {"bad":>10}')
+    failed = False
+    for concurrent in (False, True):
+        for readers in (1, 4, 8):
+            reads, writes, bad = stress(concurrent, readers)
+            failed = failed or bad > 0
+            print(f'{"snapshot" if concurrent else "locked":>10} {readers:>10} {reads:>10.0f} {writes:>10.0f} {bad:>10}')
+    if (failed):
+        print('Some reads were inconsistent!')
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
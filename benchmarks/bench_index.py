@@ -0,0 +1,70 @@
+import os
+import sys
+import time
+import datetime as dt
+
+# Make the project root importable when run as `python benchmarks/bench_index.py`
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from main import Holiday, HolidayList
+
+# make_rows: build synthetic scraped rows in the Time and Date format
+#   n: (int) number of rows to build
+#   return: (list(tuple)) (name, date_str) pairs, date_str formatted as '%b %d, %Y'
+def make_rows(n):
+    start = dt.datetime(2000, 1, 1)
+    return [(f'Holiday {i}', (start + dt.timedelta(days=i % 20000)).strftime('%b %d, %Y')) for i in range(n)]
+
+# bench_merge: time merging scraped rows into a list that already holds them all
+#   n: (int) size of the list
+#   return: (float) seconds taken by the merge
+def bench_merge(n):
+    rows = make_rows(n)
+    holidays = HolidayList()
+    for name, date in rows:
+        holidays.addHoliday(Holiday(name, date, date_format='%b %d, %Y'))
+
+    # Re-merging the same rows exercises the dedup lookup on every row
+    start = time.perf_counter()
+    for name, date in rows:
+        if (holidays.findHoliday(name, date, date_format='%b %d, %Y') == None):
+            holidays.addHoliday(Holiday(name, date, date_format='%b %d, %Y'))
+    return time.perf_counter() - start
+
+# bench_week: time week and range queries against a list of a given size
+#   n: (int) size of the list
+#   queries: (int, def 1000) number of queries of each kind
+#   return: (tuple(float, float)) microseconds per week query and per 7-day range query
+def bench_week(n, queries=1000):
+    holidays = HolidayList()
+    for name, date in make_rows(n):
+        holidays.addHoliday(Holiday(name, date, date_format='%b %d, %Y'))
+
+    # Week queries over the first few years of the generated dates
+    start = time.perf_counter()
+    for i in range(queries):
+        holidays.filterHolidaysByWeek(2000 + i % 20, i % 52 + 1)
+    week_us = (time.perf_counter() - start) / queries * 1e6
+
+    # Range queries covering one week each
+    start = time.perf_counter()
+    for i in range(queries):
+        first = dt.date(2000, 1, 1) + dt.timedelta(days=i * 7)
+        holidays.filterHolidaysByRange(str(first), str(first + dt.timedelta(days=7)))
+    range_us = (time.perf_counter() - start) / queries * 1e6
+    return week_us, range_us
+
+# main: print merge and query timings for growing list sizes
+def main():
+    print(f'{"size":>10} {"seconds":>10} {"us/row":>10}')
+    for n in (1000, 10000, 50000, 100000):
+        seconds = bench_merge(n)
+        print(f'{n:>10} {seconds:>10.4f} {seconds / n * 1e6:>10.2f}')
+
+    print()
+    print(f'{"size":>10} {"week us":>10} {"range us":>10}')
+    for n in (1000, 10000, 100000):
+        week_us, range_us = bench_week(n)
+        print(f'{n:>10} {week_us:>10.2f} {range_us:>10.2f}')
+
+if __name__ == "__main__":
+    main()
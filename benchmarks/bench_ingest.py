@@ -0,0 +1,78 @@
+import os
+import sys
+import time
+import datetime as dt
+
+# Make the project root importable when run as `python benchmarks/bench_ingest.py`
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from main import Holiday, HolidayList
+import dates
+from bench_index import make_rows
+
+# timed: run a function and time it
+#   func: (function) function to run
+#   return: (float) seconds taken
+def timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+# per_object: ingest the old way, one strptime and one addHoliday per record
+#   rows: (list(tuple(str, str))) (name, date_str) records
+#   date_format: (str) format of the dates
+#   engine: (str) storage engine
+def per_object(rows, date_format, engine):
+    holidays = HolidayList(engine=engine)
+    for name, date in rows:
+        holidays.addHoliday(Holiday(name, date, date_format=date_format))
+
+# bulk: ingest whole columns through addHolidays
+#   rows: (list(tuple(str, str))) (name, date_str) records
+#   date_format: (str) format of the dates
+#   engine: (str) storage engine
+def bulk(rows, date_format, engine):
+    HolidayList(engine=engine).addHolidays(rows, date_format=date_format)
+
+# main: compare per-record and column parsing, week computation and whole ingests, with and without NumPy
+def main():
+    n = 100000
+    scraped = make_rows(n)
+    iso = [(name, dt.datetime.strptime(date, '%b %d, %Y').strftime('%Y-%m-%d')) for name, date in scraped]
+    ordinals = [dt.datetime.strptime(date, '%Y-%m-%d').toordinal() for name, date in iso]
+    numpy_module = dates.numpy_module
+    numpy = numpy_module()
+    modes = [('pure', None)] + ([('numpy', numpy)] if numpy != None else [])
+
+    # Parsing and week computation on their own
+    print(f'{n} dates (us per date)')
+    print(f'{"step":>22} {"per record":>12}' + ''.join(f'{name:>12}' for name, module in modes))
+    steps = [
+        ('parse %b %d, %Y', lambda: [dt.datetime.strptime(date, '%b %d, %Y') for name, date in scraped],
+            lambda: dates.parse_ordinals([date for name, date in scraped], '%b %d, %Y')),
+        ('parse %Y-%m-%d', lambda: [dt.datetime.strptime(date, '%Y-%m-%d') for name, date in iso],
+            lambda: dates.parse_ordinals([date for name, date in iso])),
+        ('ISO weeks', lambda: [dt.date.fromordinal(ordinal).isocalendar() for ordinal in ordinals],
+            lambda: dates.iso_weeks(ordinals)),
+    ]
+    for name, one_by_one, column in steps:
+        line = f'{name:>22} {timed(one_by_one) / n * 1e6:>12.2f}'
+        for mode, module in modes:
+            dates.numpy_module = lambda module=module: module
+            line += f'{timed(column) / n * 1e6:>12.2f}'
+        print(line)
+        dates.numpy_module = numpy_module
+
+    # Whole ingests into each engine
+    print()
+    print(f'{"ingest":>22} {"per record":>12}' + ''.join(f'{name:>12}' for name, module in modes))
+    for engine in ('objects', 'columnar'):
+        for label, rows, date_format in (('%b %d, %Y', scraped, '%b %d, %Y'), ('%Y-%m-%d', iso, '%Y-%m-%d')):
+            line = f'{engine + " " + label:>22} {timed(lambda: per_object(rows, date_format, engine)) / n * 1e6:>12.2f}'
+            for mode, module in modes:
+                dates.numpy_module = lambda module=module: module
+                line += f'{timed(lambda: bulk(rows, date_format, engine)) / n * 1e6:>12.2f}'
+            print(line)
+            dates.numpy_module = numpy_module
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import os
+import sys
+import time
+
+# Make the project root importable when run as `python benchmarks/bench_instrument.py`
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from main import HolidayList
+import instrument
+from bench_bulk import make_tuples
+
+# per_call: time a function over many calls
+#   func: (function) function to call, taking no arguments
+#   calls: (int) number of calls
+#   return: (float) nanoseconds per call
+def per_call(func, calls):
+    start = time.perf_counter()
+    for i in range(calls):
+        func()
+    return (time.perf_counter() - start) / calls * 1e9
+
+# empty: a block with no hook
+def empty():
+    pass
+
+# empty_span: the same block inside a span
+def empty_span():
+    with instrument.span('empty'):
+        pass
+
+# main: compare hot paths without hooks, with hooks switched off and with hooks recording
+def main():
+    calls = 200000
+    holidays = HolidayList()
+    holidays.addHolidays(make_tuples(100000))
+    find = HolidayList.findHoliday.__wrapped__
+    week = HolidayList.filterHolidaysByWeek.__wrapped__
+
+    # The hooks on their own, then the hot paths they wrap
+    cases = [
+        ('empty block', empty, empty_span),
+        ('findHoliday', lambda: find(holidays, 'Holiday 5', '2000-01-06'), lambda: holidays.findHoliday('Holiday 5', '2000-01-06')),
+        ('filterHolidaysByWeek', lambda: week(holidays, 2001, 20), lambda: holidays.filterHolidaysByWeek(2001, 20)),
+    ]
+    print(f'{"call":>22} {"no hook ns":>12} {"off ns":>10} {"on ns":>10}')
+    for name, bare, hooked in cases:
+        instrument.enable(False)
+        plain = per_call(bare, calls)
+        off = per_call(hooked, calls)
+        instrument.enable(True)
+        on = per_call(hooked, calls)
+        instrument.enable(False)
+        print(f'{name:>22} {plain:>12.0f} {off:>10.0f} {on:>10.0f}')
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Make the project root importable when run as `python benchmarks/bench_load.py`
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from main import Holiday, HolidayList
+from bench_memory import make_recurring_rows
+
+# write_file: write a holidays JSON file in the same layout as data/holidays.json
+#   f_loc: (str) location of the file
+#   years: (int) number of years of 1000 holidays each
+def write_file(f_loc, years):
+    with open(f_loc, 'w') as f:
+        json.dump({'holidays': [{'name': name, 'date': Holiday(name, date, date_format='%b %d, %Y').date.strftime('%Y-%m-%d')}
+            for name, date in make_recurring_rows(years)]}, f, indent=4)
+
+# load_whole: the old loader, which parses the whole document before adding anything
+#   f_loc: (str) location of the file
+#   return: (HolidayList) loaded list
+def load_whole(f_loc):
+    holidays = HolidayList()
+    with open(f_loc, 'r') as f:
+        for holiday_json in json.load(f)['holidays']:
+            holidays.addHoliday(Holiday(holiday_json['name'], holiday_json['date']))
+    return holidays
+
+# load_stream: the streaming loader
+#   f_loc: (str) location of the file
+#   engine: (str) storage engine of the list
+#   return: (HolidayList) loaded list
+def load_stream(f_loc, engine):
+    holidays = HolidayList(engine=engine)
+    holidays.readJSON(f_loc)
+    return holidays
+
+# bench_loader: time a loader and measure its peak memory
+#   load: (function) loader that takes no arguments and returns a HolidayList
+#   return: (tuple(float, float, float)) records per second, peak MB while loading, MB held afterwards
+def bench_loader(load):
+    tracemalloc.start()
+    start = time.perf_counter()
+    holidays = load()
+    seconds = time.perf_counter() - start
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return holidays.numHolidays() / seconds, peak / 1e6, held / 1e6
+
+# main: compare the loaders on a 200,000 record file
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        f_loc = os.path.join(tmp, 'holidays.json')
+        write_file(f_loc, 200)
+        print(f'{"loader":>18} {"records/s":>10} {"peak MB":>10} {"held MB":>10}')
+        for label, load in (('json.load objects', lambda: load_whole(f_loc)),
+                ('stream objects', lambda: load_stream(f_loc, 'objects')),
+                ('stream columnar', lambda: load_stream(f_loc, 'columnar'))):
+            rate, peak, held = bench_loader(load)
+            print(f'{label:>18} {rate:>10.0f} {peak:>10.1f} {held:>10.1f}')
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+import os
+import sys
+import tracemalloc
+
+# Make the project root importable when run as `python benchmarks/bench_memory.py`
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import datetime as dt
+from main import Holiday, HolidayList
+
+# bench_engine: measure memory held by a HolidayList after loading rows
+#   engine: (str) storage engine of the list
+#   rows: (list(tuple)) (name, date_str) pairs, date_str formatted as '%b %d, %Y'
+#   return: (float) bytes per holiday
+def bench_engine(engine, rows):
+    tracemalloc.start()
+    holidays = HolidayList(engine=engine)
+    for name, date in rows:
+        holidays.addHoliday(Holiday(name, date, date_format='%b %d, %Y'))
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size / holidays.numHolidays()
+
+# make_recurring_rows: build rows where the same 1000 holidays recur every year, like a multi-year list
+#   years: (int) number of years
+#   return: (list(tuple)) (name, date_str) pairs, date_str formatted as '%b %d, %Y'
+def make_recurring_rows(years):
+    rows = []
+    for year in range(1950, 1950 + years):
+        for i in range(1000):
+            rows.append((f'Holiday {i}', (dt.date(year, 1, 1) + dt.timedelta(days=i % 365)).strftime('%b %d, %Y')))
+    return rows
+
+# main: print bytes per holiday for both engines
+def main():
+    rows = make_recurring_rows(100)
+    print(f'{"engine":>10} {"bytes/holiday":>14}')
+    for engine in ('objects', 'columnar'):
+        print(f'{engine:>10} {bench_engine(engine, rows):>14.1f}')
+
+if __name__ == "__main__":
+    main()
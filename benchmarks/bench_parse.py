@@ -0,0 +1,71 @@
+import glob
+import os
+import sys
+import time
+
+# Make the project root importable when run as `python benchmarks/bench_parse.py [fixture_dir]`
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import scraper
+from stub_server import render_page
+
+# Saved Time and Date pages, with the page around the table as well as the table itself
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# load_pages: read saved holidays pages, or render stub pages if no directory is given
+#   fixture_dir: (str) directory of saved .html pages; None to use stub pages
+#   return: (list(str)) text of each page
+def load_pages(fixture_dir=None):
+    if (fixture_dir == None):
+        return [render_page(year) for year in range(2020, 2025)]
+    pages = []
+    for path in sorted(glob.glob(os.path.join(fixture_dir, '*.html'))):
+        with open(path, 'r', encoding='utf-8') as f:
+            pages.append(f.read())
+    return pages
+
+# bench_backend: time one parser backend over all pages
+#   pages: (list(str)) text of each page
+#   backend: (str) parser backend from scraper.PARSERS
+#   rounds: (int, def 5) number of passes over the pages
+#   return: (tuple(float, list)) milliseconds per page, and the rows and failed count of each page
+def bench_backend(pages, backend, rounds=5):
+    start = time.perf_counter()
+    for i in range(rounds):
+        parsed = [scraper.parse_holidays_table(page, 2020, backend=backend) for page in pages]
+    return (time.perf_counter() - start) / (rounds * len(pages)) * 1000, parsed
+
+# compare_backends: time every parser backend over the same pages
+#   title: (str) name of the pages, printed above the table
+#   pages: (list(str)) text of each page
+#   return: (bool) True if every backend read the same rows from every page
+def compare_backends(title, pages):
+    print(f'{title}, {len(pages)} pages')
+    print(f'{"backend":>10} {"ms/page":>10} {"rows":>10} {"failed":>10}')
+    expected = None
+    agree = True
+    for backend in scraper.PARSERS:
+        if (backend == 'lxml' and scraper.lxml_etree() == None):
+            print(f'{backend:>10} {"n/a":>10} {"":>10} {"":>10}')
+            continue
+        ms, parsed = bench_backend(pages, backend)
+        rows = sum(len(page_rows) for page_rows, failed in parsed)
+        failed = sum(failed for page_rows, failed in parsed)
+        print(f'{backend:>10} {ms:>10.2f} {rows:>10} {failed:>10}')
+        expected = parsed if expected == None else expected
+        if (parsed != expected):
+            print(f'{backend} read different rows than {next(iter(scraper.PARSERS))}!')
+            agree = False
+    print()
+    return agree
+
+# main: compare the parser backends on the saved pages, or on a directory given on the command line, and on stub
+#   pages with a full year of rows; exits with status 1 if the backends disagree
+def main():
+    fixture_dir = sys.argv[1] if len(sys.argv) > 1 else FIXTURE_DIR
+    agree = compare_backends(f'saved pages in {fixture_dir}', load_pages(fixture_dir))
+    agree = compare_backends('stub pages', load_pages()) and agree
+    if (not agree):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
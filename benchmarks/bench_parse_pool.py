@@ -0,0 +1,97 @@
+import os
+import sys
+import tempfile
+import time
+
+# Make the project root importable when run as `python benchmarks/bench_parse_pool.py`
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from main import HolidayList
+import pipeline
+from stub_server import render_page, start_stub_server
+
+# A backfill of several decades for a handful of countries
+COUNTRIES = ('us', 'uk', 'de', 'fr')
+YEARS = range(1980, 2025)
+
+# Parser backend; bs4 is the slowest, so it gains the most from more cores
+PARSER = 'bs4'
+
+# write_fixtures: save a page for each country and year, with names that differ between countries
+#   fixture_dir: (str) directory to write into
+#   per_day: (int) number of holidays on each day of the year
+#   return: (str) path template for pipeline.Source, with {country} and {year} fields
+def write_fixtures(fixture_dir, per_day):
+    for country in COUNTRIES:
+        for year in YEARS:
+            page = render_page(year, per_day=per_day).replace('Stub Day', f'Stub Day {country}')
+            with open(os.path.join(fixture_dir, f'{country}-{year}.html'), 'w', encoding='utf-8') as f:
+                f.write(page)
+    return os.path.join(fixture_dir, '{country}-{year}.html')
+
+# process_counts: worker process counts to try, from none up to one per core
+#   return: (list(int)) counts, starting with 0 for parsing in threads
+def process_counts():
+    cores = os.cpu_count() or 1
+    return sorted({0, 1, 2, 4, cores})
+
+# main: run the pipeline and scrapeHolidays over a local corpus with more and more parse processes; exits with
+#   status 1 if any run gives different holidays than parsing in threads
+def main():
+    failed = False
+    print(f'{os.cpu_count()} core(s), {PARSER} parser')
+    with tempfile.TemporaryDirectory() as fixture_dir:
+        template = write_fixtures(fixture_dir, per_day=1)
+        sources = pipeline.make_sources(COUNTRIES, YEARS, url=template, name='fixtures')
+        pages = len(COUNTRIES) * len(YEARS)
+
+        # Every page goes through the pipeline's parse stage
+        print(f'pipeline, {pages} pages')
+        print(f'{"processes":>10} {"seconds":>9} {"pages/s":>9} {"speedup":>8} {"holidays":>9}')
+        base = None
+        expected = None
+        for processes in process_counts():
+            holidays = HolidayList(engine='columnar')
+            start = time.perf_counter()
+            run = holidays.ingestSources(sources, fetch_workers=4, parse_workers=2, queue_size=16, parser=PARSER,
+                parse_processes=processes)
+            seconds = time.perf_counter() - start
+            base = seconds if base == None else base
+            rows = sorted(holidays._store.rows())
+            expected = rows if expected == None else expected
+            print(f'{processes:>10} {seconds:>9.2f} {pages / seconds:>9.1f} {base / seconds:>7.2f}x {len(rows):>9}')
+            if (rows != expected or run.failures):
+                print(f'{processes} process(es) gave different holidays, or failed on {len(run.failures)} pages!')
+                failed = True
+
+        # scrapeHolidays fetches one country's years from the stub server, serving the same pages
+        us_dir = os.path.join(fixture_dir, 'us')
+        os.mkdir(us_dir)
+        for year in YEARS:
+            os.replace(os.path.join(fixture_dir, f'us-{year}.html'), os.path.join(us_dir, f'{year}.html'))
+        server, base_url = start_stub_server(latency=0, fixture_dir=us_dir)
+        print()
+        print(f'scrapeHolidays, {len(YEARS)} pages')
+        print(f'{"processes":>10} {"seconds":>9} {"pages/s":>9} {"speedup":>8} {"holidays":>9}')
+        base = None
+        expected = None
+        try:
+            for processes in process_counts():
+                holidays = HolidayList(engine='columnar')
+                start = time.perf_counter()
+                holidays.scrapeHolidays(years=YEARS, base_url=base_url, workers=max(processes, 5), parser=PARSER, processes=processes)
+                seconds = time.perf_counter() - start
+                base = seconds if base == None else base
+                rows = sorted(holidays._store.rows())
+                expected = rows if expected == None else expected
+                print(f'{processes:>10} {seconds:>9.2f} {len(YEARS) / seconds:>9.1f} {base / seconds:>7.2f}x {len(rows):>9}')
+                if (rows != expected):
+                    print(f'{processes} process(es) gave different holidays!')
+                    failed = True
+        finally:
+            server.shutdown()
+
+    if (failed):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import os
+import sys
+import tempfile
+import time
+
+# Make the project root importable when run as `python benchmarks/bench_pipeline.py`
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from main import HolidayList
+import pipeline
+from stub_server import render_page, start_stub_server
+
+# Countries written as fixtures; every other one shares its holiday names with the rest
+COUNTRIES = ('us', 'uk', 'de', 'fr', 'jp', 'br', 'in', 'au')
+YEARS = range(2020, 2025)
+
+# write_fixtures: save a stub page for each country and year
+#   fixture_dir: (str) directory to write into
+#   per_day: (int) number of holidays on each day of the year
+#   return: (str) path template for pipeline.Source, with {country} and {year} fields
+def write_fixtures(fixture_dir, per_day):
+    for i, country in enumerate(COUNTRIES):
+        for year in YEARS:
+            page = render_page(year, per_day=per_day)
+            if (i % 2 == 1):
+                page = page.replace('Stub Day', f'Stub Day {country}')
+            with open(os.path.join(fixture_dir, f'{country}-{year}.html'), 'w', encoding='utf-8') as f:
+                f.write(page)
+    return os.path.join(fixture_dir, '{country}-{year}.html')
+
+# print_reports: print one line per stage of a finished pipeline
+#   run: (pipeline.Pipeline) finished pipeline
+#   seconds: (float) wall time of the whole run
+def print_reports(run, seconds):
+    print(f'{"stage":>10} {"workers":>8} {"pages":>8} {"rows":>10} {"errors":>8} {"seconds":>8} {"busy":>8} {"rows/s":>10} {"queued":>8}')
+    for report in run.reports:
+        print(f'{report.stage:>10} {report.workers:>8} {report.items:>8} {report.rows:>10} {report.errors:>8} '
+            f'{report.seconds:>8.2f} {report.busy:>8.2f} {report.rate:>10.0f} {report.max_queued:>8}')
+    print(f'total: {seconds:.2f}s')
+
+# ingest: run the pipeline into a new list
+#   sources: (list(pipeline.Source)) sources to read
+#   pipeline_args: worker and queue settings for pipeline.Pipeline
+#   return: (tuple(HolidayList, pipeline.Pipeline, float)) filled list, finished pipeline and seconds taken
+def ingest(sources, **pipeline_args):
+    holidays = HolidayList(engine='columnar')
+    start = time.perf_counter()
+    run = holidays.ingestSources(sources, **pipeline_args)
+    return holidays, run, time.perf_counter() - start
+
+# main: run the pipeline end to end over local fixture pages and a slow stub server; exits with status 1 if
+#   any holiday is missing, untagged or tagged wrongly
+def main():
+    per_day = 4
+    failed = False
+    with tempfile.TemporaryDirectory() as fixture_dir:
+        template = write_fixtures(fixture_dir, per_day)
+        sources = pipeline.make_sources(COUNTRIES, YEARS, url=template, name='fixtures')
+
+        # Shared names collapse into one holiday tagged with every country that has it
+        days = sum(366 if year % 4 == 0 else 365 for year in YEARS)
+        shared = [country for i, country in enumerate(COUNTRIES) if i % 2 == 0]
+        expected = days * per_day * (1 + len(COUNTRIES) - len(shared))
+
+        for workers in (1, 4):
+            print(f'local fixtures, {workers} worker(s) per stage')
+            holidays, run, seconds = ingest(sources, fetch_workers=workers, parse_workers=workers, normalize_workers=workers, queue_size=4)
+            print_reports(run, seconds)
+            print()
+            origins = holidays.originsOf('Stub Day 1-0', '2020-01-01')
+            if (holidays.numHolidays() != expected or run.failures
+                    or origins != sorted((country, 'fixtures') for country in shared)):
+                print(f'Expected {expected} holidays tagged with {shared}, got {holidays.numHolidays()} tagged with {origins}!')
+                failed = True
+
+    # Waiting on the network is where extra fetch workers pay off
+    latency = 0.1
+    server, base_url = start_stub_server(latency=latency)
+    sources = pipeline.make_sources(COUNTRIES[:4], YEARS, url=base_url.rsplit('/', 2)[0] + '/{country}/{year}', name='stub')
+    for workers in (1, 8):
+        print(f'stub server ({latency}s per page), {workers} fetch worker(s)')
+        holidays, run, seconds = ingest(sources, fetch_workers=workers)
+        print_reports(run, seconds)
+        print()
+        failed = failed or bool(run.failures)
+    server.shutdown()
+
+    if (failed):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
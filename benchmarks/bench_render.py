@@ -0,0 +1,79 @@
+import os
+import random
+import sys
+import time
+import datetime as dt
+
+# Make the project root importable when run as `python benchmarks/bench_render.py`
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from main import Holiday, HolidayList
+from bench_suite import make_holidays
+
+# Views asked for in each run; most land on a few hot weeks, as menu use does
+VIEWS = 20000
+HOT_WEEKS = 20
+
+# pick_weeks: choose weeks to view, mostly from a small set of hot weeks
+#   rows: (list(tuple(str, int))) holidays the weeks are picked from
+#   rng: (random.Random) source of randomness
+#   return: (list(tuple(int, int))) ISO year and week of each view
+def pick_weeks(rows, rng):
+    weeks = sorted({dt.date.fromordinal(ordinal).isocalendar()[:2] for name, ordinal in rows})
+    hot = rng.sample(weeks, HOT_WEEKS)
+    return [rng.choice(hot) if rng.random() < 0.9 else rng.choice(weeks) for i in range(VIEWS)]
+
+# time_views: time every view
+#   view: (function) takes a year and week and returns the formatted lines
+#   weeks: (list(tuple(int, int))) weeks to view
+#   return: (tuple(list(list(str)), float)) lines of each view and seconds taken
+def time_views(view, weeks):
+    start = time.perf_counter()
+    lines = [view(year, week) for year, week in weeks]
+    return lines, time.perf_counter() - start
+
+# main: compare formatting every view with the render cache, and the year range scan with the kept bounds; exits with
+#   status 1 if the cache ever gives lines that differ from freshly formatted ones
+def main():
+    rng = random.Random(24)
+    failed = False
+    print(f'{"holidays":>9} {"uncached us":>12} {"cached us":>10} {"hit rate":>9} {"scan ms":>8} {"bounds us":>10}')
+    for n in (1000, 100000, 1000000):
+        rows = make_holidays(n)
+        holidays = HolidayList(engine='columnar')
+        holidays.addHolidays(rows)
+        weeks = pick_weeks(rows, rng)
+
+        fresh, uncached = time_views(lambda year, week: holidays.displayHolidays(holidays.filterHolidaysByWeek(year, week)), weeks)
+        cached_lines, cached = time_views(holidays.viewWeek, weeks)
+        stats = holidays.render_cache.stats
+
+        # The menu used to find the year range by looking at every holiday
+        start = time.perf_counter()
+        years = [holiday.date.year for holiday in holidays.inner_holidays]
+        scan = (min(years), max(years))
+        scan_seconds = time.perf_counter() - start
+        holidays.yearRange()
+        start = time.perf_counter()
+        bounds = holidays.yearRange()
+        bounds_seconds = time.perf_counter() - start
+
+        print(f'{n:>9} {uncached / VIEWS * 1e6:>12.2f} {cached / VIEWS * 1e6:>10.2f} {stats["hit_rate"]:>9.1%} '
+            f'{scan_seconds * 1e3:>8.1f} {bounds_seconds * 1e6:>10.1f}')
+        if (fresh != cached_lines or scan != bounds):
+            print(f'Cached views or year bounds differ from fresh ones at {n} holidays!')
+            failed = True
+
+        # An edit must show up in the week it touches, and leave other weeks cached
+        year, week = weeks[0]
+        monday = dt.date.fromisocalendar(year, week, 1)
+        holidays.addHoliday(Holiday('Render Check', monday.isoformat()))
+        invalidations = holidays.render_cache.stats['invalidations']
+        if (f'Render Check ({monday.isoformat()})' not in holidays.viewWeek(year, week) or invalidations != 1):
+            print(f'An edit to {year} week {week} dropped {invalidations} cached weeks instead of 1!')
+            failed = True
+
+    if (failed):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import gc
+import os
+import sys
+import time
+import tracemalloc
+import datetime as dt
+
+# Make the project root importable when run as `python benchmarks/bench_rules.py`
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from main import HolidayList
+import rules
+
+# Recurring US holidays, one of each kind of rule
+RULES = (
+    rules.fixed_date("New Year's Day", 1, 1),
+    rules.nth_weekday('Martin Luther King Jr. Day', 1, 0, 3),
+    rules.nth_weekday("Presidents' Day", 2, 0, 3),
+    rules.easter_offset('Good Friday', -2),
+    rules.easter_offset('Easter Sunday', 0),
+    rules.last_weekday('Memorial Day', 5, 0),
+    rules.fixed_date('Juneteenth', 6, 19),
+    rules.fixed_date('Independence Day', 7, 4),
+    rules.nth_weekday('Labor Day', 9, 0, 1),
+    rules.nth_weekday('Columbus Day', 10, 0, 2),
+    rules.fixed_date('Veterans Day', 11, 11),
+    rules.nth_weekday('Thanksgiving Day', 11, 3, 4),
+    rules.fixed_date('Christmas Day', 12, 25),
+)
+
+# Years the rows and the rules cover, starting from 1900
+SPANS = (10, 100, 400)
+
+# Weeks asked for by each run of the week queries
+QUERIES = 2000
+
+# measure: time a function, then run it again under tracemalloc for its peak memory
+#   func: (function) function to measure
+#   return: (tuple(object, float, float)) what func returned, seconds and peak KB
+def measure(func):
+    gc.collect()
+    start = time.perf_counter()
+    func()
+    seconds = time.perf_counter() - start
+    gc.collect()
+    tracemalloc.start()
+    result = func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, seconds, peak / 1024
+
+# stored_list: build a list holding every year's holidays as stored rows
+#   years: (range) years to cover
+#   return: (HolidayList) list
+def stored_list(years):
+    holidays = HolidayList(engine='columnar')
+    holidays._addRows([(rule.name, rules.occurrence(rule, year)) for year in years for rule in RULES])
+    return holidays
+
+# rule_list: build a list holding only the rules
+#   return: (HolidayList) list
+def rule_list():
+    holidays = HolidayList(engine='columnar')
+    for rule in RULES:
+        holidays.addRule(rule)
+    return holidays
+
+# main: compare stored rows with rules over spans of years; exits with status 1 if they give different holidays
+def main():
+    failed = False
+    print(f'{"years":>6} {"holidays":>9} {"kind":>7} {"build KB":>10} {"range s":>9} {"range KB":>10} {"week us":>9} {"expanded":>9}')
+    for span in SPANS:
+        years = range(1900, 1900 + span)
+        start = dt.date(years[0], 1, 1).isoformat()
+        end = dt.date(years[-1] + 1, 1, 1).isoformat()
+        weeks = [(years[i * span // QUERIES], i % 52 + 1) for i in range(QUERIES)]
+
+        results = {}
+
+        # ISO weeks at either end reach into the years either side, so the stored rows cover those too
+        for kind, build in (('stored', lambda: stored_list(range(years[0] - 1, years[-1] + 2))), ('rules', rule_list)):
+            holidays, build_seconds, build_kb = measure(build)
+
+            # Only the count is kept, so the measured memory is what the query itself builds
+            count, range_seconds, range_kb = measure(lambda: sum(1 for holiday in holidays.filterHolidaysByRange(start, end)))
+            found, week_seconds, week_kb = measure(lambda: [[(holiday.name, holiday.date) for holiday in holidays.filterHolidaysByWeek(year, week)]
+                for year, week in weeks])
+            expanded = holidays._rules.stats['expansions']
+            results[kind] = (count, found)
+            print(f'{span:>6} {count:>9} {kind:>7} {build_kb:>10.0f} {range_seconds:>9.3f} {range_kb:>10.0f} '
+                f'{week_seconds / QUERIES * 1e6:>9.1f} {expanded:>9}')
+        if (results['stored'] != results['rules']):
+            print(f'Rules and stored rows disagree over {span} years!')
+            failed = True
+
+    if (failed):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
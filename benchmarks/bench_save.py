@@ -0,0 +1,59 @@
+import os
+import sys
+import tempfile
+import time
+
+# Make the project root importable when run as `python benchmarks/bench_save.py`
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from main import Holiday, HolidayList
+from bench_memory import make_recurring_rows
+
+# make_list: build a list of a given size
+#   years: (int) number of years of 1000 holidays each
+#   return: (HolidayList) the list
+def make_list(years):
+    holidays = HolidayList()
+    for name, date in make_recurring_rows(years):
+        holidays.addHoliday(Holiday(name, date, date_format='%b %d, %Y'))
+    return holidays
+
+# bench_json: time one edit followed by a full JSON save
+#   holidays: (HolidayList) list to edit
+#   f_loc: (str) location of the JSON file
+#   edits: (int, def 5) number of edits
+#   return: (float) milliseconds per saved edit
+def bench_json(holidays, f_loc, edits=5):
+    start = time.perf_counter()
+    for i in range(edits):
+        holidays.addHoliday(Holiday(f'Edit {i}', '2030-01-01'))
+        holidays.saveToJSON(f_loc)
+    return (time.perf_counter() - start) / edits * 1000
+
+# bench_log: time edits saved through the append log
+#   holidays: (HolidayList) list with an open append log
+#   edits: (int, def 200) number of edits
+#   return: (float) milliseconds per saved edit
+def bench_log(holidays, edits=200):
+    start = time.perf_counter()
+    for i in range(edits):
+        holidays.addHoliday(Holiday(f'Logged {i}', '2030-01-01'))
+    return (time.perf_counter() - start) / edits * 1000
+
+# main: print save latency for growing list sizes
+def main():
+    print(f'{"size":>10} {"json ms":>10} {"log ms":>10} {"log+fsync":>10}')
+    for years in (1, 10, 100):
+        with tempfile.TemporaryDirectory() as tmp:
+            holidays = make_list(years)
+            size = holidays.numHolidays()
+            json_ms = bench_json(holidays, os.path.join(tmp, 'holidays.json'))
+            holidays.openLog(os.path.join(tmp, 'holidays.snapshot'), sync=False, compact_every=0)
+            log_ms = bench_log(holidays)
+            holidays.closeLog()
+            holidays.openLog(os.path.join(tmp, 'holidays.snapshot'), sync=True, compact_every=0)
+            sync_ms = bench_log(holidays)
+            holidays.closeLog()
+            print(f'{size:>10} {json_ms:>10.2f} {log_ms:>10.3f} {sync_ms:>10.3f}')
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+import os
+import sys
+import tempfile
+import time
+
+# Make the project root importable when run as `python benchmarks/bench_scrape.py`
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from main import HolidayList
+import scraper
+from stub_server import start_stub_server
+
+# bench_scrape: time a five-year scrape against the stub server
+#   base_url: (str) URL that the year is appended to
+#   workers: (int) number of years fetched at the same time
+#   cache: (scraper.PageCache, def None) cache for the pages
+#   return: (tuple(float, int)) seconds taken and number of holidays scraped
+def bench_scrape(base_url, workers, cache=None):
+    holidays = HolidayList()
+    start = time.perf_counter()
+    holidays.scrapeHolidays(years=range(2020, 2025), workers=workers, base_url=base_url, cache=cache)
+    return time.perf_counter() - start, holidays.numHolidays()
+
+# main: compare serial, concurrent and cached scrapes with a fixed latency per page
+def main():
+    latency = 0.3
+    server, base_url = start_stub_server(latency=latency)
+    print(f'latency per page: {latency}s')
+    print(f'{"workers":>10} {"seconds":>10} {"holidays":>10}')
+    for workers in (1, 5):
+        seconds, count = bench_scrape(base_url, workers)
+        print(f'{workers:>10} {seconds:>10.3f} {count:>10}')
+
+    # Cold run fills the cache; warm run should not download anything
+    with tempfile.TemporaryDirectory() as cache_dir:
+        print()
+        print(f'{"run":>10} {"seconds":>10} {"stats":>10}')
+        for run in ('cold', 'warm'):
+            cache = scraper.PageCache(cache_dir)
+            seconds, count = bench_scrape(base_url, 5, cache=cache)
+            print(f'{run:>10} {seconds:>10.3f} {cache.stats}')
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+import os
+import random
+import sys
+import time
+import datetime as dt
+
+# Make the project root importable when run as `python benchmarks/bench_search.py`
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import search
+
+# Endings that make the generated words look like holiday names
+ENDINGS = ('Day', 'Eve', 'Festival', 'Remembrance Day', 'Independence Day', 'Memorial', 'Feast')
+
+# make_words: build made-up words from syllables
+#   n: (int) number of words
+#   rng: (random.Random) source of randomness
+#   return: (list(str)) distinct capitalized words
+def make_words(n, rng):
+    syllables = ['ba', 'ko', 'ri', 'tha', 'mel', 'san', 'vor', 'di', 'lu', 'pen', 'gar', 'es', 'ton', 'mi', 'ra', 'zu']
+    words = set()
+    while (len(words) < n):
+        words.add(''.join(rng.choice(syllables) for i in range(rng.randint(2, 4))).capitalize())
+    return sorted(words)
+
+# make_names: build distinct holiday names such as 'Korimel Santha Festival'
+#   n: (int) number of names
+#   words: (list(str)) words to build names from
+#   return: (list(str)) names
+def make_names(n, words):
+    names = []
+    for first in words:
+        for second in words:
+            for ending in ENDINGS:
+                names.append(f'{first} {second} {ending}')
+                if (len(names) == n):
+                    return names
+    return names
+
+# misspell: change one letter of a word, as a typo would
+#   word: (str) word to change
+#   rng: (random.Random) source of randomness
+#   return: (str) misspelt word
+def misspell(word, rng):
+    i = rng.randrange(1, len(word))
+    return word[:i] + rng.choice('aeiouxyz') + word[i + 1:]
+
+# make_queries: build queries of each kind from names in the index
+#   names: (list(str)) names in the index
+#   count: (int) queries of each kind
+#   rng: (random.Random) source of randomness
+#   return: (dict) kind -> list of queries
+def make_queries(names, count, rng):
+    picks = [rng.choice(names).split() for i in range(count)]
+    return {
+        'prefix': [words[0][:3] for words in picks],
+        'two words': [f'{words[0]} {words[1][:3]}' for words in picks],
+        'whole name': [' '.join(words) for words in picks],
+        'typo': [f'{misspell(words[0], rng)} {words[1]}' for words in picks],
+        'miss': ['Qwxyz' for words in picks],
+    }
+
+# percentile: get a percentile of sorted timings
+#   timings: (list(float)) sorted timings
+#   share: (float) 0 to 1
+#   return: (float) timing at that percentile
+def percentile(timings, share):
+    return timings[min(len(timings) - 1, int(len(timings) * share))]
+
+# bench_search: time each kind of query against an index of a given size, and a plain scan for comparison
+#   n: (int) number of names
+#   count: (int) queries of each kind
+#   return: (tuple(float, dict)) seconds to build the index, and kind -> (p50, p99, scan p50) in milliseconds
+def bench_search(n, count=500):
+    rng = random.Random(n)
+    names = make_names(n, make_words(int((n / len(ENDINGS)) ** 0.5) + 1, rng))
+    start_ordinal = dt.date(2000, 1, 1).toordinal()
+
+    start = time.perf_counter()
+    index = search.NameIndex()
+    for i, name in enumerate(names):
+        index.add(name, start_ordinal + i % 3650)
+    build = time.perf_counter() - start
+
+    results = {}
+    for kind, queries in make_queries(names, count, rng).items():
+        timings = []
+        for query in queries:
+            start = time.perf_counter()
+            index.search(query)
+            timings.append((time.perf_counter() - start) * 1e3)
+        timings.sort()
+
+        # A case-insensitive substring scan, as a search without the index would do it
+        scans = []
+        for query in queries[:5]:
+            start = time.perf_counter()
+            lowered = query.lower()
+            [name for name in names if lowered in name.lower()]
+            scans.append((time.perf_counter() - start) * 1e3)
+        scans.sort()
+        results[kind] = (percentile(timings, 0.5), percentile(timings, 0.99), percentile(scans, 0.5))
+    return build, results
+
+# main: print query latency percentiles as the index grows to a million names
+def main():
+    print(f'{"names":>10} {"build s":>8} {"query":>12} {"p50 ms":>10} {"p99 ms":>10} {"scan ms":>10}')
+    for n in (10000, 100000, 1000000):
+        build, results = bench_search(n)
+        for kind, (p50, p99, scan) in results.items():
+            print(f'{n:>10} {build:>8.1f} {kind:>12} {p50:>10.3f} {p99:>10.3f} {scan:>10.1f}')
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+import datetime as dt
+
+# Make the project root importable when run as `python benchmarks/bench_server.py`
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+import persistence
+from bench_index import make_rows
+
+# free_port: find a port nothing is listening on
+#   return: (int) port number
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+# start_server: run server.py in its own process and wait until it answers
+#   data_loc: (str) JSON file of holidays to serve
+#   port: (int) port to listen on
+#   return: (subprocess.Popen) server process
+def start_server(data_loc, port):
+    process = subprocess.Popen([sys.executable, os.path.join(ROOT, 'server.py'), '--data', data_loc, '--port', str(port)],
+        cwd=ROOT, stdout=subprocess.PIPE, text=True)
+    process.stdout.readline()
+    return process
+
+# request: make one request on a new connection
+#   port: (int) port of the server
+#   method: (str) HTTP method
+#   path: (str) path and query
+#   headers: (dict) request headers; default none
+#   body: (bytes) request body; default none
+#   return: (tuple(int, str, float)) status, ETag and seconds taken
+def request(port, method, path, headers=None, body=None):
+    start = time.perf_counter()
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+    connection.request(method, path, body=body, headers=headers or {})
+    response = connection.getresponse()
+    response.read()
+    connection.close()
+    return response.status, response.getheader('ETag'), time.perf_counter() - start
+
+# load: send requests from many client threads at once
+#   port: (int) port of the server
+#   make_request: (function) takes the client and request numbers and returns (method, path, headers, body)
+#   clients: (int) number of client threads
+#   per_client: (int) requests sent by each client
+#   return: (tuple(float, float, float, dict)) p50 and p99 latency in milliseconds, requests per second, and status counts
+def load(port, make_request, clients=8, per_client=250):
+    latencies = []
+    statuses = {}
+    lock = threading.Lock()
+
+    def client(number):
+        mine = []
+        counts = {}
+        for i in range(per_client):
+            status, etag, seconds = request(port, *make_request(number, i))
+            mine.append(seconds)
+            counts[status] = counts.get(status, 0) + 1
+        with lock:
+            latencies.extend(mine)
+            for status, count in counts.items():
+                statuses[status] = statuses.get(status, 0) + count
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(number,)) for number in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+    return p50, p99, len(latencies) / elapsed, statuses
+
+# main: report latency and throughput of each endpoint against a local server
+def main():
+    size = 100000
+    today = datetime.today()
+    hot = [(today + dt.timedelta(weeks=offset)).isocalendar()[:2] for offset in range(-4, 5)]
+    rows = make_rows(size)
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        data_loc = os.path.join(data_dir, 'holidays.json')
+        persistence.write_json(data_loc, [(name, datetime.strptime(date, '%b %d, %Y').strftime('%Y-%m-%d')) for name, date in rows])
+        port = free_port()
+        server = start_server(data_loc, port)
+        try:
+            status, hot_etag, seconds = request(port, 'GET', f'/weeks/{hot[4][0]}/{hot[4][1]}')
+
+            # Each scenario: name and a function making the i-th request of a client
+            scenarios = [
+                ('hot week', lambda c, i: ('GET', f'/weeks/{hot[i % 9][0]}/{hot[i % 9][1]}', None, None)),
+                ('hot week 304', lambda c, i: ('GET', f'/weeks/{hot[4][0]}/{hot[4][1]}', {'If-None-Match': hot_etag}, None)),
+                ('cold week', lambda c, i: ('GET', f'/weeks/{2000 + (c * 7 + i) % 50}/{(c * 13 + i) % 52 + 1}', None, None)),
+                ('range', lambda c, i: ('GET', f'/range?from=2001-{i % 12 + 1:02}-01&to=2001-{i % 12 + 1:02}-08', None, None)),
+                ('find', lambda c, i: ('GET', '/holidays?name=Holiday%20' + str(i) + '&date=' +
+                    datetime.strptime(rows[i][1], '%b %d, %Y').strftime('%Y-%m-%d'), None, None)),
+                ('add', lambda c, i: ('POST', '/holidays', {'Content-Type': 'application/json'},
+                    json.dumps({'name': f'Load {c}-{i}', 'date': '2030-01-01'}).encode('utf-8'))),
+                ('mixed 9:1', lambda c, i: ('POST', '/holidays', {'Content-Type': 'application/json'},
+                    json.dumps({'name': f'Mixed {c}-{i}', 'date': today.strftime('%Y-%m-%d')}).encode('utf-8'))
+                    if i % 10 == 0 else ('GET', f'/weeks/{hot[i % 9][0]}/{hot[i % 9][1]}', None, None)),
+            ]
+
+            print(f'{size} holidays, 8 clients, a new connection per request')
+            print(f'{"endpoint":>14} {"p50 ms":>10} {"p99 ms":>10} {"req/s":>10} {"statuses":>16}')
+            for name, make_request in scenarios:
+                p50, p99, rate, statuses = load(port, make_request)
+                print(f'{name:>14} {p50:>10.2f} {p99:>10.2f} {rate:>10.0f} {str(statuses):>16}')
+        finally:
+            server.terminate()
+            server.wait()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+import os
+import sys
+import tempfile
+import time
+
+# Make the project root importable when run as `python benchmarks/bench_snapshot.py`
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from main import HolidayList
+from bench_load import write_file
+
+# bench_cold_start: time loading a file and answering the first week query
+#   load: (function) takes a HolidayList and loads it
+#   engine: (str, def 'objects') storage engine of the list
+#   return: (tuple(float, float)) milliseconds to load and milliseconds for the first week query
+def bench_cold_start(load, engine='objects'):
+    holidays = HolidayList(engine=engine)
+    start = time.perf_counter()
+    load(holidays)
+    loaded = time.perf_counter()
+    holidays.filterHolidaysByWeek(2000, 10)
+    return (loaded - start) * 1000, (time.perf_counter() - loaded) * 1000
+
+# main: compare JSON and snapshot cold starts
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        for years in (20, 200):
+            json_loc = os.path.join(tmp, 'holidays.json')
+            snapshot_loc = os.path.join(tmp, 'holidays.snapshot')
+            write_file(json_loc, years)
+            holidays = HolidayList(engine='columnar')
+            holidays.readJSON(json_loc)
+            holidays.saveSnapshot(snapshot_loc)
+
+            print(f'{years * 1000} holidays')
+            print(f'{"load":>18} {"load ms":>10} {"week ms":>10}')
+            for label, engine, load in (('json objects', 'objects', lambda h: h.readJSON(json_loc)),
+                    ('json columnar', 'columnar', lambda h: h.readJSON(json_loc)),
+                    ('snapshot', 'objects', lambda h: h.readSnapshot(snapshot_loc))):
+                load_ms, week_ms = bench_cold_start(load, engine)
+                print(f'{label:>18} {load_ms:>10.2f} {week_ms:>10.3f}')
+            print()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+# Make the project root importable when run as `python benchmarks/bench_startup.py`
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+from stub_server import start_stub_server
+from stub_weather import start_stub_weather
+
+# Runs the menu and exits as soon as it first asks for input
+FIRST_PROMPT = '''
+import builtins, os, sys
+sys.path.insert(1, {root!r})
+def first_prompt(prompt=''):
+    sys.stdout.flush()
+    os._exit(0)
+builtins.input = first_prompt
+import main
+main.main(lazy={lazy})
+'''
+
+# time_to_first_prompt: time a fresh interpreter from launch until the menu asks for input
+#   work_dir: (str) directory with the data, messages and config.py the menu reads
+#   lazy: (bool) True for a lazy startup; False to scrape before the menu
+#   return: (float) seconds to the first prompt
+def time_to_first_prompt(work_dir, lazy):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-c', FIRST_PROMPT.format(root=os.path.abspath(ROOT), lazy=lazy)],
+        cwd=work_dir, stdout=subprocess.DEVNULL, check=True)
+    return time.perf_counter() - start
+
+# time_import: time a fresh interpreter importing main and nothing else
+#   work_dir: (str) directory with config.py
+#   return: (float) seconds taken
+def time_import(work_dir):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-c', f'import sys; sys.path.insert(1, {os.path.abspath(ROOT)!r}); import main'],
+        cwd=work_dir, check=True)
+    return time.perf_counter() - start
+
+# main: compare time to first prompt of eager and lazy startups against stub APIs
+def main():
+    latency = 0.3
+    runs = 3
+    server, base_url = start_stub_server(latency=latency)
+    weather_server, future_url, past_url, calls = start_stub_weather(latency=latency)
+
+    # Fresh directory for each run so no page cache carries over
+    print(f'latency per page: {latency}s, best of {runs} runs')
+    print(f'{"startup":>10} {"seconds":>10}')
+    with tempfile.TemporaryDirectory() as base_dir:
+        for name, lazy in (('eager', False), ('lazy', True), ('import', None)):
+            best = None
+            for run in range(runs):
+                work_dir = os.path.join(base_dir, f'{name}{run}')
+                shutil.copytree(os.path.join(ROOT, 'data'), os.path.join(work_dir, 'data'),
+                    ignore=shutil.ignore_patterns('cache', 'weather.sqlite'))
+                shutil.copytree(os.path.join(ROOT, 'messages'), os.path.join(work_dir, 'messages'))
+                with open(os.path.join(work_dir, 'config.py'), 'w') as f:
+                    f.write(f'holidays_api = {base_url!r}\nweather_api_future = {future_url!r}\n'
+                        f'weather_api_past = {past_url!r}\nweather_headers = {{}}\n')
+                seconds = time_import(work_dir) if lazy == None else time_to_first_prompt(work_dir, lazy)
+                best = seconds if best == None else min(best, seconds)
+            print(f'{name:>10} {best:>10.3f}')
+    server.shutdown()
+    weather_server.shutdown()
+
+if __name__ == "__main__":
+    main()
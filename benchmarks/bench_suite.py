@@ -0,0 +1,231 @@
+import argparse
+from contextlib import redirect_stdout
+import gc
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import datetime as dt
+
+# Make the project root importable when run as `python benchmarks/bench_suite.py`
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from main import HolidayList
+from stub_server import render_page, start_stub_server
+
+# List sizes by the names given on the command line
+SIZES = {'1k': 1000, '100k': 100000, '1M': 1000000}
+
+# Paths the suite covers, in the order they run
+PATHS = ('readJSON', 'saveToJSON', 'findHoliday', 'filterHolidaysByWeek', 'displayHolidays', 'scrapeHolidays')
+
+# Calls made by each run of the paths that answer one query at a time
+QUERIES = 1000
+
+# Years of fixture pages the scrape reads
+SCRAPE_YEARS = range(2020, 2025)
+
+# make_holidays: build distinct (name, ordinal) holidays spread over about 55 years from 2000
+#   n: (int) number of holidays
+#   return: (list(tuple(str, int))) holidays
+def make_holidays(n):
+    start = dt.date(2000, 1, 1).toordinal()
+    return [(f'Holiday {i}', start + i % 20000) for i in range(n)]
+
+# write_fixtures: save holidays-table pages for the scrape to read through the stub server
+#   fixture_dir: (str) directory to write into
+def write_fixtures(fixture_dir):
+    for year in SCRAPE_YEARS:
+        with open(os.path.join(fixture_dir, f'{year}.html'), 'w', encoding='utf-8') as f:
+            f.write(render_page(year, per_day=4))
+
+# measure: time a path, then run it again under tracemalloc for its peak memory and allocations
+#   prepare: (function) returns a function that runs the path once and returns what it built; setup done here
+#       is not measured
+#   repeats: (int) timed runs; the fastest is kept
+#   return: (dict) seconds, peak_kb and blocks (memory blocks allocated by the run and still held by what it built)
+def measure(prepare, repeats):
+    best = None
+    for i in range(repeats):
+        run = prepare()
+        gc.collect()
+        start = time.perf_counter()
+        run()
+        seconds = time.perf_counter() - start
+        best = seconds if best == None else min(best, seconds)
+
+    run = prepare()
+    gc.collect()
+    blocks = sys.getallocatedblocks()
+    tracemalloc.start()
+    built = run()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    blocks = sys.getallocatedblocks() - blocks
+    del built
+    return {'seconds': best, 'peak_kb': peak / 1024, 'blocks': blocks}
+
+# bench_size: measure every path against a list of one size
+#   n: (int) size of the list
+#   engine: (str) storage engine
+#   work_dir: (str) directory for JSON files
+#   base_url: (str) stub server URL that years are appended to
+#   return: (list(dict)) one result per path
+def bench_size(n, engine, work_dir, base_url):
+    rows = make_holidays(n)
+    holidays = HolidayList(engine=engine)
+    holidays.addHolidays(rows)
+    json_loc = os.path.join(work_dir, f'holidays-{n}.json')
+    holidays.saveToJSON(json_loc)
+    repeats = 5 if n <= 1000 else (3 if n <= 100000 else 1)
+
+    # Queries pick holidays spread over the whole list; every other lookup misses
+    picks = [rows[i * len(rows) // QUERIES] for i in range(QUERIES)]
+    lookups = [(name if i % 2 == 0 else name + ' (missing)', dt.date.fromordinal(ordinal).isoformat())
+        for i, (name, ordinal) in enumerate(picks)]
+    weeks = [dt.date.fromordinal(ordinal).isocalendar()[:2] for name, ordinal in picks]
+
+    # readJSON builds a new list
+    def read():
+        loaded = HolidayList(engine=engine)
+        loaded.readJSON(json_loc)
+        return loaded
+
+    # displayHolidays prints; send it to a buffer
+    def display():
+        with redirect_stdout(io.StringIO()):
+            return [holidays.displayHolidays(holidays.filterHolidaysByWeek(year, week), should_print=True) for year, week in weeks]
+
+    # The scrape merges the fixture pages into a full list, as a startup scrape would
+    def scrape():
+        target = HolidayList(engine=engine)
+        target.addHolidays(rows)
+        return lambda: (target.scrapeHolidays(years=SCRAPE_YEARS, base_url=base_url), target)
+
+    paths = {
+        'readJSON': (lambda: read, 1),
+        'saveToJSON': (lambda: lambda: holidays.saveToJSON(os.path.join(work_dir, 'saved.json')), 1),
+        'findHoliday': (lambda: lambda: [holidays.findHoliday(name, date) for name, date in lookups], QUERIES),
+        'filterHolidaysByWeek': (lambda: lambda: [holidays.filterHolidaysByWeek(year, week) for year, week in weeks], QUERIES),
+        'displayHolidays': (lambda: display, QUERIES),
+        'scrapeHolidays': (scrape, 1),
+    }
+    results = []
+    for path in PATHS:
+        prepare, ops = paths[path]
+        result = measure(prepare, repeats)
+        results.append(dict(path=path, size=n, ops=ops, us_per_op=result['seconds'] / ops * 1e6, **result))
+    return results
+
+# git_commit: get the commit the tree is at, for labelling results
+#   return: (str) commit hash; None if git is unavailable
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+# run_suite: measure every path at every size and save the results
+#   sizes: (list(str)) size names from SIZES
+#   engine: (str) storage engine
+#   out: (str) JSON file to write the results to; None to only print them
+#   fixture_dir: (str) directory of saved pages named <year>.html; None to write stub pages to a temporary directory
+#   return: (dict) results with details of the run
+def run_suite(sizes, engine, out, fixture_dir=None):
+    with tempfile.TemporaryDirectory() as work_dir:
+        if (fixture_dir == None):
+            fixture_dir = work_dir
+            write_fixtures(fixture_dir)
+        server, base_url = start_stub_server(latency=0, fixture_dir=fixture_dir)
+        print(f'{"path":>22} {"size":>8} {"seconds":>10} {"us/op":>12} {"peak KB":>12} {"blocks":>10}')
+        results = []
+        try:
+            for size in sizes:
+                for result in bench_size(SIZES[size], engine, work_dir, base_url):
+                    results.append(result)
+                    print(f'{result["path"]:>22} {size:>8} {result["seconds"]:>10.4f} {result["us_per_op"]:>12.2f} '
+                        f'{result["peak_kb"]:>12.0f} {result["blocks"]:>10}')
+        finally:
+            server.shutdown()
+
+    report = {
+        'commit': git_commit(),
+        'when': dt.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'engine': engine,
+        'results': results,
+    }
+    if (out != None):
+        with open(out, 'w') as f:
+            json.dump(report, f, indent=2)
+    return report
+
+# compare: flag paths that got slower or used more memory between two runs
+#   NOTE: changes smaller than min_ms milliseconds or min_kb KB are ignored as noise, however large they are in percent
+#   base_loc: (str) JSON results of the earlier run
+#   new_loc: (str) JSON results of the later run
+#   threshold: (float) share a measurement may grow by before it is a regression, e.g. 0.2 for 20%
+#   min_ms: (float) smallest slowdown in milliseconds that can count as a regression
+#   min_kb: (float) smallest growth in peak memory in KB that can count as a regression
+#   return: (list(tuple(str, int, str))) (path, size, measurement) for each regression
+def compare(base_loc, new_loc, threshold, min_ms, min_kb):
+    with open(base_loc, 'r') as f:
+        base = {(result['path'], result['size']): result for result in json.load(f)['results']}
+    with open(new_loc, 'r') as f:
+        new = json.load(f)['results']
+
+    regressions = []
+    print(f'{"path":>22} {"size":>8} {"seconds":>10} {"change":>8} {"peak KB":>12} {"change":>8}')
+    for result in new:
+        old = base.get((result['path'], result['size']))
+        if (old == None):
+            continue
+        time_change = result['seconds'] / old['seconds'] - 1 if old['seconds'] > 0 else 0.0
+        memory_change = result['peak_kb'] / old['peak_kb'] - 1 if old['peak_kb'] > 0 else 0.0
+        flags = []
+        if (time_change > threshold and (result['seconds'] - old['seconds']) * 1000 >= min_ms):
+            flags.append('seconds')
+        if (memory_change > threshold and result['peak_kb'] - old['peak_kb'] >= min_kb):
+            flags.append('peak_kb')
+        regressions.extend((result['path'], result['size'], flag) for flag in flags)
+        print(f'{result["path"]:>22} {result["size"]:>8} {result["seconds"]:>10.4f} {time_change:>+8.0%} '
+            f'{result["peak_kb"]:>12.0f} {memory_change:>+8.0%}' + ('  REGRESSION' if flags else ''))
+    return regressions
+
+# main: run the suite, or compare two saved runs and exit with status 1 on any regression
+def main():
+    parser = argparse.ArgumentParser(prog='bench_suite.py', description='Benchmark suite for the main HolidayList paths.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    command = commands.add_parser('run', help='measure every path and save the results')
+    command.add_argument('--sizes', default='1k,100k,1M', help=f'comma-separated list sizes from {", ".join(SIZES)}')
+    command.add_argument('--engine', default='objects', help='storage engine of the lists')
+    command.add_argument('--out', default=None, help='JSON file to write the results to')
+    command.add_argument('--fixtures', default=None, help='directory of saved holidays pages named <year>.html')
+    command = commands.add_parser('compare', help='flag regressions between two saved runs')
+    command.add_argument('base', help='results of the earlier run')
+    command.add_argument('new', help='results of the later run')
+    command.add_argument('--threshold', type=float, default=0.2, help='share a measurement may grow by; default 0.2')
+    command.add_argument('--min-ms', type=float, default=5.0, help='smallest slowdown in milliseconds to flag; default 5')
+    command.add_argument('--min-kb', type=float, default=256.0, help='smallest growth in peak memory in KB to flag; default 256')
+    args = parser.parse_args()
+
+    if (args.command == 'run'):
+        sizes = [size.strip() for size in args.sizes.split(',')]
+        unknown = [size for size in sizes if size not in SIZES]
+        if (unknown):
+            parser.error(f'unknown sizes: {", ".join(unknown)}')
+        run_suite(sizes, args.engine, args.out, args.fixtures)
+    else:
+        regressions = compare(args.base, args.new, args.threshold, args.min_ms, args.min_kb)
+        if (regressions):
+            print(f'{len(regressions)} regression(s) beyond {args.threshold:.0%}!')
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import os
+import sys
+import tempfile
+import time
+
+# Make the project root importable when run as `python benchmarks/bench_sync.py`
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from main import HolidayList
+import pipeline
+from stub_server import render_page
+
+# A long window of years, as a daily refresh of many years would cover
+YEARS = range(1995, 2035)
+
+# write_pages: save a stub page for every year
+#   page_dir: (str) directory to write into
+#   per_day: (int) number of holidays on each day of the year
+#   return: (str) path template for pipeline.Source, with a {year} field
+def write_pages(page_dir, per_day):
+    for year in YEARS:
+        write_page(page_dir, year, render_page(year, per_day=per_day))
+    return os.path.join(page_dir, '{year}.html')
+
+# write_page: save one page
+#   page_dir: (str) directory to write into
+#   year: (int) year the page covers
+#   html: (str) text of the page
+def write_page(page_dir, year, html):
+    with open(os.path.join(page_dir, f'{year}.html'), 'w', encoding='utf-8') as f:
+        f.write(html)
+
+# timed_sync: sync a list and time it
+#   holidays: (HolidayList) list to sync
+#   source: (pipeline.Source) pages to sync from
+#   state: (pipeline.SyncState) state of the last sync, saved once the list has it; None to merge every page in full
+#   return: (tuple(float, pipeline.SyncReport)) seconds taken and what changed
+def timed_sync(holidays, source, state):
+    start = time.perf_counter()
+    run = holidays.ingestSources([source], state=state)
+    if (state != None):
+        state.save()
+    return time.perf_counter() - start, run.changes
+
+# main: compare full re-scrapes with incremental syncs over a long window; exits with status 1 if a sync
+#   leaves the list different from a full re-scrape
+def main():
+    per_day = 4
+    failed = False
+    print(f'{len(YEARS)} pages, {per_day} holidays a day')
+    print(f'{"run":>24} {"seconds":>10} {"pages":>8} {"skipped":>8} {"added":>8} {"removed":>8} {"unchanged":>10}')
+    with tempfile.TemporaryDirectory() as page_dir:
+        source = pipeline.Source('us', 'stub', write_pages(page_dir, per_day), tuple(YEARS))
+        state = pipeline.SyncState(os.path.join(page_dir, 'sync.json'))
+        synced = HolidayList(engine='columnar')
+
+        # A full scrape every time, against syncs that only touch what changed
+        runs = [('full re-scrape', None), ('first sync', state), ('sync, nothing changed', state)]
+        for label, run_state in runs:
+            holidays = synced if run_state != None else HolidayList(engine='columnar')
+            seconds, changes = timed_sync(holidays, source, run_state)
+            print(f'{label:>24} {seconds:>10.3f} {changes.pages:>8} {changes.skipped:>8} {changes.added:>8} {changes.removed:>8} {changes.unchanged:>10}')
+
+        # One year loses a holiday and gains another
+        html = render_page(2020, per_day=per_day)
+        html = html.replace('Stub Day 10-0<', 'Stub Day 10-0 (moved)<').replace('>Stub Day 11-1<', '>Renamed Day<')
+        write_page(page_dir, 2020, html)
+        seconds, changes = timed_sync(synced, source, pipeline.SyncState(os.path.join(page_dir, 'sync.json')))
+        print(f'{"sync, one page changed":>24} {seconds:>10.3f} {changes.pages:>8} {changes.skipped:>8} {changes.added:>8} {changes.removed:>8} {changes.unchanged:>10}')
+        if (changes.skipped != len(YEARS) - 1 or changes.added != 2 or changes.removed != 2):
+            failed = True
+
+        # The synced list must match a list scraped from scratch
+        fresh = HolidayList(engine='columnar')
+        fresh.ingestSources([source])
+        if (sorted(synced._rows()) != sorted(fresh._rows())):
+            print('Synced list differs from a full re-scrape!')
+            failed = True
+
+    if (failed):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+# Make the project root importable when run as `python benchmarks/bench_weather.py`
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from main import HolidayList
+from weather import WeatherProvider, WeatherStore, WeatherPrefetcher
+from stub_weather import start_stub_weather
+
+# bench_views: time weather views of a list of weeks
+#   holidays: (HolidayList) list to view weather through
+#   weeks: (list(tuple(str, int, int))) (label, ISO year, ISO week) to view
+#   calls: (dict) API call counts kept by the stub server
+def bench_views(holidays, weeks, calls):
+    print(f'{"view":>16} {"seconds":>10} {"calls":>10} {"days":>10}')
+    for label, year, week in weeks:
+        before = calls['forecast'] + calls['history']
+        start = time.perf_counter()
+        weather = holidays.getWeather(year, week)
+        seconds = time.perf_counter() - start
+        known = sum(1 for day_weather in weather.values() if day_weather != 'n/a')
+        print(f'{label:>16} {seconds:>10.3f} {calls["forecast"] + calls["history"] - before:>10} {known:>10}')
+
+# main: time the first and repeated current-week weather lookups against the stub API
+def main():
+    latency = 0.2
+    server, future_url, past_url, calls = start_stub_weather(latency=latency)
+    holidays = HolidayList()
+    holidays.weather_provider = WeatherProvider(future_url, past_url, {}, rate=50, burst=10)
+
+    print(f'latency per call: {latency}s')
+    print(f'{"view":>10} {"seconds":>10} {"calls":>10}')
+    for view in range(1, 4):
+        before = calls['forecast'] + calls['history']
+        start = time.perf_counter()
+        holidays.getWeather()
+        seconds = time.perf_counter() - start
+        print(f'{view:>10} {seconds:>10.3f} {calls["forecast"] + calls["history"] - before:>10}')
+
+    # With the prefetcher filling the store first, views of any week never call the API
+    print()
+    holidays = HolidayList()
+    holidays.weather_provider = WeatherProvider(future_url, past_url, {}, rate=50, burst=10)
+    holidays.weather_store = WeatherStore()
+    start = time.perf_counter()
+    saved = WeatherPrefetcher(holidays.weather_provider, holidays.weather_store).refresh()
+    print(f'prefetch: {saved} days in {time.perf_counter() - start:.3f}s')
+    today = datetime.today()
+    weeks = [('last week', *(today - timedelta(days=7)).isocalendar()[:2]),
+        ('this week', *today.isocalendar()[:2]),
+        ('next week', *(today + timedelta(days=7)).isocalendar()[:2]),
+        ('in 2 weeks', *(today + timedelta(days=14)).isocalendar()[:2]),
+        ('last year', today.isocalendar()[0] - 1, today.isocalendar()[1])]
+    bench_views(holidays, weeks, calls)
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import datetime as dt
+import hashlib
+import os
+import sys
+import threading
+import time
+
+# render_page: build a canned Time and Date holidays page for a year
+#   year: (int) year the page covers
+#   per_day: (int, def 1) number of holidays on each day of the year
+#   return: (str) HTML of the page
+def render_page(year, per_day=1):
+
+    rows = []
+    day = dt.date(year, 1, 1)
+    while (day.year == year):
+        for i in range(per_day):
+            rows.append(f'<tr id=tr{len(rows)+1} data-date={day.isoformat()} class=showrow><th class="nw" >{day.strftime("%b %d").replace(" 0", " ")}</th>'
+                f'<td class="nw" >{day.strftime("%A")}</td><td><a href=/holidays/us/day-{day.timetuple().tm_yday}-{i}>Stub Day {day.timetuple().tm_yday}-{i}</a></td>'
+                f'<td>Observance</td></tr>')
+        day += dt.timedelta(days=1)
+
+    # Season rows have no link, like the real pages
+    rows.append(f'<tr id=tr{len(rows)+1} class=showrow><th class="nw" >Mar 20</th><td class="nw" >Friday</td><td>March Equinox</td><td>Season</td></tr>')
+
+    return ('<html><body><table id="holidays-table" class="table"><thead><tr><th>Date</th><th>Weekday</th><th>Name</th><th>Type</th></tr></thead>'
+        f'<tbody>{"".join(rows)}</tbody></table><table id="other"><tbody><tr><th class="nw">Jan 1</th><td><a href="/">Unrelated</a></td></tr></tbody></table></body></html>')
+
+# start_stub_server: serve canned holidays pages on a local port in a background thread
+#   latency: (float, def 0.2) seconds to wait before answering each request
+#   per_day: (int, def 1) number of holidays on each day of the year
+#   port: (int, def 0) port to listen on; 0 picks a free port
+#   fixture_dir: (str, def None) directory of saved pages named <year>.html to serve instead of rendered ones
+#   return: (tuple(ThreadingHTTPServer, str)) running server and the base URL that years are appended to
+def start_stub_server(latency=0.2, per_day=1, port=0, fixture_dir=None):
+
+    class Handler(BaseHTTPRequestHandler):
+
+        # Answer /holidays/us/<year> with that year's page after the artificial latency
+        def do_GET(self):
+            time.sleep(latency)
+            try:
+                year = int(self.path.rstrip('/').split('/')[-1])
+                if (fixture_dir != None):
+                    with open(os.path.join(fixture_dir, f'{year}.html'), 'rb') as f:
+                        body = f.read()
+                else:
+                    body = render_page(year, per_day=per_day).encode()
+            except (ValueError, OSError):
+                self.send_error(404)
+                return
+
+            # Pages never change, so a matching ETag always gets a 304
+            etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+            if (self.headers.get('If-None-Match') == etag):
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.end_headers()
+                return
+
+            self.send_response(200)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        # Keep benchmark output clean
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_address[1]}/holidays/us/'
+
+if __name__ == "__main__":
+    server, base_url = start_stub_server(port=int(sys.argv[1]) if len(sys.argv) > 1 else 8000)
+    print(f'Serving stub holidays pages at {base_url}<year>')
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
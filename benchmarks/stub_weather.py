@@ -0,0 +1,49 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import json
+import threading
+import time
+
+# start_stub_weather: serve canned forecast and historical weather on a local port in a background thread
+#   latency: (float, def 0.2) seconds to wait before answering each request
+#   port: (int, def 0) port to listen on; 0 picks a free port
+#   return: (tuple(ThreadingHTTPServer, str, str, dict)) running server, forecast URL, historical URL,
+#       and a dict counting the calls to each
+def start_stub_weather(latency=0.2, port=0):
+
+    calls = {'forecast': 0, 'history': 0}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+
+        # Answer /forecast?cnt=N with N days, and /history?dt=T with that day's weather
+        def do_GET(self):
+            time.sleep(latency)
+            url = urlparse(self.path)
+            params = parse_qs(url.query)
+            if (url.path == '/forecast'):
+                with lock:
+                    calls['forecast'] += 1
+                data = {'list': [{'weather': [{'main': f'Forecast {i + 1}'}]} for i in range(int(params['cnt'][0]))]}
+            elif (url.path == '/history'):
+                with lock:
+                    calls['history'] += 1
+                data = {'current': {'weather': [{'main': time.strftime('Past %a', time.localtime(int(params['dt'][0])))}]}}
+            else:
+                self.send_error(404)
+                return
+            body = json.dumps(data).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        # Keep benchmark output clean
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f'http://127.0.0.1:{server.server_address[1]}'
+    return server, f'{base_url}/forecast', f'{base_url}/history', calls
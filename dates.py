@@ -0,0 +1,126 @@
+from datetime import date, datetime
+from functools import lru_cache
+import re
+
+import instrument
+
+# numpy_module: import NumPy on first use, since it is slow to import; NumPy is optional, so without it the column
+#   functions loop in pure Python
+#   return: (module) numpy; None if NumPy is not installed
+@lru_cache(maxsize=None)
+def numpy_module():
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+# Month numbers by the abbreviations '%b' dates use
+MONTHS = {'Jan': 1, 'Feb': 2, 'Mar': 3, 'Apr': 4, 'May': 5, 'Jun': 6,
+    'Jul': 7, 'Aug': 8, 'Sep': 9, 'Oct': 10, 'Nov': 11, 'Dec': 12}
+
+# Ordinal of 1970-01-01, where NumPy's datetime64 days start
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+# Ordinal of the last day a date can hold
+MAX_ORDINAL = date.max.toordinal()
+
+# Strings the fixed-width '%Y-%m-%d' parsers trust; NumPy also takes signs, year 0 and longer years, which date cannot
+ISO_PATTERN = re.compile(r'\d{4}-\d{2}-\d{2}')
+
+# iso_ordinal: convert a YYYY-MM-DD string into a proleptic Gregorian ordinal
+#   date_str: (str) date formatted as '%Y-%m-%d'
+#   return: (int) ordinal of the date
+def iso_ordinal(date_str):
+
+    # Fast path: fixed-width strings can be sliced directly
+    if (ISO_PATTERN.fullmatch(date_str)):
+        return date(int(date_str[:4]), int(date_str[5:7]), int(date_str[8:])).toordinal()
+
+    # Anything else goes through strptime, which also takes dates without leading zeros, such as '2024-7-4'
+    return datetime.strptime(date_str, '%Y-%m-%d').toordinal()
+
+# month_day_year_ordinal: convert a Time and Date style 'Jan 5, 2021' string into an ordinal without strptime
+#   date_str: (str) date formatted as '%b %d, %Y'
+#   return: (int) ordinal of the date
+def month_day_year_ordinal(date_str):
+    try:
+        month, day, year = date_str.split()
+        if (day[-1] != ','):
+            raise ValueError
+        return date(int(year), MONTHS[month], int(day[:-1])).toordinal()
+    except (KeyError, ValueError):
+        raise ValueError(f"time data '{date_str}' does not match format '%b %d, %Y'")
+
+# parse_ordinals: convert a whole column of date strings into ordinals at once
+#   NOTE: '%Y-%m-%d' is parsed by NumPy when it is installed, and '%b %d, %Y' through a month lookup table;
+#       other formats go through strptime one string at a time
+#   date_strs: (list(str)) dates, all in the same format
+#   date_format: (str, def '%Y-%m-%d') format of the dates
+#   strict: (bool, def True) True to raise ValueError on a bad date; False to give None for it instead
+#   return: (list(int)) ordinal of each date, in the same order
+@instrument.timed('dates.parse')
+def parse_ordinals(date_strs, date_format='%Y-%m-%d', strict=True):
+    instrument.count('dates.parsed', len(date_strs))
+
+    # Whole column through NumPy, trusted only when every string is fixed width and every day fits in a date; any
+    #   other column goes through the loop below, which finds the bad strings
+    np = numpy_module() if date_format == '%Y-%m-%d' and date_strs else None
+    if (np != None and all(ISO_PATTERN.fullmatch(date_str) for date_str in date_strs)):
+        try:
+            days = np.array(date_strs, dtype='datetime64[D]').astype('int64') + EPOCH_ORDINAL
+            if (days.min() >= 1 and days.max() <= MAX_ORDINAL):
+                return days.tolist()
+        except ValueError:
+            pass
+
+    # One string at a time, with the fastest parser for the format
+    if (date_format == '%Y-%m-%d'):
+        parse = iso_ordinal
+    elif (date_format == '%b %d, %Y'):
+        parse = month_day_year_ordinal
+    else:
+        parse = lambda date_str: datetime.strptime(date_str, date_format).toordinal()
+    if (strict):
+        return [parse(date_str) for date_str in date_strs]
+
+    # Bad dates become None
+    ordinals = []
+    for date_str in date_strs:
+        try:
+            ordinals.append(parse(date_str))
+        except ValueError:
+            ordinals.append(None)
+    return ordinals
+
+# iso_weeks: compute the ISO year and ISO week of a whole column of dates at once
+#   NOTE: matches date.isocalendar(); the ISO year is the year of the Thursday of the date's week
+#   ordinals: (list(int)) ordinals of the dates
+#   return: (tuple(list(int), list(int))) ISO year and ISO week of each date, in the same order
+def iso_weeks(ordinals):
+
+    # Vectorized: move each date to its week's Thursday, then count weeks from January 1 of that Thursday's year
+    np = numpy_module() if len(ordinals) > 0 else None
+    if (np != None):
+        days = np.asarray(ordinals, dtype='int64')
+        thursdays = days - (days - 1) % 7 + 3
+        years = (thursdays - EPOCH_ORDINAL).astype('datetime64[D]').astype('datetime64[Y]')
+        january_firsts = years.astype('datetime64[D]').astype('int64') + EPOCH_ORDINAL
+        return (years.astype('int64') + 1970).tolist(), ((thursdays - january_firsts) // 7 + 1).tolist()
+
+    # Pure Python: dates share few Thursdays, so each Thursday's year is only worked out once
+    years = []
+    weeks = []
+    thursday_years = {}
+    january_firsts = {}
+    for ordinal in ordinals:
+        thursday = ordinal - (ordinal - 1) % 7 + 3
+        year = thursday_years.get(thursday)
+        if (year == None):
+            year = date.fromordinal(thursday).year
+            thursday_years[thursday] = year
+            if (year not in january_firsts):
+                january_firsts[year] = date(year, 1, 1).toordinal()
+        years.append(year)
+        weeks.append((thursday - january_firsts[year]) // 7 + 1)
+    return years, weeks
@@ -0,0 +1,242 @@
+from functools import wraps
+import io
+import json
+import sys
+import threading
+import time
+
+# Off by default; every hook checks this first, so disabled hooks cost one global lookup
+ENABLED = False
+
+# Timings are bucketed by powers of two of microseconds; bucket i holds timings under 2**i us
+BUCKETS = 40
+
+_lock = threading.Lock()
+_timers = {} # name -> Histogram
+_counters = {} # name -> int
+
+# Histogram: count, total, extremes and power-of-two buckets of one timer
+class Histogram:
+
+    # Docstring
+    """
+    Histogram
+    --------
+    + count: int
+    + total: float
+    --------
+    __init__(): None
+    add(seconds): None
+    percentile(share): float
+    summary(): dict
+    Getters: count, total
+    """
+
+    # Initializer: starts empty
+    def __init__(self):
+        self._count = 0
+        self._total = 0.0
+        self._min = None
+        self._max = None
+        self._buckets = [0] * BUCKETS
+
+    # Count getter
+    @property
+    def count(self):
+        return self._count
+
+    # Total getter: seconds over every timing
+    @property
+    def total(self):
+        return self._total
+
+    # add: count one timing
+    #   seconds: (float) time taken
+    def add(self, seconds):
+        self._count += 1
+        self._total += seconds
+        self._min = seconds if self._min == None else min(self._min, seconds)
+        self._max = seconds if self._max == None else max(self._max, seconds)
+        self._buckets[min(int(seconds * 1e6).bit_length(), BUCKETS - 1)] += 1
+
+    # percentile: estimate a percentile from the buckets
+    #   share: (float) 0 to 1
+    #   return: (float) upper edge in seconds of the bucket the percentile falls in, capped at the largest timing
+    def percentile(self, share):
+        if (self._count == 0):
+            return 0.0
+        rank = share * self._count
+        seen = 0
+        for i, count in enumerate(self._buckets):
+            seen += count
+            if (seen >= rank and count > 0):
+                return min((2 ** i) / 1e6, self._max)
+        return self._max
+
+    # summary: describe the timings in milliseconds
+    #   return: (dict) count, total, mean, min, p50, p90, p99, max and the non-empty buckets by upper edge in us
+    def summary(self):
+        count = max(self._count, 1)
+        return {
+            'count': self._count,
+            'total_ms': self._total * 1e3,
+            'mean_ms': self._total / count * 1e3,
+            'min_ms': (self._min or 0.0) * 1e3,
+            'p50_ms': self.percentile(0.5) * 1e3,
+            'p90_ms': self.percentile(0.9) * 1e3,
+            'p99_ms': self.percentile(0.99) * 1e3,
+            'max_ms': (self._max or 0.0) * 1e3,
+            'buckets_us': {str(2 ** i): count for i, count in enumerate(self._buckets) if count > 0},
+        }
+
+# _Span: times the block it wraps and records it under a timer
+class _Span:
+
+    __slots__ = ('_name', '_start')
+
+    # Initializer: takes in the timer name
+    #   name: (str) timer to record under
+    def __init__(self, name):
+        self._name = name
+        self._start = 0.0
+
+    # __enter__: start the clock
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    # __exit__: record the time taken, letting any exception through
+    def __exit__(self, exc_type, exc, tb):
+        record(self._name, time.perf_counter() - self._start)
+        return False
+
+# _NoSpan: what span gives back while instrumentation is off; entering and leaving it does nothing
+class _NoSpan:
+
+    __slots__ = ()
+
+    # __enter__: do nothing
+    def __enter__(self):
+        return self
+
+    # __exit__: do nothing, letting any exception through
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+# Shared by every span taken while instrumentation is off
+NO_SPAN = _NoSpan()
+
+# enable: turn instrumentation on or off
+#   on: (bool, def True) True to record; False to make every hook a no-op
+def enable(on=True):
+    global ENABLED
+    ENABLED = on
+
+# reset: forget every timing and count
+def reset():
+    with _lock:
+        _timers.clear()
+        _counters.clear()
+
+# span: time a block of code under a timer, for use as `with instrument.span('name'):`
+#   name: (str) timer name, e.g. 'fetch'
+#   return: (context manager) records the time the block took; does nothing while instrumentation is off
+def span(name):
+    if (not ENABLED):
+        return NO_SPAN
+    return _Span(name)
+
+# timed: decorator that times every call of a function under a timer
+#   name: (str) timer name
+#   return: (function) decorator
+def timed(name):
+    def decorate(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if (not ENABLED):
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(name, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+# record: add one timing to a timer
+#   name: (str) timer name
+#   seconds: (float) time taken
+def record(name, seconds):
+    if (not ENABLED):
+        return
+    with _lock:
+        histogram = _timers.get(name)
+        if (histogram == None):
+            histogram = Histogram()
+            _timers[name] = histogram
+        histogram.add(seconds)
+
+# count: add to a counter
+#   name: (str) counter name, e.g. 'fetch.retries'
+#   amount: (int, def 1) amount to add
+def count(name, amount=1):
+    if (not ENABLED):
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+# stats: get everything recorded so far
+#   return: (dict) 'timers' -> name -> Histogram.summary(), and 'counters' -> name -> count
+def stats():
+    with _lock:
+        return {
+            'timers': {name: histogram.summary() for name, histogram in sorted(_timers.items())},
+            'counters': dict(sorted(_counters.items())),
+        }
+
+# dump: write the stats as JSON
+#   f_loc: (str) file to write
+def dump(f_loc):
+    with open(f_loc, 'w') as f:
+        json.dump(stats(), f, indent=2)
+
+# report: format the stats as a table
+#   return: (str) one line per timer and per counter
+def report():
+    data = stats()
+    out = io.StringIO()
+    out.write(f'{"timer":>24} {"count":>8} {"total ms":>10} {"mean ms":>10} {"p50 ms":>10} {"p99 ms":>10} {"max ms":>10}\n')
+    for name, summary in data['timers'].items():
+        out.write(f'{name:>24} {summary["count"]:>8} {summary["total_ms"]:>10.2f} {summary["mean_ms"]:>10.3f} '
+            f'{summary["p50_ms"]:>10.3f} {summary["p99_ms"]:>10.3f} {summary["max_ms"]:>10.3f}\n')
+    for name, value in data['counters'].items():
+        out.write(f'{name:>24} {value:>8}\n')
+    return out.getvalue()
+
+# run_profiled: run a function with cProfile, instrumentation or both switched on
+#   NOTE: files are written even if the function raises or exits
+#   func: (function) function to run, taking no arguments
+#   profile_loc: (str, def None) file to save the cProfile stats to, readable with pstats; None to not profile
+#   stats_loc: (str, def None) file to dump the instrumentation stats to as JSON; None to not instrument
+#   return: what func returns
+def run_profiled(func, profile_loc=None, stats_loc=None):
+    if (stats_loc != None):
+        enable()
+    profiler = None
+    if (profile_loc != None):
+        import cProfile
+        profiler = cProfile.Profile()
+    try:
+        if (profiler != None):
+            return profiler.runcall(func)
+        return func()
+    finally:
+
+        # Save the profile, and show where the time went
+        if (profiler != None):
+            import pstats
+            profiler.dump_stats(profile_loc)
+            pstats.Stats(profiler, stream=sys.stderr).sort_stats('cumulative').print_stats(20)
+        if (stats_loc != None):
+            dump(stats_loc)
+            sys.stderr.write(report())
@@ -1,14 +1,26 @@
+import argparse
+from collections import namedtuple
+from contextlib import contextmanager, redirect_stdout
 from datetime import datetime
 import datetime as dt
-import json
-from bs4 import BeautifulSoup
-import requests
-
-# Make sure to add config.py file
-from config import holidays_api
-from config import weather_api_future
-from config import weather_api_past
-from config import weather_headers
+import heapq
+import os
+import sys
+import threading
+
+import dates
+import instrument
+import persistence
+import pipeline
+import render
+import rules as rules_api
+import scraper
+import search
+import store
+import weather as weather_api
+from weather import WeatherProvider, WeatherError
+
+# NOTE: make sure to add config.py file; it is imported where the APIs are first used, so local commands run without it
 
 # int_input: used for integer inputs (PULLED FROM TOURNAMENT TRACKER ASSIGNMENT)
 #   minimum: (int, def -1) the minimum of acceptable range, inclusive; leave -1 no lower bound
@@ -55,6 +67,20 @@ def int_input(minimum=-1, maximum=-1, input_string="  Selection: "):
             print('\nPlease enter an integer!')
     return input_1
 
+# parse_date: convert a date string into a datetime, skipping strptime for plain ISO dates
+#   date_str: (str) string format of date
+#   date_format: (str, def '%Y-%m-%d') format of the date
+#   return: (datetime) parsed date
+def parse_date(date_str, date_format='%Y-%m-%d'):
+
+    # Fast path: fixed-width YYYY-MM-DD strings can be sliced directly
+    if (date_format == '%Y-%m-%d' and len(date_str) == 10 and date_str[4] == '-' and date_str[7] == '-'
+            and date_str[:4].isdigit() and date_str[5:7].isdigit() and date_str[8:].isdigit()):
+        return datetime(int(date_str[:4]), int(date_str[5:7]), int(date_str[8:]))
+
+    # Anything else goes through strptime
+    return datetime.strptime(date_str, date_format)
+
 # Holiday: Class to hold holidays, including name and date
 class Holiday:
 
@@ -66,6 +92,7 @@ class Holiday:
     + date: datetime
     --------
     __init__(name, date_str, date_format='%Y-%m-%d'): None
+    fromOrdinal(name, ordinal): Holiday
     __str__(): str
     Getters: name, date
     Setters: name, date
@@ -74,8 +101,19 @@ class Holiday:
     # Initializer: takes in holiday name and date and sets variables
     def __init__(self, name, date_str, date_format='%Y-%m-%d'):
         self._name = name
-        self._date = datetime.strptime(date_str, date_format)    
+        self._date = parse_date(date_str, date_format)
     
+    # fromOrdinal: make a holiday from a date ordinal, skipping the date string parse
+    #   name: (str) name of the holiday
+    #   ordinal: (int) proleptic Gregorian ordinal of the date
+    #   return: (Holiday) new holiday
+    @classmethod
+    def fromOrdinal(cls, name, ordinal):
+        holiday = cls.__new__(cls)
+        holiday._name = name
+        holiday._date = datetime.fromordinal(ordinal)
+        return holiday
+
     # String format: return name of holiday
     def __str__ (self):
         return self._name
@@ -104,30 +142,167 @@ class Holiday:
     def date(self, new_date_str, date_format):
         self._date = datetime.strptime(new_date_str, date_format)  
            
-class HolidayList:
+# ChangeReport: what a bulk change did; added and removed hold (name, 'YYYY-MM-DD') pairs, and skipped counts
+#   the holidays asked for that were left as they were
+ChangeReport = namedtuple('ChangeReport', ['added', 'removed', 'skipped'])
 
-    def __init__(self):
-        self._inner_holidays = []
+class HolidayList:
 
-    # inner_holidays getter
+    # Initializer: takes in the storage engine to keep holidays in
+    #   engine: (str) 'objects' to keep Holiday objects; 'columnar' to keep compact columns; default 'objects'
+    #   concurrent: (bool) True to answer reads from read-only snapshots without taking a lock; default False
+    #   NOTE: readSnapshot switches the list to the 'snapshot' engine
+    def __init__(self, engine='objects', concurrent=False):
+        if (engine not in store.ENGINES):
+            raise Exception(f'Unknown storage engine "{engine}"!')
+        self._engine = engine
+        self._store = store.ENGINES[engine]()
+        self._write_lock = threading.RLock() # held while the list is changed, read, or copied for a compaction
+        self._version = 0 # goes up by one with every change to the list
+        self._view = store.WeekView.build(self._store, 0) if concurrent else None # latest read-only snapshot, if reads are lock-free
+        self._pending = None # ordinals of days changed inside _bulk, published when it ends
+        self._name_index = None # name search index, built on the first search
+        self._origins = {} # (name, ordinal) -> set of (country, source) the holiday was ingested from
+        self._rules = rules_api.RuleSet() # recurring holidays, expanded only for the weeks and ranges asked for
+        self._render_cache = render.RenderCache() # formatted weeks shown by viewWeek, dropped week by week on changes
+        self._years = None # year -> number of holidays stored in it, counted on the first yearRange
+        self._log = None # append log of edits, once openLog has been called
+        self._snapshot_loc = None # snapshot the append log is folded into
+        self._snapshot_format = None # 'snapshot' for a binary snapshot, 'json' for a JSON file
+        self._compact_every = 0 # log records before a background compaction starts; 0 to never start one
+        self._compaction = None # thread of the running background compaction
+        self._weather_provider = None # weather lookups, created on first use so the cache lasts between views
+        self._weather_store = None # local weather table that views read from
+        self._weather_prefetcher = None # background thread that fills the weather table
+
+    # inner_holidays getter: in concurrent mode the holidays come week by week rather than in the order added
     @property
     def inner_holidays(self):
-        return self._inner_holidays
-   
-    # addHoliday: add holiday to holiday list
+        view = self._view
+        if (view != None):
+            return list(view)
+        with self._write_lock:
+            return list(self._store)
+
+    # engine getter
+    @property
+    def engine(self):
+        return self._engine
+
+    # version getter: changes whenever the list does, so anything built from the list can tell when it is out of date
+    @property
+    def version(self):
+        return self._version
+
+    # rules getter: recurring holidays, in the order added
+    @property
+    def rules(self):
+        return self._rules.rules
+
+    # rules_version getter: changes whenever the rules do, for anything cached from answers that include rule holidays
+    @property
+    def rules_version(self):
+        return self._rules.version
+
+    # render_cache getter: formatted weeks, for their stats and size limit
+    @property
+    def render_cache(self):
+        return self._render_cache
+
+    # concurrent getter: True when reads come from read-only snapshots without taking a lock
+    @property
+    def concurrent(self):
+        return self._view != None
+
+    # concurrent setter: turning it on makes the first snapshot; every change after that publishes a new one
+    @concurrent.setter
+    def concurrent(self, lock_free):
+        with self._write_lock:
+            if (lock_free and self._view == None):
+                self._view = store.WeekView.build(self._store, self._version)
+            elif (not lock_free):
+                self._view = None
+
+    # snapshot: get a read-only copy of the list that later changes do not touch, for several reads that must agree
+    #   NOTE: free in concurrent mode; otherwise the whole list is copied
+    #   return: (store.WeekView) snapshot with find, week, between, len and iteration
+    def snapshot(self):
+        view = self._view
+        if (view != None):
+            return view
+        with self._write_lock:
+            return store.WeekView.build(self._store, self._version)
+
+    # weather_provider getter
+    @property
+    def weather_provider(self):
+        if (self._weather_provider == None):
+            from config import weather_api_future, weather_api_past, weather_headers
+            self._weather_provider = WeatherProvider(weather_api_future, weather_api_past, weather_headers)
+        return self._weather_provider
+
+    # weather_provider setter
+    @weather_provider.setter
+    def weather_provider(self, provider):
+        self._weather_provider = provider
+
+    # weather_store getter
+    @property
+    def weather_store(self):
+        if (self._weather_store == None):
+            self._weather_store = weather_api.WeatherStore()
+        return self._weather_store
+
+    # weather_store setter
+    @weather_store.setter
+    def weather_store(self, new_store):
+        self._weather_store = new_store
+
+    # startWeatherPrefetch: keep the weather table filled in the background, so views never wait on the API
+    #   locations: (list(weather.Location)) places to keep weather for; default Minneapolis
+    #   interval: (float) seconds between refreshes; default 10 minutes
+    def startWeatherPrefetch(self, locations=(weather_api.MINNEAPOLIS,), interval=weather_api.FORECAST_TTL):
+        if (self._weather_prefetcher != None):
+            self._weather_prefetcher.stop()
+        self._weather_prefetcher = weather_api.WeatherPrefetcher(self.weather_provider, self.weather_store, locations, interval)
+        self._weather_prefetcher.start()
+
+    # stopWeatherPrefetch: stop the background weather refreshes and close the weather table
+    #   NOTE: waits for a refresh that is running to finish, so none is left fetching while the program shuts down
+    def stopWeatherPrefetch(self):
+        if (self._weather_prefetcher != None):
+            self._weather_prefetcher.stop()
+            self._weather_prefetcher = None
+        if (self._weather_store != None):
+            self._weather_store.close()
+            self._weather_store = None
+
+    # addHoliday: add holiday to holiday list; holidays already in the list are skipped
     #   holidayObj: (Holiday) instance of holiday to add
     #   verbose: (bool) whether or not to print out message; default False
+    #   return: (bool) True if the holiday was added; False if it was already in the list
     def addHoliday(self, holiday_obj, verbose=False):
         
         # Make sure the input holiday is a holiday object
-        if (type(holiday_obj) == Holiday):
-            
-                # Add holiday to holiday list
-                self._inner_holidays.append(holiday_obj)
-
-                # Print add message
+        if (isinstance(holiday_obj, Holiday)):
+
+            # Skip holidays that are already in the list
+            with self._write_lock:
+                added = self._store.add(holiday_obj)
+                if (added):
+                    self._changed([holiday_obj.date.toordinal()])
+                    self._trackRows(added=[(holiday_obj.name, holiday_obj.date.toordinal())])
+                if (added and self._log != None):
+                    self._logEdits([('add', holiday_obj.name, holiday_obj.date.toordinal())])
+            if (not added):
                 if (verbose):
-                    print(f'New holiday ("{holiday_obj}") added!\n')
+                    print(f'"{holiday_obj}" ({holiday_obj.date.date()}) is already in the list!\n')
+                return False
+
+            # Print add message
+            if (verbose):
+                print(f'New holiday ("{holiday_obj}") added!\n')
+            return True
 
         # If not holiday instance, throw an exception
         else:
@@ -138,168 +313,699 @@ class HolidayList:
     #   date_str: (str) string format of date
     #   date_format: (str) format of the date; default is '%Y-%m-%d'
     #   return: (Holiday) holiday object if found; None otherwise
+    @instrument.timed('find')
     def findHoliday(self, holiday_name, date_str, date_format='%Y-%m-%d'):
         
-        # Find holiday that matches name and date
-        date = datetime.strptime(date_str, date_format)
-        for holiday in self._inner_holidays:
-            if (holiday.name == holiday_name and holiday.date == date):
-                return holiday
-        
-        # Return none if no holiday found
-        return None
+        # Look up holiday that matches name and date in the index
+        date = parse_date(date_str, date_format)
+        view = self._view
+        if (view != None):
+            return view.find(holiday_name, date)
+        with self._write_lock:
+            return self._store.find(holiday_name, date)
     
+    # searchHolidays: find holidays by part of their name, for when the exact name is not known
+    #   NOTE: words may be partly typed or slightly misspelt; the name index is built on the first search
+    #       and kept up to date by every change after it
+    #   query: (str) words of the name to look for
+    #   limit: (int) most names to return; default 10
+    #   return: (list(Holiday)) holidays of the best matching names, best name first and each name's holidays by date
+    def searchHolidays(self, query, limit=10):
+        with self._write_lock:
+            if (self._name_index == None):
+                self._name_index = search.NameIndex()
+                for name, ordinal in self._store.rows():
+                    self._name_index.add(name, ordinal)
+            found = []
+            for hit in self._name_index.search(query, limit):
+                for ordinal in self._name_index.ordinals(hit.name):
+                    found.append(self._store.find(hit.name, datetime.fromordinal(ordinal)))
+            return found
+
     # removeHoliday: search and remove specific holiday in list
+    #   NOTE: the last holiday in the list takes the removed holiday's place, so list order is not preserved
     #   holiday_name: (str) name of the holiday
     #   date_str: (str) string format of date
     #   date_format: (str) format of the date; default is '%Y-%m-%d'
     #   verbose: (bool) whether or not to print out message; default False
+    #   return: (bool) True if a holiday was removed; False otherwise
     def removeHoliday(self, holiday_name, date_str, date_format='%Y-%m-%d', verbose=False):
 
-        # Find index of item
-        j = -1
-        date = datetime.strptime(date_str, date_format)
-        for i in range(len(self._inner_holidays)):
-            holiday = self._inner_holidays[i]
-            if (holiday.name == holiday_name and holiday.date == date):
-                j = i
-        
+        # Remove from the list, and record the edit if there is a log
+        date = parse_date(date_str, date_format)
+        with self._write_lock:
+            removed = self._store.remove(holiday_name, date)
+            if (removed):
+                self._changed([date.toordinal()])
+                self._trackRows(removed=[(holiday_name, date.toordinal())])
+            if (removed and self._log != None):
+                self._logEdits([('remove', holiday_name, date.toordinal())])
+
         # If never found, return error
-        if (j == -1):
+        if (not removed):
             if (verbose):
                 print(f'Holiday ("{holiday_name}", "{date_str}") could not be found, so no holiday has been deleted!')
+            return False
         
-        # Delete object
-        else:
-            self._inner_holidays.pop(j)
-            if (verbose):
-                print(f'Holiday ("{holiday_name}", "{date_str}") has been deleted!')
-
-    # readJSON: read in holiday data as JSON format and save to _inner_holidays
+        if (verbose):
+            print(f'Holiday ("{holiday_name}", "{date_str}") has been deleted!')
+        return True
+
+    # addHolidays: add many holidays as one change; holidays repeated in the input or already in the list are skipped
+    #   holidays: (iterable) Holiday objects, or (name, date) tuples with the date as a string, date, datetime or ordinal
+    #   date_format: (str) format of string dates; default is '%Y-%m-%d'
+    #   return: (ChangeReport) holidays added, and the number skipped
+    def addHolidays(self, holidays, date_format='%Y-%m-%d'):
+        rows = self._toRows(holidays, date_format)
+        return self._report(self._addRows(rows), [], len(rows))
+
+    # removeHolidays: remove many holidays as one change; holidays not in the list are skipped
+    #   NOTE: removing a large share of the list rebuilds it in one pass; list order is not preserved
+    #   holidays: (iterable) Holiday objects, or (name, date) tuples with the date as a string, date, datetime or ordinal
+    #   date_format: (str) format of string dates; default is '%Y-%m-%d'
+    #   return: (ChangeReport) holidays removed, and the number skipped
+    def removeHolidays(self, holidays, date_format='%Y-%m-%d'):
+        rows = self._toRows(holidays, date_format)
+        return self._report([], self._removeRows(rows), len(rows))
+
+    # merge: combine another list into this one as a set operation, in one change
+    #   other: (HolidayList) list to merge in; it is not changed
+    #   how: (str) 'union' to add the other list's holidays; 'intersection' to keep only holidays in both lists;
+    #       'difference' to remove the other list's holidays; default 'union'
+    #   return: (ChangeReport) holidays added or removed, and the number of holidays that were left as they were
+    def merge(self, other, how='union'):
+        if (how not in ('union', 'intersection', 'difference')):
+            raise Exception(f'Unknown merge "{how}"!')
+        if (not isinstance(other, HolidayList)):
+            raise Exception("Can only merge another HolidayList!")
+
+        # Copy the other list first, so the two lists' locks are never held together
+        other_rows = other._rows()
+        if (how == 'union'):
+            return self._report(self._addRows(other_rows), [], len(other_rows))
+        if (how == 'difference'):
+            return self._report([], self._removeRows(other_rows), len(other_rows))
+
+        # Intersection drops everything the other list does not have, reading and removing in one hold of the lock
+        with self._write_lock:
+            keep = set(other_rows)
+            mine = list(self._store.rows())
+            return self._report([], self._removeRows([row for row in mine if row not in keep]), len(mine))
+
+    # readJSON: read in holiday data as JSON format and add it to the list
+    #   NOTE: the file is streamed, so only one batch of records is held in memory at a time
     #   f_loc: (str) location of JSON file
-    def readJSON(self, f_loc):
-
-        # Read in data from json file location
-        with open(f_loc, 'r') as f:
-            data = json.load(f)['holidays']
+    #   batch_size: (int) number of records added at a time; default 10000
+    def readJSON(self, f_loc, batch_size=10000):
 
-            # Iterate through each JSON obj and create a new holiday
-            for holiday_json in data:
-                holiday = Holiday(holiday_json['name'], holiday_json['date'])
-                self.addHoliday(holiday)
+        # Read in data from json file location one batch at a time, parsing each batch's dates as one column
+        with instrument.span('json.load'):
+            for batch in persistence.batched(persistence.iter_holidays_json(f_loc), batch_size):
+                ordinals = dates.parse_ordinals([date for name, date in batch])
+                self._addRows([(name, ordinal) for (name, date), ordinal in zip(batch, ordinals)])
 
-    # saveToJSON: save JSON file with holidays
+    # saveToJSON: save JSON file with holidays, in the same {"holidays": [...]} layout that readJSON reads
     #   f_loc: (str) location and name of file to save
     #   date_format: (str) format of the date; default is '%Y-%m-%d'
     def saveToJSON(self, f_loc, date_format='%Y-%m-%d'):
 
-        # Convert data into dictionary format
-        holiday_dict = []
-        for holiday in self._inner_holidays:
-            this_holiday = dict()
-            this_holiday['name'] = holiday.name
-            this_holiday['date'] = holiday.date.strftime(date_format)
-            holiday_dict.append(this_holiday)
-
-        # Write file
-        with open(f_loc, 'w') as f:
-            json.dump(holiday_dict, f)
-    
+        # Copy the records first so a background scrape is not held up while the file is written
+        with instrument.span('json.save'):
+            with self._write_lock:
+                records = list(self._store.records(date_format))
+            persistence.write_json(f_loc, records)
+
+    # exportRecords: get every holiday as a (name, date) record, rule holidays included
+    #   NOTE: rules go on forever, so their holidays are only given for some years; a rule holiday also stored in the
+    #       list is only given once
+    #   date_format: (str) format of the dates; default is '%Y-%m-%d'
+    #   years: (range) years to give rule holidays for; default None for the years given by yearRange, or the current
+    #       year if it gives none
+    #   return: (generator) (name, date_str) for each stored holiday in the order kept, then each rule holiday by date
+    def exportRecords(self, date_format='%Y-%m-%d', years=None):
+
+        # Copy the records first so a background scrape is not held up while they are written out
+        with self._write_lock:
+            records = list(self._store.records(date_format))
+        yield from records
+        if (len(self._rules) == 0):
+            return
+
+        if (years == None):
+            first, last = self.yearRange()
+            if (first == None):
+                first = last = datetime.today().year
+            years = range(first, last + 1)
+        if (len(years) == 0):
+            return
+        start = dt.date(years[0], 1, 1).toordinal()
+        end = dt.date(years[-1], 12, 31).toordinal() + 1
+        for ordinal, name in self._rules.between(start, end):
+            day = datetime.fromordinal(ordinal)
+            with self._write_lock:
+                stored = self._store.find(name, day) != None
+            if (not stored):
+                yield (name, day.strftime(date_format))
+
+    # saveSnapshot: save holidays to a binary snapshot file that readSnapshot can map straight into memory
+    #   f_loc: (str) location and name of file to save
+    def saveSnapshot(self, f_loc):
+        with self._write_lock:
+            rows = list(self._store.rows())
+        persistence.write_snapshot(f_loc, rows)
+
+    # readSnapshot: serve holidays from a binary snapshot file without reading the whole file in
+    #   NOTE: holidays already in the list are kept; later edits are held in memory alongside the snapshot
+    #   f_loc: (str) location of snapshot file
+    def readSnapshot(self, f_loc):
+
+        # Switch to the snapshot and carry over anything already in the list
+        with self._write_lock:
+            old_store = self._store
+            self._store = store.SnapshotStore(persistence.Snapshot(f_loc))
+            self._engine = 'snapshot'
+            self._store.addRows(old_store.rows())
+            self._changed()
+
+    # openLog: keep the list in a snapshot plus an append log, so each edit is saved as it happens
+    #   NOTE: the snapshot and any log left by an earlier run are loaded first; holidays already in the
+    #       list are then folded into a new snapshot so nothing is lost, as is a log left at least compact_every
+    #       records long by earlier runs
+    #   snapshot_loc: (str) location of the snapshot; log segments are kept beside it
+    #   sync: (bool) True to fsync each edit before returning; default True
+    #   compact_every: (int) log records before a background compaction starts; 0 to never start one; default 10000
+    #   snapshot_format: (str) 'snapshot' to keep the holidays in a binary snapshot; 'json' to keep them in a JSON file
+    #       that readJSON can read, as the menu does; default 'snapshot'
+    def openLog(self, snapshot_loc, sync=True, compact_every=10000, snapshot_format='snapshot'):
+        if (snapshot_format not in ('snapshot', 'json')):
+            raise Exception(f'Unknown snapshot format "{snapshot_format}"!')
+        with self._write_lock:
+            had_holidays = len(self._store) > 0
+
+            # Load the last snapshot and replay the edits made since
+            with self._bulk():
+                if (os.path.exists(snapshot_loc) and snapshot_format == 'json'):
+                    self.readJSON(snapshot_loc)
+                elif (os.path.exists(snapshot_loc)):
+                    self.readSnapshot(snapshot_loc)
+                log = persistence.AppendLog(snapshot_loc, sync=sync)
+                for op, name, ordinal in log.replay():
+                    if (op == 'add'):
+                        self._addRows([(name, ordinal)])
+                    elif (self._store.remove(name, datetime.fromordinal(ordinal))):
+                        self._changed([ordinal])
+                        self._trackRows(removed=[(name, ordinal)])
+
+            self._log = log
+            self._snapshot_loc = snapshot_loc
+            self._snapshot_format = snapshot_format
+            self._compact_every = compact_every
+            if (had_holidays or self._logFull()):
+                self.compact()
+
+    # compact: fold the append log into a new snapshot, or a new JSON file for a log opened with snapshot_format 'json'
+    #   background: (bool) True to write the snapshot in a separate thread; default False
+    def compact(self, background=False):
+        if (self._log == None):
+            raise Exception("No append log is open!")
+
+        # Seal the log and copy the list at the same moment, so every sealed edit is in the copy
+        with self._write_lock:
+            if (self._compaction != None and self._compaction.is_alive()):
+                if (background):
+                    return
+                self._compaction.join()
+            sealed = self._log.rotate()
+            rows = list(self._store.rows())
+
+        # Write the new snapshot, then drop the sealed segments it replaces
+        def fold():
+            if (self._snapshot_format == 'json'):
+                persistence.write_json(self._snapshot_loc, ((name, dt.date.fromordinal(ordinal).isoformat()) for name, ordinal in rows))
+            else:
+                persistence.write_snapshot(self._snapshot_loc, rows)
+            self._log.drop(sealed)
+
+        if (background):
+            self._compaction = threading.Thread(target=fold, daemon=True)
+            self._compaction.start()
+        else:
+            fold()
+
+    # closeLog: wait for any compaction and close the append log, first folding it into the snapshot if it has reached
+    #   compact_every records, counting those left by earlier runs
+    #   compact: (bool) True to fold in whatever the log holds, however short; default False
+    def closeLog(self, compact=False):
+        if (self._log != None and (self._logFull() or (compact and self._log.count > 0))):
+            self.compact()
+        if (self._compaction != None):
+            self._compaction.join()
+        with self._write_lock:
+            if (self._log != None):
+                self._log.close()
+                self._log = None
+
+    # _addRows: add (name, ordinal) rows as one change, recording them in the log if there is one
+    #   rows: (list(tuple(str, int))) rows to add
+    #   return: (list(tuple(str, int))) rows that were added, in the order given
+    def _addRows(self, rows):
+        with self._write_lock:
+
+            # Object lists need a Holiday for each row
+            with instrument.span('dedup'):
+                if (self._engine == 'objects'):
+                    flags = self._store.addMany([Holiday.fromOrdinal(name, ordinal) for name, ordinal in rows])
+                    added = [row for row, flag in zip(rows, flags) if flag]
+                else:
+                    added = [(name, ordinal) for name, ordinal in rows if self._store.addRow(name, ordinal)]
+            instrument.count('dedup.added', len(added))
+            instrument.count('dedup.skipped', len(rows) - len(added))
+
+            if (added):
+                self._changed([ordinal for name, ordinal in added])
+                self._trackRows(added=added)
+            if (added and self._log != None):
+                self._logEdits([('add', name, ordinal) for name, ordinal in added])
+            return added
+
+    # _removeRows: remove (name, ordinal) rows as one change, recording them in the log if there is one
+    #   rows: (list(tuple(str, int))) rows to remove
+    #   return: (list(tuple(str, int))) rows that were removed
+    def _removeRows(self, rows):
+        with self._write_lock:
+            removed = self._store.removeRows(rows)
+            if (removed):
+                self._changed([ordinal for name, ordinal in removed])
+                self._trackRows(removed=removed)
+            if (removed and self._log != None):
+                self._logEdits([('remove', name, ordinal) for name, ordinal in removed])
+            return removed
+
+    # _rows: get every holiday as a (name, ordinal) row
+    #   return: (list(tuple(str, int))) rows of the list
+    def _rows(self):
+        with self._write_lock:
+            return list(self._store.rows())
+
+    # _toRows: turn holidays given in any of the accepted forms into (name, ordinal) rows
+    #   holidays: (iterable) Holiday objects, or (name, date) tuples with the date as a string, date, datetime or ordinal
+    #   date_format: (str) format of string dates
+    #   return: (list(tuple(str, int))) rows in the order given
+    def _toRows(self, holidays, date_format):
+        names = []
+        values = []
+        for holiday in holidays:
+            if (isinstance(holiday, tuple) and len(holiday) == 2):
+                names.append(holiday[0])
+                values.append(holiday[1])
+            elif (hasattr(holiday, 'name') and hasattr(holiday, 'date')):
+                names.append(holiday.name)
+                values.append(holiday.date)
+            else:
+                raise Exception("Holidays must be Holiday objects or (name, date) tuples!")
+
+        # String dates are parsed together as one column
+        positions = [i for i, date in enumerate(values) if type(date) == str]
+        for i, ordinal in zip(positions, dates.parse_ordinals([values[i] for i in positions], date_format)):
+            values[i] = ordinal
+
+        # Anything else must already be a day
+        rows = []
+        for name, date in zip(names, values):
+            if (type(date) == int):
+                rows.append((name, date))
+            elif (isinstance(date, dt.date)):
+                rows.append((name, date.toordinal()))
+            else:
+                raise Exception(f'Date of "{name}" must be a string, date, datetime or ordinal!')
+        return rows
+
+    # _report: describe a bulk change
+    #   added: (list(tuple(str, int))) rows added
+    #   removed: (list(tuple(str, int))) rows removed
+    #   received: (int) number of holidays asked for
+    #   return: (ChangeReport) report with dates formatted as '%Y-%m-%d'
+    def _report(self, added, removed, received):
+        return ChangeReport([(name, dt.date.fromordinal(ordinal).isoformat()) for name, ordinal in added],
+            [(name, dt.date.fromordinal(ordinal).isoformat()) for name, ordinal in removed],
+            received - len(added) - len(removed))
+
+    # _changed: count a change to the list, and publish a new snapshot if reads are lock-free
+    #   NOTE: called with the write lock held, once per change, so a bulk change is published all at once; a change
+    #       that could touch any day, such as a reload, drops the year counts and the name search index, which are
+    #       rebuilt when next used
+    #   ordinals: (iterable(int)) ordinals of the days that changed; None if any day could have
+    def _changed(self, ordinals=None):
+        self._version += 1
+        if (ordinals == None):
+            self._render_cache.clear(self._version)
+            self._years = None
+            self._name_index = None
+        else:
+            self._render_cache.invalidate({render.week_of(ordinal) for ordinal in ordinals}, self._version)
+        if (self._view != None):
+            if (ordinals != None and self._pending != None):
+                self._pending.update(ordinals)
+            elif (ordinals == None):
+                self._view = store.WeekView.build(self._store, self._version)
+            else:
+                self._view = self._view.changed(self._store, ordinals, self._version)
+
+    # _trackRows: keep the name search index, the year counts and the holiday origins up to date with a change
+    #   NOTE: called with the write lock held
+    #   added: (list(tuple(str, int))) rows that were added
+    #   removed: (list(tuple(str, int))) rows that were removed
+    def _trackRows(self, added=(), removed=()):
+        for row in removed:
+            self._origins.pop(row, None)
+        if (self._years != None):
+            for name, ordinal in added:
+                year = dt.date.fromordinal(ordinal).year
+                self._years[year] = self._years.get(year, 0) + 1
+            for name, ordinal in removed:
+                year = dt.date.fromordinal(ordinal).year
+                self._years[year] -= 1
+                if (self._years[year] == 0):
+                    del self._years[year]
+        if (self._name_index == None):
+            return
+        for name, ordinal in added:
+            self._name_index.add(name, ordinal)
+        for name, ordinal in removed:
+            self._name_index.remove(name, ordinal)
+
+    # _bulk: hold the write lock for a group of changes, and publish them as one snapshot once they are all made
+    @contextmanager
+    def _bulk(self):
+        with self._write_lock:
+            if (self._pending != None):
+                yield
+                return
+            self._pending = set()
+            try:
+                yield
+            finally:
+                pending = self._pending
+                self._pending = None
+                if (self._view != None and pending):
+                    self._view = self._view.changed(self._store, pending, self._version)
+
+    # _logEdits: append edits to the log, starting a background compaction once the log is long enough
+    #   records: (list(tuple(str, str, int))) (op, name, ordinal) for each edit
+    def _logEdits(self, records):
+        self._log.appendMany(records)
+        if (self._logFull()):
+            self.compact(background=True)
+
+    # _logFull: check whether the append log, counting records left by earlier runs, is long enough to compact
+    #   return: (bool) True if it holds at least compact_every records
+    def _logFull(self):
+        return self._compact_every > 0 and self._log.count >= self._compact_every
+
     # scrapeHolidays: used to scrape holidays from TimeAndDate holidays API
     #   verbose: (bool) whether or not to print out message; default False
+    #   years: (iterable(int)) years to scrape; default is 2 years back to 2 years forward
+    #   workers: (int) number of years fetched at the same time; default 5
+    #   timeout: (float) seconds to wait on each request; default 10
+    #   retries: (int) number of retries for each year; default 2
+    #   base_url: (str) URL that the year is appended to; default is holidays_api
+    #   cache: (scraper.PageCache) on-disk cache of the pages; default None to always download
+    #   parser: (str) parser backend from scraper.PARSERS; default 'regex'
+    #   processes: (int) worker processes to parse pages in, for long backfills; default 0 to parse in the fetching threads
     #   NOTE: URL of website should be saved in the config.py file as holiday_api
-    def scrapeHolidays(self, verbose=False):
+    #   return: (int) number of holidays added
+    @instrument.timed('scrape')
+    def scrapeHolidays(self, verbose=False, years=None, workers=5, timeout=10, retries=2, base_url=None, cache=None, parser='regex',
+            processes=0):
 
         # Get 5 year period
-        for year in range(int(datetime.today().year)-2, int(datetime.today().year)+3):
-
-            try:
-
-                # Make connection
-                connection = requests.get(holidays_api + str(year))
-
-                # Pass into beautiful Soup
-                soup = BeautifulSoup(connection.text,'html.parser')
-                table = soup.find('table', attrs={'id':'holidays-table'})
-                table_data = table.find('tbody')
-                
-                # Iterate through each holiday
-                for datum in table_data.find_all_next('tr'):
-                    
-                    # Surround in try-except block to try to get as many data as possible
-                    try:
-
-                        # Get the date
-                        date_str = str(datum.find('th', attrs={'class': 'nw'}))
-                        date = f'{date_str[date_str.index("nw")+4 : date_str.index("</th>")]}, {year}'
-
-                        # Get the holiday
-                        holiday_str = str(datum.find('a'))
-                        holiday = holiday_str[holiday_str.index('>')+1:]
-                        holiday = holiday[:holiday.index('<')]
-
-                        # Add holiday to list
-                        if (self.findHoliday(holiday, date, date_format='%b %d, %Y') == None):
-                            this_holiday = Holiday(holiday, date, date_format='%b %d, %Y')
-                            self._inner_holidays.append(this_holiday)
+        if (years == None):
+            years = range(int(datetime.today().year)-2, int(datetime.today().year)+3)
+        if (base_url == None):
+            from config import holidays_api
+            base_url = holidays_api
+
+        # Merge each year as soon as it has been fetched and parsed
+        added = 0
+        for year, rows, failed, error in scraper.scrape_years(base_url, years, workers=workers,
+                timeout=timeout, retries=retries, cache=cache, parser=parser, processes=processes):
+
+            # Throw a connection error if arrises; on stderr, since a background scrape prints while the menu is in use
+            if (error != None):
+                print('Connection error! Please check your connection!', file=sys.stderr)
+                continue
+
+            # Rows that could not be formed into holidays, bad dates included
+            if (verbose):
+                for i in range(failed):
+                    print('A holiday could not be added!')
 
-                            # Print success message
-                            if (verbose):
-                                print(f'"{holiday}" ({date}) has been added!')
+            # Rows come with their dates already parsed; merge the year as one change so readers see all of it at once
+            merged = set(self._addRows(rows))
+            added += len(merged)
 
-                        # Add message if holiday is already in list
-                        else:
-                            if (verbose):
-                                print(f'"{holiday}" ({date}) is already in the list!')
-                    
-                    # Rows that could not be formed into holidays
-                    except:
-                        if (verbose):
-                            print('A holiday could not be added!')  
-            
-            # Throw a connection error if arrises
-            except:
-                print('Connection error! Please check your connection!')
+            # Report on each holiday
+            if (verbose):
+                for holiday, ordinal in rows:
+                    date = datetime.fromordinal(ordinal).strftime('%b %d, %Y')
+                    if ((holiday, ordinal) in merged):
+                        print(f'"{holiday}" ({date}) has been added!')
+                    else:
+                        print(f'"{holiday}" ({date}) is already in the list!')
+        return added
+
+    # ingestSources: read holidays from many countries and sources through the ingestion pipeline
+    #   NOTE: each page is merged as one change as soon as it is ready; holidays already in the list are kept,
+    #       and every holiday read is tagged with its country and source, see originsOf
+    #   NOTE: with a state, only pages that changed since the last sync are parsed, and only the holidays they
+    #       gained or lost are added or removed, so holidays deleted from the list stay deleted
+    #   sources: (iterable(pipeline.Source)) countries and years to read, e.g. from pipeline.make_sources
+    #   verbose: (bool) whether or not to print out a report of each stage; default False
+    #   state: (pipeline.SyncState) fingerprints and rows from the last sync, updated but not saved; save it once the
+    #       list is saved, or the next sync skips pages whose holidays were never saved; default None to merge every
+    #       page in full
+    #   pipeline_args: workers, queue size, timeout, retries, cache and parser, as taken by pipeline.Pipeline
+    #   return: (pipeline.Pipeline) finished pipeline, with a report and the failures of each stage and what changed
+    def ingestSources(self, sources, verbose=False, state=None, **pipeline_args):
+
+        # Merge a page as one change, tagging holidays that were already in the list as well as new ones
+        def merge(rows, removed):
+            with self._bulk():
+                added = self._addRows([(row.name, row.ordinal) for row in rows])
+                removed = self._removeRows(removed) if removed else []
+                for row in rows:
+                    self._origins.setdefault((row.name, row.ordinal), set()).add((row.country, row.source))
+            return len(added), len(removed)
+
+        run = pipeline.Pipeline(sources, merge, state=state, **pipeline_args)
+        run.run()
+
+        # Report on each stage
+        if (verbose):
+            for stage, country, year, error in run.failures:
+                print(f'Could not {stage} {country} {year}: {error}')
+            changes = run.changes
+            if (state != None):
+                print(f'Synced {changes.pages} pages ({changes.skipped} unchanged): {changes.added} holidays added, '
+                    f'{changes.removed} removed, {changes.unchanged} unchanged')
+            for report in run.reports:
+                print(f'{report.stage}: {report.items} pages, {report.rows} rows in {report.seconds:.2f}s, {report.busy:.2f}s busy ({report.rate:.0f} rows/s)')
+        return run
+
+    # syncHolidays: bring the list up to date with the holidays pages, parsing only pages that changed since the last sync
+    #   NOTE: a refresh where nothing changed costs one fetch and one hash per page
+    #   state: (pipeline.SyncState) fingerprints and rows from the last sync of this list, updated but not saved; save it
+    #       once the list is saved
+    #   verbose: (bool) whether or not to print out what changed; default False
+    #   years: (iterable(int)) years to sync; default is 2 years back to 2 years forward
+    #   base_url: (str) URL that the year is appended to; default is holidays_api
+    #   pipeline_args: workers, queue size, timeout, retries, cache and parser, as taken by pipeline.Pipeline
+    #   return: (pipeline.SyncReport) pages skipped, and holidays added, removed and left unchanged
+    def syncHolidays(self, state, verbose=False, years=None, base_url=None, **pipeline_args):
+        if (years == None):
+            years = range(int(datetime.today().year)-2, int(datetime.today().year)+3)
+        if (base_url == None):
+            from config import holidays_api
+            base_url = holidays_api
+        source = pipeline.Source('us', 'holidays_api', base_url.replace('{', '{{').replace('}', '}}') + '{year}', tuple(years))
+        return self.ingestSources([source], verbose=verbose, state=state, **pipeline_args).changes
+
+    # originsOf: get the countries and sources a holiday was ingested from
+    #   holiday_name: (str) name of the holiday
+    #   date_str: (str) string format of date
+    #   date_format: (str) format of the date; default is '%Y-%m-%d'
+    #   return: (list(tuple(str, str))) (country, source) pairs, sorted; empty if it was not ingested
+    def originsOf(self, holiday_name, date_str, date_format='%Y-%m-%d'):
+        ordinal = parse_date(date_str, date_format).toordinal()
+        with self._write_lock:
+            return sorted(self._origins.get((holiday_name, ordinal), ()))
+
+    # scrapeInBackground: scrape holidays in a separate thread, merging them in while the list is in use
+    #   on_done: (function) called with the number of holidays added once the scrape is finished; default None
+    #   scrape_args: arguments passed on to scrapeHolidays
+    #   return: (threading.Thread) thread doing the scrape
+    def scrapeInBackground(self, on_done=None, **scrape_args):
+
+        # Every merge goes through addHoliday, which holds the write lock, so reads see each holiday whole
+        def scrape():
+            added = self.scrapeHolidays(**scrape_args)
+            if (on_done != None):
+                on_done(added)
+
+        thread = threading.Thread(target=scrape, daemon=True)
+        thread.start()
+        return thread
 
     # numHolidays(): get the number of holidays
     #   return: (str) the count of holidays contained in project
     def numHolidays(self):
-        return len(self._inner_holidays)
+        view = self._view
+        if (view != None):
+            return len(view)
+        return len(self._store)
     
-    # filterHolidaysByWeek: get the holidays of a certain week in a certain year
-    #   year: (int) year of the holidays
-    #   week_number: (int) week number (range is 1 to 52, inclusive)
-    #   return: (list(Holiday)) holidays withing that timeframe
-    def filterHolidaysByWeek(self, year, week_number):
+    # addRule: add a recurring holiday, which shows up in week and range queries without being stored once a year
+    #   NOTE: findHoliday, removeHoliday, numHolidays and the saved JSON only cover the holidays stored in the list
+    #   rule: (rules.Rule) rule to add, e.g. rules.nth_weekday('Thanksgiving Day', 11, 3, 4)
+    #   return: (bool) True if it was added; False if the same rule was already there
+    def addRule(self, rule):
+        with self._write_lock:
+            added = self._rules.add(rule)
+            if (added):
+                self._rulesChanged()
+            return added
+
+    # removeRule: remove every rule for a holiday name
+    #   holiday_name: (str) name of the holiday
+    #   return: (int) number of rules removed
+    def removeRule(self, holiday_name):
+        with self._write_lock:
+            removed = self._rules.remove(holiday_name)
+            if (removed > 0):
+                self._rulesChanged()
+            return removed
+
+    # readRules: add the rules saved in a JSON file by saveRules
+    #   f_loc: (str) location of JSON file
+    def readRules(self, f_loc):
+        for rule in rules_api.load_rules(f_loc):
+            self.addRule(rule)
 
-        # Get only dates with week number
-        holidays = list(filter(lambda holiday: holiday.date.isocalendar()[1] == week_number
-            and holiday.date.year == year, self._inner_holidays))
+    # saveRules: save the rules to a {"rules": [...]} JSON file, kept apart from the holidays file
+    #   f_loc: (str) location and name of file to save
+    def saveRules(self, f_loc):
+        rules_api.save_rules(f_loc, self._rules.rules)
+
+    # foldRecurring: replace holidays stored once a year on a date a rule can give with that rule
+    #   NOTE: a holiday is only folded when it was seen in a run of years with no gaps and one rule matches every one
+    #       of them; the rule covers only those years
+    #   min_years: (int, def 3) fewest years a holiday must be seen in to be folded
+    #   return: (list(rules.Rule)) rules added
+    def foldRecurring(self, min_years=3):
+        with self._bulk():
+            seen = {}
+            for name, ordinal in self._store.rows():
+                seen.setdefault(name, []).append(ordinal)
+            added = []
+            folded = []
+            for name, ordinals in seen.items():
+                rule = rules_api.infer_rule(name, ordinals, min_years)
+                if (rule != None and self.addRule(rule)):
+                    added.append(rule)
+                    folded.extend((name, ordinal) for ordinal in ordinals)
+            if (folded):
+                self._removeRows(folded)
+            return added
+
+    # withRules: merge the holidays rules give for some days into holidays found in the list or in a snapshot of it
+    #   NOTE: rule holidays are expanded a year at a time, so long ranges don't hold every occurrence at once;
+    #       a rule holiday also stored in the list is only given once
+    #   found: (list(Holiday)) holidays from the list, sorted by date
+    #   start: (int) ordinal of the first day, inclusive
+    #   end: (int) ordinal of the last day, exclusive
+    #   return: (list(Holiday)) holidays from both, sorted by date
+    def withRules(self, found, start, end):
+        if (len(self._rules) == 0):
+            return found
+        stored = {(holiday.name, holiday.date.toordinal()) for holiday in found}
+        extra = [Holiday.fromOrdinal(name, ordinal) for ordinal, name in self._rules.between(start, end)
+            if (name, ordinal) not in stored]
+        if (not extra):
+            return found
+        return list(heapq.merge(found, extra, key=lambda holiday: holiday.date))
+
+    # _rulesChanged: count a change to the rules; stored holidays are untouched, so a lock-free snapshot only needs
+    #   the new version, letting anything cached by version see the change
+    #   NOTE: called with the write lock held
+    def _rulesChanged(self):
+        self._version += 1
+        self._render_cache.clear(self._version)
+        if (self._view != None):
+            self._view = self._view.changed(self._store, (), self._version)
+
+    # filterHolidaysByWeek: get the holidays of a certain ISO week in a certain ISO year
+    #   year: (int) ISO year of the holidays
+    #   week_number: (int) ISO week number (range is 1 to 53, inclusive)
+    #   NOTE: holidays from rules are included alongside the ones stored in the list
+    #   return: (list(Holiday)) holidays withing that timeframe, sorted by date
+    @instrument.timed('week')
+    def filterHolidaysByWeek(self, year, week_number):
 
-        # return your holidays
-        return holidays
+        # Get only dates in that week's bucket
+        view = self._view
+        if (view != None):
+            found = view.week(year, week_number)
+        else:
+            with self._write_lock:
+                found = self._store.week(year, week_number)
+        if (len(self._rules) == 0):
+            return found
+        try:
+            monday = dt.date.fromisocalendar(year, week_number, 1).toordinal()
+        except ValueError:
+            return found
+        return self.withRules(found, monday, monday + 7)
+
+    # filterHolidaysByRange: get the holidays from a start date up to, but not including, an end date
+    #   start_str: (str) string format of first date of the range, inclusive
+    #   end_str: (str) string format of last date of the range, exclusive
+    #   date_format: (str) format of the dates; default is '%Y-%m-%d'
+    #   NOTE: holidays from rules are included alongside the ones stored in the list
+    #   return: (list(Holiday)) holidays within that timeframe, sorted by date
+    @instrument.timed('range')
+    def filterHolidaysByRange(self, start_str, end_str, date_format='%Y-%m-%d'):
+        start = parse_date(start_str, date_format)
+        end = parse_date(end_str, date_format)
+        view = self._view
+        if (view != None):
+            found = view.between(start, end)
+        else:
+            with self._write_lock:
+                found = self._store.between(start, end)
+        if (len(self._rules) == 0):
+            return found
+        return self.withRules(found, start.toordinal(), end.toordinal())
 
     # displayHolidaysInWeek: display a list of holidays with proper formatting
     #   holiday_list: (list(Holiday)) list of holidays
     #   should_print: (bool, default: False) True to include prints of each; False otherwise
-    #   if_weather: False to not show weather; True otherwise (BE CAREFUL! ONLY WORKS FOR CURRENT WEEK!)
+    #   if_weather: False to not show weather; True otherwise (days the weather table has no data for show n/a)
+    #   location: (weather.Location, default: Minneapolis) place to show weather for
     #   return: (list(str)) list of properly formatted holidays
-    def displayHolidays(self, holiday_list, should_print=False, if_weather=False):
+    def displayHolidays(self, holiday_list, should_print=False, if_weather=False, location=weather_api.MINNEAPOLIS):
 
         format_holidays = []
         weather = []
 
         # Add in weather upon request
-        if (if_weather):
-            weather = self.getWeather()
+        if (if_weather and holiday_list):
+            days = [datetime(holiday.date.year, holiday.date.month, holiday.date.day) for holiday in holiday_list]
+            weather = self._weatherFor(location, days)
 
-        # Format strings
+        # Format strings, formatting each date once
         for holiday in holiday_list:
-            date = str(holiday.date.date())
-            if (if_weather):
-                format_holidays.append(f'{holiday} ({date}) - {weather[date]}')
-            else:
-                format_holidays.append(f'{holiday} ({holiday.date.date()})')
+            date = holiday.date.date().isoformat()
+            format_holidays.append(render.format_holiday(holiday.name, date, weather.get(date, 'n/a') if if_weather else None))
 
         # Give option to print holidays within function 
         if (should_print):
@@ -309,91 +1015,318 @@ class HolidayList:
         # Return list of formatted holidays
         return format_holidays
 
-    # getWeather: create dictionary of days of week and corresponding weathers; because of limitations of API, can only be used on current week
-    def getWeather(self):
-
-        # May run into querying limits
-        try:
-
-            # Get what day of the week it is
-            curr_dow = datetime.today().weekday()
-
-            # Create weather dictionary and date list
-            dates = []
-            weather = {}
-            j = 0
-            add_date = datetime.today() - dt.timedelta(days=curr_dow)
-            while (j < 7):
-                date = add_date.strftime('%Y-%m-%d')
-                dates.append(date)
-                weather[date] = 'n/a'
-                add_date = add_date + dt.timedelta(days=1)
-                j += 1
-
-            # Future weather forcast
-
-            # First determine how many forcast days are needed
-            future_n = 6 - curr_dow
-
-            # Query those days to get forcast weather
-            query_str_future = {"q":"minneapolis,us","cnt":f'{future_n}',"units":"imperial"}
-            response_future = requests.request("GET", weather_api_future, headers=weather_headers, params=query_str_future)
-            data_future = json.loads(response_future.text)
-            future_weather = data_future['list']
-
-            # Add that weather to list
-            for i in range(curr_dow+1, 7):
-                current_day = future_weather[i-curr_dow-1]
-                weather[dates[i]] = current_day['weather'][0]['main']
-            
-            # Past weather historical data
-            j = 0
-            for i in range(curr_dow, -1, -1):
-
-                # Makes sure never to query beyond 5 days in past (no data after that)
-                if (j < 5):
-
-                    # Get the change in date and query that date
-                    date = datetime.today() - dt.timedelta(j)
-                    query_str_past = {"lat":"44.986656","lon":"-93.2650","dt":f'{int(date.timestamp())}'}
-                    response_past = requests.request("GET", weather_api_past, headers=weather_headers, params=query_str_past)
-
-                    # Save that dates weather
-                    data_past = json.loads(response_past.text)
-                    curr_weather = data_past['current']['weather'][0]['main']
-                    weather[dates[i]] = curr_weather
+    # viewWeek: display the holidays of an ISO week, reusing the formatted lines from the last time the week was shown
+    #   NOTE: the lines are kept until the week changes; lines with weather are also only kept for weather.FORECAST_TTL
+    #   year: (int) ISO year of the week
+    #   week_number: (int) ISO week number (range is 1 to 53, inclusive)
+    #   should_print: (bool, default: False) True to include prints of each; False otherwise
+    #   if_weather: False to not show weather; True otherwise (days the weather table has no data for show n/a)
+    #   location: (weather.Location, default: Minneapolis) place to show weather for
+    #   return: (list(str)) list of properly formatted holidays
+    def viewWeek(self, year, week_number, should_print=False, if_weather=False, location=weather_api.MINNEAPOLIS):
+        key = (year, week_number, location if if_weather else None)
+        format_holidays = self._render_cache.get(key)
+        if (format_holidays == None):
+
+            # Note the version first, so lines formatted from a list that changed meanwhile are not kept
+            view = self._view
+            version = view.version if view != None else self._version
+            format_holidays = self.displayHolidays(self.filterHolidaysByWeek(year, week_number), if_weather=if_weather, location=location)
+            self._render_cache.put(key, format_holidays, version, weather_api.FORECAST_TTL if if_weather else None)
+
+        # Give option to print holidays within function
+        if (should_print):
+            for string in format_holidays:
+                print(string)
+        return format_holidays
 
-                j += 1
+    # yearRange: get the first and last years that have holidays, stored in the list or given by rules
+    #   NOTE: years are counted once, then kept up to date as holidays are added and removed; a rule with no first
+    #       or last year doesn't widen the range on that side
+    #   return: (tuple(int, int)) first and last year; (None, None) if there are no holidays and no rule has a bound
+    def yearRange(self):
+        with self._write_lock:
+            if (self._years == None):
+                self._years = {}
+                for name, ordinal in self._store.rows():
+                    year = dt.date.fromordinal(ordinal).year
+                    self._years[year] = self._years.get(year, 0) + 1
+            firsts = list(self._years)
+            lasts = list(self._years)
+        for rule in self._rules.rules:
+            firsts.extend(year for year in (rule.first, rule.last) if year != None)
+            lasts.extend(year for year in (rule.first, rule.last) if year != None)
+        if (not firsts):
+            return (None, None)
+        return (min(firsts), max(lasts))
+
+    # getWeather: create dictionary of days of a week and corresponding weathers, read from the local weather table
+    #   NOTE: days the table is missing are fetched if the API has them (the last 5 days and the next 16); others are 'n/a'
+    #   year: (int) ISO year of the week; default is the current week
+    #   week_number: (int) ISO week number; default is the current week
+    #   location: (weather.Location) place to get weather for; default Minneapolis
+    #   return: (dict) 'YYYY-MM-DD' -> weather for each day of the week
+    def getWeather(self, year=None, week_number=None, location=weather_api.MINNEAPOLIS):
+
+        # Lay out the days of the week
+        if (year == None or week_number == None):
+            year, week_number = datetime.today().isocalendar()[:2]
+        monday = datetime.fromisocalendar(year, week_number, 1)
+        days = [monday + dt.timedelta(days=i) for i in range(7)]
+
+        weather = {day.strftime('%Y-%m-%d'): 'n/a' for day in days}
+        weather.update(self._weatherFor(location, days))
+        return weather
+
+    # _weatherFor: look up weather for days in the local weather table, fetching any the table is missing but the API has
+    #   location: (weather.Location) place to get weather for
+    #   days: (list(datetime)) midnight of each day
+    #   return: (dict) 'YYYY-MM-DD' -> weather for the days that have data
+    def _weatherFor(self, location, days):
+        weather = self.weather_store.lookup(location, min(days).strftime('%Y-%m-%d'), max(days).strftime('%Y-%m-%d'))
+
+        # Only reaches the API before the prefetcher has filled the table
+        today = datetime(datetime.today().year, datetime.today().month, datetime.today().day)
+        missing = [day for day in days if day.strftime('%Y-%m-%d') not in weather and weather_api.is_available(day, today)]
+        if (missing):
+
+            # Say what went wrong, such as running out of queries or losing the connection
+            try:
+                weather.update(weather_api.fetch_into(self.weather_provider, self.weather_store, location, missing, today))
+            except WeatherError as e:
+                print(e)
 
-            # Return weather
-            return weather
-        
-        except:
-            print('Ran out of queries to Weather API!')
+        return weather
 
     # viewCurrentWeek: view current week of holidays and weather
     #   if_weather: (bool) False to not show weather; True otherwise
     def viewCurrentWeek(self, weather=False):
 
-        # Use the Datetime Module to look up current week and year
-        year = datetime.now().year
-        week = datetime.now().isocalendar()[1]
+        # Use the Datetime Module to look up current ISO week and ISO year
+        year, week = datetime.now().isocalendar()[:2]
+
+        # Display the holidays in the week, formatted once and reused until the week changes
+        self.viewWeek(year, week, should_print=True, if_weather=weather)
+
+# Exit statuses of the batch commands
+EXIT_OK = 0
+EXIT_ERROR = 1 # input could not be read, or the holidays could not be loaded or saved
+EXIT_USAGE = 2 # bad command line
+EXIT_NOT_FOUND = 3 # remove was asked for holidays that are not in the list, or a search found nothing
+
+# year_range: read a span of years from the command line
+#   text: (str) first and last year, inclusive, e.g. '2020-2030'
+#   return: (range) years
+def year_range(text):
+    first, dash, last = text.partition('-')
+    if (not first.isdigit() or not last.isdigit() or int(first) > int(last)):
+        raise argparse.ArgumentTypeError(f'"{text}" is not a span of years such as 2020-2030')
+    return range(int(first), int(last) + 1)
+
+# build_parser: build the command line parser for the batch commands
+#   return: (argparse.ArgumentParser) parser with one subcommand per batch command
+def build_parser():
+    parser = argparse.ArgumentParser(prog='main.py',
+        description='Holidays API batch commands. Run with no command for the interactive menu.',
+        epilog='--profile FILE saves a cProfile capture and --stats FILE dumps timers and counters as JSON, '
+            'with a command or with the menu.')
+    parser.add_argument('--data', default='data/holidays.json', help='JSON file to load holidays from and save changes to')
+    parser.add_argument('--store', default=None, help='snapshot to keep holidays in instead of --data; edits are saved to its append log')
+    parser.add_argument('--format', default='ndjson', choices=persistence.RECORD_FORMATS, help='format of records on stdin and stdout')
+    parser.add_argument('--date-format', default='%Y-%m-%d', help='format of dates in records')
+    parser.add_argument('--rules', default='data/rules.json', help='JSON file of recurring holidays to load, and to save folded rules to')
+    parser.add_argument('--engine', default='objects', choices=sorted(store.ENGINES), help='storage engine of the list')
+    parser.add_argument('--scrape', action='store_true', help='merge in holidays from Time and Date before running the command')
+    parser.add_argument('--countries', default=None,
+        help='comma-separated country codes for --scrape to read through the ingestion pipeline, e.g. us,uk,de')
+    parser.add_argument('--sync', action='store_true',
+        help='with --scrape, only parse pages that changed since the last sync and apply what they gained and lost')
+    parser.add_argument('--parse-processes', type=int, default=0,
+        help='worker processes for --scrape to parse pages in, for backfills of many pages; default 0 to parse in threads')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    # Bulk commands read records from a file or stdin
+    command = commands.add_parser('import', help='add every record in a file or stdin')
+    command.add_argument('file', nargs='?', default='-', help='file of records; - for stdin')
+    command = commands.add_parser('export', help='write every holiday, rule holidays included')
+    command.add_argument('file', nargs='?', default='-', help='file to write; - for stdout')
+    command.add_argument('--years', type=year_range, default=None,
+        help='years to write rule holidays for, e.g. 2020-2030; default the years the stored holidays span')
+
+    # Single edits, or bulk edits read from stdin when no holiday is named
+    for name, verb in (('add', 'add'), ('remove', 'remove')):
+        command = commands.add_parser(name, help=f'{verb} one holiday, or every record on stdin')
+        command.add_argument('name', nargs='?', help='name of the holiday')
+        command.add_argument('date', nargs='?', help='date of the holiday')
+
+    # Queries by ISO week or by date range
+    command = commands.add_parser('query', help='write the holidays of an ISO week or a date range')
+    command.add_argument('--year', type=int, help='ISO year of the week')
+    command.add_argument('--week', type=int, help='ISO week number, 1 to 53')
+    command.add_argument('--from', dest='start', help='first date of the range, inclusive')
+    command.add_argument('--to', dest='end', help='last date of the range, exclusive')
+
+    # Search by part of a name
+    command = commands.add_parser('search', help='write the holidays whose names best match a query')
+    command.add_argument('query', help='words of the name; the last may be partly typed')
+    command.add_argument('--limit', type=int, default=10, help='most names to write')
+
+    # Turn holidays stored once a year into recurring rules
+    command = commands.add_parser('fold', help='replace holidays that recur on a rule-based date every year with rules')
+    command.add_argument('--min-years', type=int, default=3, help='fewest years a holiday must be seen in')
+    return parser
+
+# read_rows: read records and turn them into (name, ordinal) rows, checking every date before anything is changed
+#   f: (file) open text file of records
+#   fmt: (str) record format from persistence.RECORD_FORMATS
+#   date_format: (str) format of the dates
+#   return: (list(tuple(str, int))) rows in the order read
+def read_rows(f, fmt, date_format):
+    records = list(persistence.read_records(f, fmt))
+    ordinals = dates.parse_ordinals([date_str for name, date_str in records], date_format, strict=False)
+    for (name, date_str), ordinal in zip(records, ordinals):
+        if (ordinal == None):
+            raise ValueError(f'"{name}" has a date that does not match {date_format}: "{date_str}"!')
+    return [(name, ordinal) for (name, date_str), ordinal in zip(records, ordinals)]
+
+# run_cli: run one batch command without the interactive menu
+#   NOTE: nothing is scraped unless --scrape is given, so commands only pay for loading the saved holidays
+#   argv: (list(str)) command line arguments, without the program name
+#   stdin: (file) where records are read from; default sys.stdin
+#   stdout: (file) where records are written to; default sys.stdout
+#   return: (int) exit status, one of the EXIT_ values
+def run_cli(argv, stdin=None, stdout=None):
+    stdin = sys.stdin if stdin == None else stdin
+    stdout = sys.stdout if stdout == None else stdout
+
+    # argparse exits on a bad command line; turn that into a status instead
+    parser = build_parser()
+    try:
+        args = parser.parse_args(argv)
+    except SystemExit as e:
+        return e.code
+    if (args.command in ('add', 'remove') and (args.name == None) != (args.date == None)):
+        print(f'error: {args.command} needs both a name and a date, or neither to read records from stdin', file=sys.stderr)
+        return EXIT_USAGE
+    if (args.command == 'query' and not ((args.year != None and args.week != None and args.start == None and args.end == None)
+            or (args.start != None and args.end != None and args.year == None and args.week == None))):
+        print('error: query needs either --year and --week, or --from and --to', file=sys.stderr)
+        return EXIT_USAGE
+
+    holidays = HolidayList(engine=args.engine)
+    try:
+
+        # Load the saved holidays, then scrape only if asked; scrape messages go to stderr to keep stdout clean
+        if (args.store != None):
+            holidays.openLog(args.store)
+        elif (os.path.exists(args.data)):
+            holidays.readJSON(args.data)
+        if (os.path.exists(args.rules)):
+            holidays.readRules(args.rules)
+        state = None
+        if (args.scrape):
+            with redirect_stdout(sys.stderr):
+
+                # Sync state lives beside the holidays it describes
+                if (args.sync):
+                    state = pipeline.SyncState(os.path.splitext(args.store if args.store != None else args.data)[0] + '.sync.json')
+                if (args.countries != None):
+                    years = range(datetime.today().year - 2, datetime.today().year + 3)
+                    sources = pipeline.make_sources([country.strip() for country in args.countries.split(',') if country.strip()], years)
+                    holidays.ingestSources(sources, verbose=True, state=state, cache=scraper.PageCache('data/cache'),
+                        parse_processes=args.parse_processes)
+                elif (state != None):
+                    holidays.syncHolidays(state, verbose=True, cache=scraper.PageCache('data/cache'), parse_processes=args.parse_processes)
+                else:
+                    holidays.scrapeHolidays(cache=scraper.PageCache('data/cache'), processes=args.parse_processes)
 
-        # Use your filterHolidaysByWeek function to get the list of holidays 
-        holidays = self.filterHolidaysByWeek(year, week)
+        status = EXIT_OK
+        changed = 0
 
-        # Use your displayHolidaysInWeek function to display the holidays in the week
-        self.displayHolidays(holidays, should_print=True, if_weather=weather)
+        # Write out holidays
+        if (args.command == 'export'):
+            records = holidays.exportRecords(args.date_format, args.years)
+            if (args.file == '-'):
+                persistence.write_records(stdout, records, args.format)
+            else:
+                with open(args.file, 'w', newline='') as f:
+                    persistence.write_records(f, records, args.format)
+        elif (args.command == 'query'):
+            if (args.year != None):
+                if (args.week < 1 or args.week > 53):
+                    print('error: --week must be between 1 and 53', file=sys.stderr)
+                    return EXIT_USAGE
+                found = holidays.filterHolidaysByWeek(args.year, args.week)
+            else:
+                found = holidays.filterHolidaysByRange(args.start, args.end, args.date_format)
+            persistence.write_records(stdout, ((holiday.name, holiday.date.strftime(args.date_format)) for holiday in found), args.format)
+        elif (args.command == 'search'):
+            found = holidays.searchHolidays(args.query, args.limit)
+            persistence.write_records(stdout, ((holiday.name, holiday.date.strftime(args.date_format)) for holiday in found), args.format)
+            if (not found):
+                status = EXIT_NOT_FOUND
+        elif (args.command == 'fold'):
+            folded = holidays.foldRecurring(args.min_years)
+            if (folded):
+                holidays.saveRules(args.rules)
+                changed = len(folded)
+            print(f'Folded {len(folded)} holidays into rules.', file=sys.stderr)
+
+        # Change holidays in one bulk step
+        else:
+            if (args.command != 'import' and args.name != None):
+                rows = [(args.name, parse_date(args.date, args.date_format).toordinal())]
+            elif (args.command == 'import' and args.file != '-'):
+                with open(args.file, 'r', newline='') as f:
+                    rows = read_rows(f, args.format, args.date_format)
+            else:
+                rows = read_rows(stdin, args.format, args.date_format)
+
+            if (args.command == 'remove'):
+                report = holidays.removeHolidays(rows)
+                changed = len(report.removed)
+                print(f'Removed {changed} of {len(rows)} holidays.', file=sys.stderr)
+                if (report.skipped > 0):
+                    status = EXIT_NOT_FOUND
+            else:
+                report = holidays.addHolidays(rows)
+                changed = len(report.added)
+                print(f'Added {changed} of {len(rows)} holidays; {report.skipped} were already in the list.', file=sys.stderr)
+
+        # Save the changes; a store saves each edit to its log as it is made
+        if (args.store == None and (changed > 0 or args.scrape)):
+            holidays.saveToJSON(args.data)
+
+        # Only once the synced holidays are saved can the next sync skip the pages they came from
+        if (state != None):
+            state.save()
+        return status
+
+    # Input that could not be read, or files that could not be loaded or saved
+    except (ValueError, KeyError, OSError, OverflowError) as e:
+        print(f'error: {e}', file=sys.stderr)
+        return EXIT_ERROR
+    finally:
+        holidays.closeLog()
 
 # main: main function runner
-def main():
-
-    # Set up variables
-    holidays = HolidayList()
-
-    # Load in variables, both from JSON and API
-    holidays.readJSON('data/holidays.json')
-    holidays.scrapeHolidays()
+#   lazy: (bool) True to show the menu as soon as the saved holidays are loaded and scrape in the background;
+#       False to finish the scrape first; default True
+def main(lazy=True):
+
+    # Set up variables; a lazy start reads from snapshots so the menu never waits on the background scrape
+    holidays = HolidayList(concurrent=lazy)
+
+    # Load in variables, both from JSON and API; a lazy start merges the scrape in once it is done
+    #   NOTE: edits are saved to an append log beside the JSON file as they are made, and folded into it on save and exit
+    holidays.openLog('data/holidays.json', snapshot_format='json')
+    if (os.path.exists('data/rules.json')):
+        holidays.readRules('data/rules.json')
+    scrape_done = threading.Event()
+    if (lazy):
+        holidays.scrapeInBackground(on_done=lambda added: scrape_done.set(), cache=scraper.PageCache('data/cache'))
+    else:
+        holidays.scrapeHolidays(cache=scraper.PageCache('data/cache'))
 
     # Print welcome message
     f = open('messages/welcome.txt', 'r')
@@ -402,205 +1335,211 @@ def main():
     print(welcome.format(num=str(holidays.numHolidays())))
     print()
 
-    # Create while loop to keep user going
-    keep_going = True
-    saved = True
-    while (keep_going):
-
-        # Display user menu
-        f = open('messages/options.txt', 'r')
-        options = f.read()
-        print(options)
-        print()
-
-        # Get user choice
-        choice = int_input(minimum=1, maximum=5, input_string="Selection: ")
-        print()
-
-        # Add a holiday option
-        if (choice == 1):
-
-            # Display page info
-            print("Add a Holiday")
-            print("=============")
-
-            # Get holiday name
-            good_input = False
-            name = ""
-            while (not good_input):
-                name = input("Holiday: ")
-                if (name == ""):
-                    print("Please enter a name that isn't blank!")
-                else:
-                    good_input = True
+    # Stop the weather refreshes and fold the log into the JSON file however the menu is left
+    try:
+
+        # Create while loop to keep user going; weather is set up by the first view that shows it, so a session without
+        #   weather never imports config or calls the weather API
+        keep_going = True
+        weather_started = False
+        while (keep_going):
+
+            # Print the welcome message again with the new count once the background scrape is merged in
+            if (scrape_done.is_set()):
+                scrape_done.clear()
+                print(welcome.format(num=str(holidays.numHolidays())))
+                print()
+
+            # Display user menu
+            f = open('messages/options.txt', 'r')
+            options = f.read()
+            print(options)
+            print()
+
+            # Get user choice
+            choice = int_input(minimum=1, maximum=6, input_string="Selection: ")
+            print()
+
+            # Add a holiday option
+            if (choice == 1):
+
+                # Display page info
+                print("Add a Holiday")
+                print("=============")
+
+                # Get holiday name
+                good_input = False
+                name = ""
+                while (not good_input):
+                    name = input("Holiday: ")
+                    if (name == ""):
+                        print("Please enter a name that isn't blank!")
+                    else:
+                        good_input = True
             
-            # Get date
-            good_input = False
-            date = ""
-            while (not good_input):
-                date = input("Date [YYYY-MM-DD]: ")
-
-                # Immediately reject blank entries
-                if (date == ""):
-                    print("Please enter a name that isn't blank!")
+                # Get date
+                good_input = False
+                date = ""
+                while (not good_input):
+                    date = input("Date [YYYY-MM-DD]: ")
+
+                    # Immediately reject blank entries
+                    if (date == ""):
+                        print("Please enter a name that isn't blank!")
                 
-                # Try to convert date to datetime to see if properly formatted
-                try:
-                    datetime.strptime(date, '%Y-%m-%d')
-                    good_input = True
-                except:
-                    print("Date is not formatted correctly; please use YYYY-MM-DD!")
-
-            # Check to see if holiday already exists
-            exists = holidays.findHoliday(name, date)
-            if (exists == None):
-
-                # Add holiday if not already there
-                holiday = Holiday(name, date)
-                holidays.addHoliday(holiday)
-                print(f'\n{name} ({date}) is now added!\n')
-                saved = False
-
-            # Don't add holiday if already in list
-            else:
-                print(f'\n{name} ({date}) has already been entered into the system!\n')
-
-            # Return to main menu
-            print('Returning to main menu!\n')
-
-        # Remove a holiday option
-        if (choice == 2):
-            # Display page info
-            print("Remove a Holiday")
-            print("=============")
-
-            # Get holiday name
-            good_input = False
-            name = ""
-            while (not good_input):
-                name = input("Holiday: ")
-                if (name == ""):
-                    print("Please enter a name that isn't blank!")
+                    # Try to convert date to datetime to see if properly formatted
+                    try:
+                        datetime.strptime(date, '%Y-%m-%d')
+                        good_input = True
+                    except:
+                        print("Date is not formatted correctly; please use YYYY-MM-DD!")
+
+                # Check to see if holiday already exists
+                exists = holidays.findHoliday(name, date)
+                if (exists == None):
+
+                    # Add holiday if not already there
+                    holiday = Holiday(name, date)
+                    holidays.addHoliday(holiday)
+                    print(f'\n{name} ({date}) is now added!\n')
+
+                # Don't add holiday if already in list
                 else:
-                    good_input = True
+                    print(f'\n{name} ({date}) has already been entered into the system!\n')
+
+                # Return to main menu
+                print('Returning to main menu!\n')
+
+            # Remove a holiday option
+            if (choice == 2):
+                # Display page info
+                print("Remove a Holiday")
+                print("=============")
+
+                # Get holiday name
+                good_input = False
+                name = ""
+                while (not good_input):
+                    name = input("Holiday: ")
+                    if (name == ""):
+                        print("Please enter a name that isn't blank!")
+                    else:
+                        good_input = True
             
-            # Get date
-            good_input = False
-            date = ""
-            while (not good_input):
-                date = input("Date [YYYY-MM-DD]: ")
-
-                # Immediately reject blank entries
-                if (date == ""):
-                    print("Please enter a name that isn't blank!")
+                # Get date
+                good_input = False
+                date = ""
+                while (not good_input):
+                    date = input("Date [YYYY-MM-DD]: ")
+
+                    # Immediately reject blank entries
+                    if (date == ""):
+                        print("Please enter a name that isn't blank!")
                 
-                # Try to convert date to datetime to see if properly formatted
-                try:
-                    datetime.strptime(date, '%Y-%m-%d')
-                    good_input = True
-                except:
-                    print("Date is not formatted correctly; please use YYYY-MM-DD!")
-
-            # Check to see if holiday already exists
-            exists = holidays.findHoliday(name, date)
-            if (exists != None):
-
-                # Remove holiday if there
-                holidays.removeHoliday(name, date)
-                print(f'\n{name} ({date}) is now removed!\n')
-                saved = False
-
-            # Don't add holiday if already in list
-            else:
-                print(f'\n{name} ({date}) is not in system, so it cannot be removed!\n')
+                    # Try to convert date to datetime to see if properly formatted
+                    try:
+                        datetime.strptime(date, '%Y-%m-%d')
+                        good_input = True
+                    except:
+                        print("Date is not formatted correctly; please use YYYY-MM-DD!")
+
+                # Check to see if holiday already exists
+                exists = holidays.findHoliday(name, date)
+                if (exists != None):
+
+                    # Remove holiday if there
+                    holidays.removeHoliday(name, date)
+                    print(f'\n{name} ({date}) is now removed!\n')
+
+                # Don't add holiday if already in list
+                else:
+                    print(f'\n{name} ({date}) is not in system, so it cannot be removed!\n')
 
-            # Return to main menu
-            print('Returning to main menu!\n')
+                # Return to main menu
+                print('Returning to main menu!\n')
 
-        # Save holidays option
-        if (choice == 3):
+            # Save holidays option
+            if (choice == 3):
             
-            # Display page info
-            print("Saving Holiday List")
-            print("====================")
-            print("Are you sure you want to save your changes?")
-
-            # Get response
-            good_input = False
-            while (not good_input):
-                choice = input('[y/n] ')
-
-                # Save data
-                if (choice.lower().strip() == 'y'): # Save data
-
-                    # Get file name
-                    good_input_2 = False
-                    name = ""
-                    while (not good_input_2):
-                        name = input("Please input a file name, excluding JSON tag: ")
+                # Display page info
+                print("Saving Holiday List")
+                print("====================")
+                print("Are you sure you want to save your changes?")
+
+                # Get response
+                good_input = False
+                while (not good_input):
+                    choice = input('[y/n] ')
+
+                    # Save data
+                    if (choice.lower().strip() == 'y'): # Save data
+
+                        # Get file name; blank for the file the menu loaded
+                        good_input_2 = False
+                        name = ""
+                        while (not good_input_2):
+                            name = input("Please input a file name, excluding JSON tag (blank for data/holidays): ")
+                            if (".json" in name):
+                                print("Please do not include '.json' in input!")
+                            else:
+                                good_input_2 = True
                         if (name == ""):
-                            print("Please enter a name that isn't blank!")
-                        elif (".json" in name):
-                            print("Please do not include '.json' in input!")
+                            name = 'data/holidays'
+
+                            # Edits are already in the log, so folding it into the file can finish in the background
+                            holidays.compact(background=True)
+
+                        # Any other file gets a full copy of the list
                         else:
-                            good_input_2 = True
-                    
-                    # Save file
-                    holidays.saveToJSON(f'{name}.json')
-                    saved = True
-                    
-                    # Print success message
-                    print()
-                    print("Success:")
-                    print(f'Your changes have been saved to {name}.json')
-
-                    # Return to main menu
-                    print()
-                    print('Returning to main menu!\n')
-                    good_input = True
-
-                # Don't do any thing
-                elif (choice.lower().strip() == 'n'):
+                            holidays.saveToJSON(f'{name}.json')
+
+                        # Print success message
+                        print()
+                        print("Success:")
+                        print(f'Your changes have been saved to {name}.json')
+
+                        # Return to main menu
+                        print()
+                        print('Returning to main menu!\n')
+                        good_input = True
+
+                    # Don't do any thing
+                    elif (choice.lower().strip() == 'n'):
                     
-                    # Print message
-                    print()
-                    print("Canceled:")
-                    print("Holiday list file save canceled.\n")
-
-                    # Return to main menu
-                    print()
-                    print('Returning to main menu!\n')
-                    good_input = True
+                        # Print message
+                        print()
+                        print("Canceled:")
+                        print("Holiday list file save canceled.\n")
+
+                        # Return to main menu
+                        print()
+                        print('Returning to main menu!\n')
+                        good_input = True
                 
-                # Bad input
-                else:
-                    print("Please enter 'y' or 'n'!")
+                    # Bad input
+                    else:
+                        print("Please enter 'y' or 'n'!")
 
-        # View holidays option
-        if (choice == 4):
+            # View holidays option
+            if (choice == 4):
 
-            # Display page info
-            print("View Holidays")
-            print("=================")
+                # Display page info
+                print("View Holidays")
+                print("=================")
             
-            # Get year range
-            year_min = None
-            year_max = None
-            for holiday in holidays.inner_holidays:
-                if (year_min == None or year_min > holiday.date.year):
-                    year_min = holiday.date.year
-                if (year_max == None or year_max < holiday.date.year):
-                    year_max = holiday.date.year
+                # Get year range; any year will do when nothing gives one
+                year_min, year_max = holidays.yearRange()
+                if (year_min == None):
+                    year_min, year_max = -1, -1
             
-            # Get year and month
-            which_year = int_input(minimum=year_min, maximum=year_max, input_string="Which year?: ")
-            which_week = int_input(minimum=1, maximum=52,
-                input_string=f'Which week (current week: {datetime.today().isocalendar()[1]})? [1-52]: ')
-
-            # If the week is the current week and year is current year, then offer to show weather as well
-            weather = False
-            if (which_week == datetime.today().isocalendar()[1] and which_year == datetime.today().year):
-                
+                # Get year and month
+                which_year = int_input(minimum=year_min, maximum=year_max, input_string="Which year?: ")
+                which_week = int_input(minimum=1, maximum=53,
+                    input_string=f'Which week (current week: {datetime.today().isocalendar()[1]})? [1-53]: ')
+
+                # Offer to show weather as well; days without saved weather show n/a
+                weather = False
+
                 # Ask if user would like to the weather
                 print("Include weather?")
 
@@ -615,41 +1554,96 @@ def main():
                         good_input = True
                     else: # Bad input
                         print("Please enter 'y' or 'n'!")
+
+                # Keep weather for the coming days saved locally from now on, so later views don't wait on the API
+                if (weather and not weather_started):
+                    holidays.weather_store = weather_api.WeatherStore('data/weather.sqlite')
+                    holidays.startWeatherPrefetch()
+                    weather_started = True
             
-            # Display results
-            print()
-            print(f'These are the holidays for {which_year} week #{which_week}:')
-            holidays.displayHolidays(holidays.filterHolidaysByWeek(which_year, which_week), should_print=True, if_weather=weather)
-            print()
+                # Display results
+                print()
+                print(f'These are the holidays for {which_year} week #{which_week}:')
+                holidays.viewWeek(which_year, which_week, should_print=True, if_weather=weather)
+                print()
         
-        # Exit option
-        if (choice == 5):
-
-            # Display options
-            print("Exit")
-            print("=====")
-            print("Are you sure you want to exit?")
-            if (not saved): # Only display if changes have been made that haven't been saved
-                print("Your changes will be lost!")
-
-            # Get response
-            good_input = False
-            while (not good_input):
-                choice = input('[y/n] ')
-                if (choice.lower().strip() == 'y'): # Leave system
-                    keep_going = False
-                    good_input = True
-                elif (choice.lower().strip() == 'n'): # Leave menu
-                    print()
-                    print('Returning to main menu!\n')
-                    good_input = True
-                else: # Bad input
-                    print("Please enter 'y' or 'n'!")
-    
+            # Search holidays option
+            if (choice == 5):
+
+                # Display page info
+                print("Search Holidays")
+                print("===============")
+
+                # Get search words
+                query = ""
+                while (query.strip() == ""):
+                    query = input("Holiday name (or part of it): ")
+                    if (query.strip() == ""):
+                        print("Please enter a name that isn't blank!")
+
+                # Display results
+                found = holidays.searchHolidays(query)
+                print()
+                if (len(found) == 0):
+                    print(f'No holidays match "{query}".')
+                else:
+                    print(f'These are the holidays matching "{query}":')
+                    holidays.displayHolidays(found, should_print=True)
+                print()
+
+                # Return to main menu
+                print('Returning to main menu!\n')
+
+            # Exit option
+            if (choice == 6):
+
+                # Display options
+                print("Exit")
+                print("=====")
+                print("Are you sure you want to exit?")
+
+                # Get response
+                good_input = False
+                while (not good_input):
+                    choice = input('[y/n] ')
+                    if (choice.lower().strip() == 'y'): # Leave system
+                        keep_going = False
+                        good_input = True
+                    elif (choice.lower().strip() == 'n'): # Leave menu
+                        print()
+                        print('Returning to main menu!\n')
+                        good_input = True
+                    else: # Bad input
+                        print("Please enter 'y' or 'n'!")
+    finally:
+        holidays.stopWeatherPrefetch()
+        holidays.closeLog(compact=True)
+
     # Sign off message
     print()
     print('Thanks for using Holidays API! Auf Wiedersehen!\n')
 
-# Call main function
+# split_profile_args: take the profiling options off a command line, so they work with the menu and every command
+#   argv: (list(str)) command line arguments, without the program name
+#   return: (tuple(argparse.Namespace, list(str))) profile and stats file locations, and the arguments left over
+def split_profile_args(argv):
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument('--profile', default=None)
+    parser.add_argument('--stats', default=None)
+    return parser.parse_known_args(argv)
+
+# Call main function; a command on the command line runs it without the menu
+#   NOTE: --profile FILE saves a cProfile capture of the main thread, and --stats FILE dumps the timers and counters
+#       of every thread as JSON; both print a summary to stderr on the way out
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    options, argv = split_profile_args(sys.argv[1:])
+    if (len(argv) > 0):
+        run = lambda: run_cli(argv)
+    else:
+        run = main
+    if (options.profile != None or options.stats != None):
+        status = instrument.run_profiled(run, profile_loc=options.profile, stats_loc=options.stats)
+    else:
+        status = run()
+    if (len(argv) > 0):
+        sys.exit(status)
\ No newline at end of file
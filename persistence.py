@@ -0,0 +1,546 @@
+from datetime import date
+import csv
+import glob
+import json
+import mmap
+import os
+import re
+import struct
+import threading
+
+# ijson is optional; without it the chunked scanner is used
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# Size of each read from a JSON file, in characters
+CHUNK_SIZE = 1 << 16
+
+# Formats that read_records and write_records understand: one JSON object per line, or CSV with a header
+RECORD_FORMATS = ('ndjson', 'csv')
+
+# Whitespace between JSON tokens, and the separator after an array element
+WHITESPACE = re.compile(r'[ \t\r\n]*')
+SEPARATOR = re.compile(r'[ \t\r\n]*([,\]])')
+
+# _JSONStream: decodes JSON values one at a time from a file, reading more text only when needed
+class _JSONStream:
+
+    # Initializer: takes in an open text file
+    def __init__(self, f, chunk_size=CHUNK_SIZE):
+        self._f = f
+        self._chunk_size = chunk_size
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+        self._decoder = json.JSONDecoder()
+
+    # _fill: read another chunk; drops text already decoded so the buffer stays small
+    #   return: (bool) True if more text was read
+    def _fill(self):
+        if (self._eof):
+            return False
+        chunk = self._f.read(self._chunk_size)
+        if (not chunk):
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    # peek: skip whitespace and return the next character
+    #   return: (str) next character; '' at end of file
+    def peek(self):
+        while (True):
+            self._pos = WHITESPACE.match(self._buffer, self._pos).end()
+            if (self._pos < len(self._buffer)):
+                return self._buffer[self._pos]
+            if (not self._fill()):
+                return ''
+
+    # expect: consume the next character, which must be one of the given characters
+    #   chars: (str) allowed characters
+    #   return: (str) the character consumed
+    def expect(self, chars):
+        char = self.peek()
+        if (char == '' or char not in chars):
+            raise ValueError(f'Expected one of {chars!r} in JSON file, found {char!r}!')
+        self._pos += 1
+        return char
+
+    # value: decode the next complete JSON value
+    #   return: decoded value
+    def value(self):
+        self.peek()
+        while (True):
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+
+                # A number at the end of the buffer might continue in the next chunk
+                if (end < len(self._buffer) or self._eof):
+                    self._pos = end
+                    return value
+            except json.JSONDecodeError:
+                if (self._eof):
+                    raise
+            self._fill()
+
+    # items: decode the elements of an array whose '[' has already been consumed
+    #   return: (generator) each element, ending after the closing ']'
+    def items(self):
+        if (self.peek() == ']'):
+            self._pos += 1
+            return
+        while (True):
+
+            # Decode the element along with the separator after it, reading more if either is cut off
+            try:
+                self._pos = WHITESPACE.match(self._buffer, self._pos).end()
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+                separator = SEPARATOR.match(self._buffer, end)
+            except json.JSONDecodeError:
+                if (self._eof):
+                    raise
+                separator = None
+            if (separator == None):
+                if (not self._fill()):
+                    raise ValueError('JSON file ended in the middle of an array!')
+                continue
+
+            self._pos = separator.end()
+            yield value
+            if (separator.group(1) == ']'):
+                return
+
+# _scan_holidays: walk the holidays array with the chunked scanner
+#   f: (file) open text file
+#   return: (generator) (name, date_str) for each holiday
+def _scan_holidays(f):
+
+    stream = _JSONStream(f)
+
+    # Files saved before saveToJSON wrote the "holidays" key hold a bare array
+    if (stream.expect('{[') == '['):
+        for holiday_json in stream.items():
+            yield (holiday_json['name'], holiday_json['date'])
+        return
+    if (stream.peek() == '}'):
+        raise KeyError('holidays')
+
+    # Skip other keys until the holidays array is reached
+    while (True):
+        key = stream.value()
+        stream.expect(':')
+        if (key == 'holidays'):
+            break
+        stream.value()
+        if (stream.expect(',}') == '}'):
+            raise KeyError('holidays')
+
+    # Decode one holiday at a time
+    stream.expect('[')
+    for holiday_json in stream.items():
+        yield (holiday_json['name'], holiday_json['date'])
+
+# _checked_events: pass ijson's parse events through, failing as _scan_holidays does when the file is an object
+#   without a "holidays" array, so a malformed file is never read as an empty one
+#   events: (iterable(tuple(str, str, object))) (prefix, event, value) events from ijson.parse
+#   return: (generator) the same events
+def _checked_events(events):
+    found = False
+    for i, (prefix, event, value) in enumerate(events):
+        if (i == 0 and event != 'start_map'):
+            raise ValueError(f"Expected one of '{{[' in JSON file, found {event!r}!")
+        if (prefix == 'holidays' and not found):
+            if (event != 'start_array'):
+                raise ValueError(f"Expected one of '[' in JSON file, found {event!r}!")
+            found = True
+        yield (prefix, event, value)
+    if (not found):
+        raise KeyError('holidays')
+
+# iter_holidays_json: read holidays one at a time from a {"holidays": [...]} JSON file
+#   NOTE: a bare [...] array, as written by older versions of saveToJSON, is also accepted; an object without a
+#       "holidays" key raises KeyError
+#   f_loc: (str) location of JSON file
+#   return: (generator) (name, date_str) for each holiday
+def iter_holidays_json(f_loc):
+
+    # Use ijson's event parser when it is installed
+    if (ijson != None):
+        with open(f_loc, 'rb') as f:
+            bare = f.read(256).lstrip()[:1] == b'['
+            f.seek(0)
+            events = ijson.parse(f) if bare else _checked_events(ijson.parse(f))
+            for holiday_json in ijson.items(events, 'item' if bare else 'holidays.item'):
+                yield (holiday_json['name'], holiday_json['date'])
+        return
+
+    with open(f_loc, 'r') as f:
+        yield from _scan_holidays(f)
+
+# write_json: write holidays to a {"holidays": [...]} JSON file that readJSON can read back
+#   f_loc: (str) location and name of file to save
+#   records: (iterable(tuple(str, str))) (name, date_str) for each holiday
+def write_json(f_loc, records):
+    holiday_dict = [{'name': name, 'date': date} for name, date in records]
+    write_atomic(f_loc, json.dumps({'holidays': holiday_dict}).encode('utf-8'))
+
+# read_records: read (name, date) records from a stream of NDJSON lines or CSV rows
+#   f: (file) open text file, such as stdin
+#   fmt: (str) 'ndjson' or 'csv'; default 'ndjson'
+#   return: (generator(tuple(str, str))) (name, date_str) for each record, in the order written
+def read_records(f, fmt='ndjson'):
+    if (fmt not in RECORD_FORMATS):
+        raise ValueError(f'Unknown record format "{fmt}"!')
+
+    # CSV needs a header naming the name and date columns
+    if (fmt == 'csv'):
+        reader = csv.DictReader(f)
+        if (reader.fieldnames == None):
+            return
+        if ('name' not in reader.fieldnames or 'date' not in reader.fieldnames):
+            raise ValueError('CSV input needs a header with "name" and "date" columns!')
+        for record in reader:
+            if (not record['name'] or not record['date']):
+                raise ValueError(f'Line {reader.line_num}: record needs a name and a date!')
+            yield record['name'], record['date']
+        return
+
+    # NDJSON: one object per line; blank lines are skipped
+    for line_num, line in enumerate(f, 1):
+        if (not line.strip()):
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f'Line {line_num}: {e.msg}!')
+        if (type(record) != dict or type(record.get('name')) != str or type(record.get('date')) != str):
+            raise ValueError(f'Line {line_num}: record needs a "name" and a "date" string!')
+        yield record['name'], record['date']
+
+# write_records: write (name, date) records to a stream as NDJSON lines or CSV rows
+#   f: (file) open text file, such as stdout
+#   records: (iterable(tuple(str, str))) (name, date_str) for each record
+#   fmt: (str) 'ndjson' or 'csv'; default 'ndjson'
+#   return: (int) number of records written
+def write_records(f, records, fmt='ndjson'):
+    if (fmt not in RECORD_FORMATS):
+        raise ValueError(f'Unknown record format "{fmt}"!')
+    count = 0
+    if (fmt == 'csv'):
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow(('name', 'date'))
+        for name, date_str in records:
+            writer.writerow((name, date_str))
+            count += 1
+    else:
+        for name, date_str in records:
+            f.write(json.dumps({'name': name, 'date': date_str}) + '\n')
+            count += 1
+    return count
+
+# write_atomic: write a file through a temporary file and a rename, so it is never left half-written
+#   f_loc: (str) location of the file
+#   data: (bytes) contents of the file
+def write_atomic(f_loc, data):
+    tmp = f'{f_loc}.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, f_loc)
+
+# Binary snapshot layout, all little-endian:
+#   header: magic, version, record count, name count, offset of name offsets, offset of name bytes, offset of records
+#   name offsets: (name count + 1) uint32 offsets into the name bytes
+#   name bytes: UTF-8 names back to back
+#   records: (int32 date ordinal, uint32 name ID) pairs sorted by ordinal, then name
+SNAPSHOT_MAGIC = b'HOLIDAYS'
+SNAPSHOT_VERSION = 1
+SNAPSHOT_HEADER = struct.Struct('<8sIIIQQQ')
+SNAPSHOT_RECORD = struct.Struct('<iI')
+
+# write_snapshot: write holidays to a binary snapshot file
+#   f_loc: (str) location and name of file to save
+#   rows: (iterable(tuple(str, int))) (name, date ordinal) for each holiday
+def write_snapshot(f_loc, rows):
+
+    # Give each name an ID, in order of first use
+    names = {}
+    records = []
+    for name, ordinal in rows:
+        name_id = names.get(name)
+        if (name_id == None):
+            name_id = len(names)
+            names[name] = name_id
+        records.append((ordinal, name_id))
+    records.sort(key=lambda record: (record[0], record[1]))
+
+    # Build the name table
+    name_bytes = bytearray()
+    name_offsets = [0]
+    for name in names:
+        name_bytes += name.encode('utf-8')
+        name_offsets.append(len(name_bytes))
+
+    # Lay out the sections after the header, keeping records 8-byte aligned
+    offsets_at = SNAPSHOT_HEADER.size
+    names_at = offsets_at + 4 * len(name_offsets)
+    records_at = (names_at + len(name_bytes) + 7) // 8 * 8
+
+    data = bytearray(records_at + SNAPSHOT_RECORD.size * len(records))
+    SNAPSHOT_HEADER.pack_into(data, 0, SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(records), len(names),
+        offsets_at, names_at, records_at)
+    struct.pack_into(f'<{len(name_offsets)}I', data, offsets_at, *name_offsets)
+    data[names_at:names_at + len(name_bytes)] = name_bytes
+    for i, record in enumerate(records):
+        SNAPSHOT_RECORD.pack_into(data, records_at + SNAPSHOT_RECORD.size * i, *record)
+    write_atomic(f_loc, bytes(data))
+
+# Snapshot: read-only view of a binary snapshot file, answered straight from a memory map
+class Snapshot:
+
+    # Docstring
+    """
+    Snapshot
+    --------
+    + f_loc: str
+    --------
+    __init__(f_loc): None
+    name(name_id): str
+    days(first, last): generator
+    find(name, ordinal): bool
+    rows(): generator
+    close(): None
+    __len__(): int
+    """
+
+    # Initializer: takes in the location of the snapshot file and maps it into memory
+    def __init__(self, f_loc):
+        self._f_loc = f_loc
+        with open(f_loc, 'rb') as f:
+            if (os.fstat(f.fileno()).st_size == 0):
+                raise ValueError(f'{f_loc} is not a holidays snapshot!')
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        # Check the header
+        if (len(self._map) < SNAPSHOT_HEADER.size):
+            raise ValueError(f'{f_loc} is not a holidays snapshot!')
+        magic, version, count, name_count, offsets_at, names_at, records_at = SNAPSHOT_HEADER.unpack_from(self._map, 0)
+        if (magic != SNAPSHOT_MAGIC):
+            raise ValueError(f'{f_loc} is not a holidays snapshot!')
+        if (version != SNAPSHOT_VERSION):
+            raise ValueError(f'{f_loc} is snapshot version {version}; only version {SNAPSHOT_VERSION} can be read!')
+
+        # Views over each section; nothing is decoded until it is asked for
+        view = memoryview(self._map)
+        self._count = count
+        self._name_offsets = view[offsets_at:offsets_at + 4 * (name_count + 1)].cast('I')
+        self._name_bytes = view[names_at:records_at]
+        self._records = view[records_at:records_at + SNAPSHOT_RECORD.size * count].cast('i')
+        self._names = {} # name ID -> decoded name, filled in as names are read
+
+    # Location getter
+    @property
+    def f_loc(self):
+        return self._f_loc
+
+    # name: decode a name from the name table
+    #   name_id: (int) ID of the name
+    #   return: (str) the name
+    def name(self, name_id):
+        name = self._names.get(name_id)
+        if (name == None):
+            name = str(self._name_bytes[self._name_offsets[name_id]:self._name_offsets[name_id + 1]], 'utf-8')
+            self._names[name_id] = name
+        return name
+
+    # days: get the holidays on a span of days
+    #   first: (int) ordinal of first day, inclusive
+    #   last: (int) ordinal of last day, exclusive
+    #   return: (generator) (name, ordinal) for each holiday, sorted by date
+    def days(self, first, last):
+        records = self._records
+        for i in range(self._bisect(first), self._bisect(last)):
+            yield (self.name(records[2 * i + 1] & 0xFFFFFFFF), records[2 * i])
+
+    # find: check whether a holiday is in the snapshot
+    #   name: (str) name of the holiday
+    #   ordinal: (int) ordinal of the date
+    #   return: (bool) True if found
+    def find(self, name, ordinal):
+        for day_name, day in self.days(ordinal, ordinal + 1):
+            if (day_name == name):
+                return True
+        return False
+
+    # rows: every holiday in the snapshot
+    #   return: (generator) (name, ordinal) for each holiday, sorted by date
+    def rows(self):
+        records = self._records
+        for i in range(self._count):
+            yield (self.name(records[2 * i + 1] & 0xFFFFFFFF), records[2 * i])
+
+    # close: release the memory map
+    def close(self):
+        self._name_offsets.release()
+        self._name_bytes.release()
+        self._records.release()
+        self._map.close()
+
+    # Number of holidays
+    def __len__(self):
+        return self._count
+
+    # _bisect: find the first record on or after a day
+    #   ordinal: (int) ordinal of the day
+    #   return: (int) index of the record
+    def _bisect(self, ordinal):
+        records = self._records
+        lo = 0
+        hi = self._count
+        while (lo < hi):
+            mid = (lo + hi) // 2
+            if (records[2 * mid] < ordinal):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+# AppendLog: write-ahead log of holiday edits, kept in numbered segment files next to a snapshot
+class AppendLog:
+
+    # Docstring
+    """
+    AppendLog
+    --------
+    + base_loc: str
+    + count: int
+    --------
+    __init__(base_loc, sync=True): None
+    append(op, name, ordinal): None
+    appendMany(records): None
+    replay(): generator
+    rotate(): list(str)
+    drop(segments): None
+    close(): None
+    """
+
+    # Initializer: takes in the location of the snapshot the log belongs to
+    #   NOTE: segments left by earlier runs are kept until they are dropped after a compaction; a new segment is only
+    #       created by the first append, so opening the log just to read it leaves no empty files behind
+    def __init__(self, base_loc, sync=True):
+        self._base_loc = base_loc
+        self._sync = sync
+        self._lock = threading.Lock()
+        self._count = 0
+        self._f = None # segment appends go to, once one has been made
+
+    # Base location getter
+    @property
+    def base_loc(self):
+        return self._base_loc
+
+    # Count getter: number of records not yet folded into the snapshot; those read by replay and those appended since,
+    #   up to the last rotate
+    @property
+    def count(self):
+        return self._count
+
+    # append: write one edit to the end of the log
+    #   op: (str) 'add' or 'remove'
+    #   name: (str) name of the holiday
+    #   ordinal: (int) ordinal of the date
+    def append(self, op, name, ordinal):
+        self.appendMany([(op, name, ordinal)])
+
+    # appendMany: write several edits to the end of the log with a single flush
+    #   records: (iterable(tuple(str, str, int))) (op, name, ordinal) for each edit
+    def appendMany(self, records):
+        lines = ''.join(json.dumps({'op': op, 'name': name, 'date': date.fromordinal(ordinal).isoformat()}) + '\n'
+            for op, name, ordinal in records)
+        if (not lines):
+            return
+        with self._lock:
+            if (self._f == None):
+                segments = self._segments()
+                self._f = open(self._segmentPath(segments[-1][0] + 1 if segments else 0), 'a', encoding='utf-8')
+            self._f.write(lines)
+            self._f.flush()
+            if (self._sync):
+                os.fsync(self._f.fileno())
+            self._count += lines.count('\n')
+
+    # replay: read back every edit in every segment, oldest first, counting them toward count
+    #   NOTE: a last line cut off by a crash is skipped
+    #   return: (generator) (op, name, ordinal) for each edit
+    def replay(self):
+        for number, path in self._segments():
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    with self._lock:
+                        self._count += 1
+                    yield (record['op'], record['name'], date.fromisoformat(record['date']).toordinal())
+
+    # rotate: seal every segment, so the next append starts a new one
+    #   return: (list(str)) locations of every sealed segment, which a compaction can drop once folded in
+    def rotate(self):
+        with self._lock:
+            if (self._f != None):
+                self._f.close()
+                self._f = None
+            sealed = [path for number, path in self._segments()]
+            self._count = 0
+        return sealed
+
+    # drop: delete sealed segments
+    #   segments: (list(str)) locations returned by rotate
+    def drop(self, segments):
+        for path in segments:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    # close: close the current segment, if one was made
+    def close(self):
+        with self._lock:
+            if (self._f != None):
+                self._f.close()
+                self._f = None
+
+    # _segmentPath: location of a segment
+    #   number: (int) segment number
+    #   return: (str) location of the segment
+    def _segmentPath(self, number):
+        return f'{self._base_loc}.log.{number}'
+
+    # _segments: every segment on disk, oldest first
+    #   return: (list(tuple(int, str))) (number, location) for each segment
+    def _segments(self):
+        segments = []
+        for path in glob.glob(glob.escape(self._base_loc) + '.log.*'):
+            suffix = path.rsplit('.', 1)[1]
+            if (suffix.isdigit()):
+                segments.append((int(suffix), path))
+        return sorted(segments)
+
+# batched: group items into lists
+#   items: (iterable) items to group
+#   size: (int) largest number of items in a group
+#   return: (generator) lists of items
+def batched(items, size):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if (len(batch) >= size):
+            yield batch
+            batch = []
+    if (batch):
+        yield batch
@@ -0,0 +1,427 @@
+from collections import namedtuple
+import json
+import os
+import queue
+import threading
+import time
+
+import scraper
+
+# Time and Date holidays pages by country code and year
+TIME_AND_DATE = 'https://www.timeanddate.com/holidays/{country}/{year}'
+
+# Source: pages of one country from one site; url is a template with {country} and {year} fields, and may be
+#   an http(s) URL or the path of a local file
+Source = namedtuple('Source', ['country', 'name', 'url', 'years'])
+
+# TaggedRow: a holiday ready to merge, with the country and source it came from
+TaggedRow = namedtuple('TaggedRow', ['name', 'ordinal', 'country', 'source'])
+
+# StageReport: work done by one stage; seconds runs from its first item to its last, busy adds up the time its
+#   workers spent working rather than waiting on the queues, rate is rows per second of seconds, and max_queued
+#   is the most items ever waiting for the stage
+StageReport = namedtuple('StageReport', ['stage', 'workers', 'items', 'rows', 'errors', 'seconds', 'busy', 'rate', 'max_queued'])
+
+# SyncReport: what a sync changed; skipped pages had the same fingerprint as last time and were not parsed, and
+#   unchanged counts the rows of skipped pages plus the rows of changed pages that were there last time too
+SyncReport = namedtuple('SyncReport', ['pages', 'skipped', 'added', 'removed', 'unchanged'])
+
+# Marks the end of a queue; each worker that reads it stops
+DONE = object()
+
+# make_sources: build one source per country, all covering the same years
+#   countries: (iterable(str)) country codes, as they appear in the URLs
+#   years: (iterable(int)) years to read
+#   url: (str, def TIME_AND_DATE) template with {country} and {year} fields
+#   name: (str, def 'timeanddate') name of the source, kept on each holiday
+#   return: (list(Source)) sources in the order given
+def make_sources(countries, years, url=TIME_AND_DATE, name='timeanddate'):
+    years = tuple(years)
+    return [Source(country, name, url, years) for country in countries]
+
+# read_page: get the text of a source page, from the web or from a local file
+#   session: (requests.Session) session for web pages; None when every source is local
+#   url: (str) URL or file path of the page
+#   year: (int) year the page covers, which decides how long a cached copy is fresh
+#   timeout: (float) seconds to wait on the connection and on each read
+#   retries: (int) number of retries for web pages
+#   cache: (scraper.PageCache) cache for web pages; None to always download
+#   return: (str) text of the page
+def read_page(session, url, year, timeout, retries, cache):
+    if (url.startswith('http://') or url.startswith('https://')):
+        return scraper.fetch_page(session, url, timeout=timeout, retries=retries, cache=cache, ttl=scraper.year_ttl(year))
+    if (url.startswith('file://')):
+        url = url[len('file://'):]
+    with open(url, 'r', encoding='utf-8') as f:
+        return f.read()
+
+# page_key: name a source's page for a year in a SyncState
+#   source: (Source) source of the page
+#   year: (int) year the page covers
+#   return: (str) key of the page
+def page_key(source, year):
+    return f'{source.name}/{source.country}/{year}'
+
+# SyncState: the fingerprint and rows of each page as of the last sync, saved to a JSON file
+#   NOTE: only valid for the list the syncs were applied to; a list loaded from elsewhere needs a fresh state
+class SyncState:
+
+    # Docstring
+    """
+    SyncState
+    --------
+    + path: str
+    --------
+    __init__(path): None
+    fingerprint(key): str
+    rows(key): list(tuple(str, int))
+    put(key, fingerprint, rows): None
+    heldElsewhere(key, rows): set(tuple(str, int))
+    save(): None
+    Getters: path
+    """
+
+    # Initializer: takes in the state file, and loads it if it exists; an unreadable file starts empty
+    def __init__(self, path):
+        self._path = path
+        self._lock = threading.Lock()
+        self._pages = {}
+        try:
+            with open(path, 'r') as f:
+                self._pages = json.load(f)
+        except (OSError, ValueError):
+            self._pages = {}
+
+    # Path getter
+    @property
+    def path(self):
+        return self._path
+
+    # fingerprint: get the fingerprint of a page as of the last sync
+    #   key: (str) key of the page, from page_key
+    #   return: (str) fingerprint; None if the page has never been synced
+    def fingerprint(self, key):
+        with self._lock:
+            page = self._pages.get(key)
+            return page['fingerprint'] if page != None else None
+
+    # rows: get the rows of a page as of the last sync
+    #   key: (str) key of the page, from page_key
+    #   return: (list(tuple(str, int))) (name, ordinal) rows; empty if the page has never been synced
+    def rows(self, key):
+        with self._lock:
+            page = self._pages.get(key)
+            return [(name, ordinal) for name, ordinal in page['rows']] if page != None else []
+
+    # put: record the fingerprint and rows a page was synced to
+    #   key: (str) key of the page, from page_key
+    #   fingerprint: (str) fingerprint of the page
+    #   rows: (list(tuple(str, int))) (name, ordinal) rows of the page
+    def put(self, key, fingerprint, rows):
+        with self._lock:
+            self._pages[key] = {'fingerprint': fingerprint, 'rows': [list(row) for row in rows]}
+
+    # heldElsewhere: find which rows are also on other pages, so removing them from one page keeps them in the list
+    #   key: (str) key of the page the rows were removed from
+    #   rows: (iterable(tuple(str, int))) (name, ordinal) rows
+    #   return: (set(tuple(str, int))) rows that some other page still has
+    def heldElsewhere(self, key, rows):
+        rows = set(rows)
+        held = set()
+        with self._lock:
+            for other, page in self._pages.items():
+                if (other != key):
+                    held.update(row for row in map(tuple, page['rows']) if row in rows)
+        return held
+
+    # save: write the state file through a temporary file so it is never left half-written
+    def save(self):
+        with self._lock:
+            data = json.dumps(self._pages)
+        folder = os.path.dirname(self._path)
+        if (folder != ''):
+            os.makedirs(folder, exist_ok=True)
+        with open(self._path + '.tmp', 'w') as f:
+            f.write(data)
+        os.replace(self._path + '.tmp', self._path)
+
+# Stage: a pool of worker threads reading from one bounded queue and writing to the next
+class Stage:
+
+    # Docstring
+    """
+    Stage
+    --------
+    + name: str
+    + failures: list(tuple(str, int, Exception))
+    --------
+    __init__(name, work, workers, inbox, outbox, downstream): None
+    start(): None
+    join(): None
+    report(): StageReport
+    Getters: name, failures
+    """
+
+    # Initializer: takes in the work each item needs and the queues around the stage
+    #   name: (str) name of the stage, for reports
+    #   work: (function) takes an item; returns (list, int) of items for the next stage and rows handled
+    #   workers: (int) number of worker threads
+    #   inbox: (queue.Queue) queue the stage reads from; ends with one DONE per worker
+    #   outbox: (queue.Queue) queue the stage writes to; None for the last stage
+    #   downstream: (int) number of workers reading outbox, each of which is sent a DONE when this stage ends
+    def __init__(self, name, work, workers, inbox, outbox, downstream):
+        self._name = name
+        self._work = work
+        self._inbox = inbox
+        self._outbox = outbox
+        self._downstream = downstream
+        self._threads = [threading.Thread(target=self._run, daemon=True) for i in range(max(workers, 1))]
+        self._running = len(self._threads)
+        self._lock = threading.Lock()
+        self._items = 0
+        self._rows = 0
+        self._busy = 0.0
+        self._failures = [] # (country, year, error) for each item that failed
+        self._first = None # time the first item was picked up
+        self._last = None # time the last item was finished
+        self._max_queued = 0
+
+    # Name getter
+    @property
+    def name(self):
+        return self._name
+
+    # Failures getter: (country, year, error) for each item that failed
+    @property
+    def failures(self):
+        return list(self._failures)
+
+    # start: start the workers
+    def start(self):
+        for thread in self._threads:
+            thread.start()
+
+    # join: wait for the workers to finish
+    def join(self):
+        for thread in self._threads:
+            thread.join()
+
+    # report: summarize the work done so far
+    #   return: (StageReport) counts and throughput of the stage
+    def report(self):
+        with self._lock:
+            seconds = (self._last - self._first) if self._first != None else 0.0
+            rate = self._rows / seconds if seconds > 0 else 0.0
+            return StageReport(self._name, len(self._threads), self._items, self._rows, len(self._failures),
+                seconds, self._busy, rate, self._max_queued)
+
+    # _run: work through items until a DONE arrives; the last worker out passes the end on downstream
+    def _run(self):
+        while (True):
+            queued = self._inbox.qsize()
+            item = self._inbox.get()
+            if (item is DONE):
+                break
+            start = time.perf_counter()
+
+            # A failed item is recorded and dropped; the rest of the run carries on
+            try:
+                results, rows = self._work(item)
+            except Exception as e:
+                with self._lock:
+                    self._failures.append((item[0].country, item[1], e))
+                continue
+            busy = time.perf_counter() - start
+
+            for result in results:
+                self._outbox.put(result)
+            end = time.perf_counter()
+            with self._lock:
+                self._items += 1
+                self._rows += rows
+                self._busy += busy
+                self._max_queued = max(self._max_queued, queued)
+                self._first = start if self._first == None else min(self._first, start)
+                self._last = end if self._last == None else max(self._last, end)
+
+        with self._lock:
+            self._running -= 1
+            last = self._running == 0
+        if (last and self._outbox != None):
+            for i in range(self._downstream):
+                self._outbox.put(DONE)
+
+# Pipeline: streams holidays from many countries and sources through fetch, parse, normalize and merge stages
+class Pipeline:
+
+    # Docstring
+    """
+    Pipeline
+    --------
+    + reports: list(StageReport)
+    + failures: list(tuple(str, str, int, Exception))
+    + changes: SyncReport
+    --------
+    __init__(sources, merge, fetch_workers=4, parse_workers=2, normalize_workers=1, queue_size=8,
+        timeout=10, retries=2, cache=None, parser='regex', state=None, parse_processes=0): None
+    run(): list(StageReport)
+    Getters: reports, failures, changes
+    """
+
+    # Initializer: takes in the sources and where merged holidays go
+    #   NOTE: every queue holds at most queue_size items, so a slow stage holds back the ones before it
+    #       instead of letting pages pile up in memory
+    #   NOTE: with a state, pages whose fingerprint has not changed since the last sync are dropped before they are
+    #       parsed, and changed pages only pass on the rows they gained and lost
+    #   sources: (iterable(Source)) countries and years to read
+    #   merge: (function) takes the list(TaggedRow) a page added and the list(tuple(str, int)) (name, ordinal) rows
+    #       it removed; returns (int, int) the number of holidays added to and removed from the list
+    #   fetch_workers: (int) pages downloaded or read at the same time; default 4
+    #   parse_workers: (int) pages parsed at the same time; default 2, raised to parse_processes if that is higher
+    #   normalize_workers: (int) pages normalized at the same time; default 1
+    #   queue_size: (int) most items waiting between two stages; default 8
+    #   timeout: (float) seconds to wait on each request; default 10
+    #   retries: (int) number of retries for each web page; default 2
+    #   cache: (scraper.PageCache) cache for web pages; default None to always download
+    #   parser: (str) parser backend from scraper.PARSERS; default 'regex'
+    #   state: (SyncState) fingerprints and rows from the last sync, updated by run; the caller saves it once the
+    #       merged holidays are saved, so a sync never skips pages whose holidays were lost; default None to merge
+    #       every row of every page
+    #   parse_processes: (int) worker processes the parse stage hands pages to, so parsing is not held to one core by
+    #       the GIL; default 0 to parse in the stage's threads
+    def __init__(self, sources, merge, fetch_workers=4, parse_workers=2, normalize_workers=1, queue_size=8,
+            timeout=10, retries=2, cache=None, parser='regex', state=None, parse_processes=0):
+        self._sources = list(sources)
+        self._merge = merge
+
+        # Each parse thread waits on one page at a time, so it takes a thread per process to keep them all busy
+        self._workers = {'fetch': fetch_workers, 'parse': max(parse_workers, parse_processes), 'normalize': normalize_workers, 'merge': 1}
+        self._parse_processes = parse_processes
+        self._parse_pool = None
+        self._queue_size = queue_size
+        self._timeout = timeout
+        self._retries = retries
+        self._cache = cache
+        self._parser = parser
+        self._state = state
+        self._session = None
+        self._stages = []
+        self._changes = {'pages': 0, 'skipped': 0, 'added': 0, 'removed': 0, 'unchanged': 0}
+        self._changes_lock = threading.Lock()
+
+    # Reports getter: one StageReport per stage, in pipeline order
+    @property
+    def reports(self):
+        return [stage.report() for stage in self._stages]
+
+    # Failures getter: (stage, country, year, error) for each page that could not be read or merged
+    @property
+    def failures(self):
+        return [(stage.name,) + failure for stage in self._stages for failure in stage.failures]
+
+    # Changes getter: pages read and skipped, and holidays added, removed and left unchanged
+    @property
+    def changes(self):
+        with self._changes_lock:
+            return SyncReport(**self._changes)
+
+    # run: read every source and merge its holidays, returning once the last page is merged
+    #   return: (list(StageReport)) one report per stage, in pipeline order
+    def run(self):
+        names = ['fetch', 'parse', 'normalize', 'merge']
+        work = [self._fetch, self._parse, self._normalize, self._mergePage]
+        queues = [queue.Queue(maxsize=self._queue_size) for name in names]
+        self._stages = []
+        for i, name in enumerate(names):
+            outbox = queues[i + 1] if i + 1 < len(names) else None
+            downstream = self._workers[names[i + 1]] if i + 1 < len(names) else 0
+            self._stages.append(Stage(name, work[i], self._workers[name], queues[i], outbox, downstream))
+
+        # Web sources share one pooled session
+        if (any(source.url.startswith('http') for source in self._sources)):
+            self._session = scraper.make_session(pool_size=max(self._workers['fetch'], 1))
+        self._parse_pool = scraper.make_parse_pool(self._parse_processes)
+        try:
+            for stage in self._stages:
+                stage.start()
+
+            # Feed pages in; put() waits whenever the fetch stage is behind
+            for source in self._sources:
+                for year in source.years:
+                    queues[0].put((source, year))
+            for i in range(self._workers['fetch']):
+                queues[0].put(DONE)
+            for stage in self._stages:
+                stage.join()
+        finally:
+            if (self._session != None):
+                self._session.close()
+                self._session = None
+            if (self._parse_pool != None):
+                self._parse_pool.shutdown(cancel_futures=True)
+                self._parse_pool = None
+        return self.reports
+
+    # _count: add to the sync counters
+    #   counts: (dict) counter -> amount to add
+    def _count(self, **counts):
+        with self._changes_lock:
+            for name, amount in counts.items():
+                self._changes[name] += amount
+
+    # _fetch: get the page of a source for a year, dropping it if it has not changed since the last sync
+    #   item: (tuple(Source, int)) source and year
+    #   return: (tuple(list, int)) the page and its fingerprint for the parse stage, and 1 page
+    def _fetch(self, item):
+        source, year = item
+        url = source.url.format(country=source.country, year=year)
+        html = read_page(self._session, url, year, self._timeout, self._retries, self._cache)
+        fingerprint = None
+        if (self._state != None):
+            fingerprint = scraper.page_fingerprint(html)
+            if (self._state.fingerprint(page_key(source, year)) == fingerprint):
+                self._count(pages=1, skipped=1, unchanged=len(self._state.rows(page_key(source, year))))
+                return [], 1
+        return [(source, year, html, fingerprint)], 1
+
+    # _parse: pull the (name, ordinal) rows out of a page, in a worker process if there is a pool
+    #   NOTE: names are tidied, dates turned into ordinals and repeats within the page dropped here, so only compact
+    #       rows come back from a worker process
+    #   item: (tuple(Source, int, str, str)) source, year, page and fingerprint
+    #   return: (tuple(list, int)) the rows for the normalize stage, and the number of rows
+    def _parse(self, item):
+        source, year, html, fingerprint = item
+        if (self._parse_pool == None):
+            rows, failed = scraper.parse_page_rows(html, year, self._parser)
+        else:
+            rows, failed = self._parse_pool.submit(scraper.parse_page_rows, html, year, self._parser).result()
+        return [(source, year, rows, fingerprint)], len(rows)
+
+    # _normalize: tag each row with the country and source of its page
+    #   item: (tuple(Source, int, list, str)) source, year, (name, ordinal) rows and fingerprint
+    #   return: (tuple(list, int)) the tagged rows for the merge stage, and the number of rows
+    def _normalize(self, item):
+        source, year, rows, fingerprint = item
+        tagged = [TaggedRow(name, ordinal, source.country, source.name) for name, ordinal in rows]
+        return [(source, year, tagged, fingerprint)], len(tagged)
+
+    # _mergePage: hand a page's rows to the merge function; with a state, only the rows that changed since the last sync
+    #   item: (tuple(Source, int, list, str)) source, year, tagged rows and fingerprint
+    #   return: (tuple(list, int)) nothing for a next stage, and the number of holidays added and removed
+    def _mergePage(self, item):
+        source, year, rows, fingerprint = item
+        if (self._state == None):
+            added, removed = self._merge(rows, [])
+            self._count(pages=1, added=added)
+            return [], added
+
+        # Diff against the rows the page had last time; rows another page still has stay in the list
+        key = page_key(source, year)
+        old = set(self._state.rows(key))
+        new = {(row.name, row.ordinal) for row in rows}
+        gone = old - new
+        gone -= self._state.heldElsewhere(key, gone)
+        added, removed = self._merge([row for row in rows if (row.name, row.ordinal) not in old], sorted(gone))
+        self._state.put(key, fingerprint, sorted(new))
+        self._count(pages=1, added=added, removed=removed, unchanged=len(new & old))
+        return [], added + removed
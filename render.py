@@ -0,0 +1,142 @@
+from collections import OrderedDict
+from datetime import date
+import threading
+import time
+
+# Formatted weeks kept by a RenderCache
+MAX_WEEKS = 512
+
+# format_holiday: format one holiday as the menu shows it
+#   name: (str) holiday name
+#   date_str: (str) 'YYYY-MM-DD' date of the holiday
+#   weather: (str, def None) weather of the day to add after the date; None to leave it off
+#   return: (str) e.g. 'Juneteenth (2024-06-19)' or 'Juneteenth (2024-06-19) - Sunny'
+def format_holiday(name, date_str, weather=None):
+    if (weather == None):
+        return f'{name} ({date_str})'
+    return f'{name} ({date_str}) - {weather}'
+
+# week_of: get the ISO week a day falls in
+#   ordinal: (int) ordinal of the day
+#   return: (tuple(int, int)) ISO year and week number
+def week_of(ordinal):
+    return date.fromordinal(ordinal).isocalendar()[:2]
+
+# RenderCache: formatted holidays of recently viewed weeks, dropped week by week as the list changes
+#   NOTE: keys start with the ISO year and week; anything after that tells apart renderings of the same week
+class RenderCache:
+
+    # Docstring
+    """
+    RenderCache
+    --------
+    + max_weeks: int
+    + stats: dict
+    --------
+    __init__(max_weeks=MAX_WEEKS): None
+    get(key): list(str)
+    put(key, lines, version, ttl=None): bool
+    invalidate(weeks, version): None
+    clear(version): None
+    Getters: max_weeks, stats
+    Setters: max_weeks
+    """
+
+    # Initializer: starts empty, at version 0
+    #   max_weeks: (int) most renderings kept, least recently used dropped first; default MAX_WEEKS
+    def __init__(self, max_weeks=MAX_WEEKS):
+        self._lock = threading.Lock()
+        self._max_weeks = max_weeks
+        self._entries = OrderedDict() # key -> (lines, time the lines go stale or None)
+        self._keys = {} # (year, week) -> set of keys rendered for that week
+        self._version = 0 # version of the list the entries were rendered from
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+
+    # max_weeks getter
+    @property
+    def max_weeks(self):
+        return self._max_weeks
+
+    # max_weeks setter: shrinking drops the least recently used renderings at once
+    @max_weeks.setter
+    def max_weeks(self, max_weeks):
+        with self._lock:
+            self._max_weeks = max_weeks
+            self._evict()
+
+    # Stats getter: hits, misses, evictions, invalidations, the hit rate and how full the cache is
+    @property
+    def stats(self):
+        with self._lock:
+            lookups = self._stats['hits'] + self._stats['misses']
+            return dict(self._stats, hit_rate=self._stats['hits'] / lookups if lookups > 0 else 0.0,
+                size=len(self._entries), max_weeks=self._max_weeks)
+
+    # get: look up a rendering
+    #   key: (tuple) (year, week, ...) key it was put under
+    #   return: (list(str)) formatted lines; None if it isn't cached or has gone stale
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if (entry != None and entry[1] != None and entry[1] <= time.monotonic()):
+                self._drop(key)
+                entry = None
+            if (entry == None):
+                self._stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return entry[0]
+
+    # put: keep a rendering, unless the list has changed since it was rendered
+    #   key: (tuple) (year, week, ...) key to put it under
+    #   lines: (list(str)) formatted lines
+    #   version: (int) version of the list the lines were rendered from
+    #   ttl: (float, def None) seconds the lines stay good for, e.g. while they show a forecast; None for as long as
+    #       the week is unchanged
+    #   return: (bool) True if it was kept
+    def put(self, key, lines, version, ttl=None):
+        with self._lock:
+            if (version != self._version or self._max_weeks <= 0):
+                return False
+            self._entries[key] = (lines, None if ttl == None else time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            self._keys.setdefault(key[:2], set()).add(key)
+            self._evict()
+            return True
+
+    # invalidate: drop the renderings of weeks that changed
+    #   weeks: (iterable(tuple(int, int))) ISO year and week of each week that changed
+    #   version: (int) version of the list after the change
+    def invalidate(self, weeks, version):
+        with self._lock:
+            self._version = version
+            for week in weeks:
+                for key in self._keys.pop(week, ()):
+                    del self._entries[key]
+                    self._stats['invalidations'] += 1
+
+    # clear: drop every rendering
+    #   version: (int) version of the list after the change
+    def clear(self, version):
+        with self._lock:
+            self._version = version
+            self._stats['invalidations'] += len(self._entries)
+            self._entries.clear()
+            self._keys.clear()
+
+    # _evict: drop least recently used renderings until the cache fits; called with the lock held
+    def _evict(self):
+        while (len(self._entries) > max(self._max_weeks, 0)):
+            key = next(iter(self._entries))
+            self._drop(key)
+            self._stats['evictions'] += 1
+
+    # _drop: forget one rendering; called with the lock held
+    #   key: (tuple) key to drop
+    def _drop(self, key):
+        del self._entries[key]
+        keys = self._keys.get(key[:2])
+        keys.discard(key)
+        if (not keys):
+            del self._keys[key[:2]]
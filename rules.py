@@ -0,0 +1,292 @@
+from collections import OrderedDict, namedtuple
+from datetime import MAXYEAR, MINYEAR, date
+import bisect
+import calendar
+import json
+import threading
+
+import persistence
+
+# Kinds of rule
+FIXED = 'fixed' # same month and day every year
+NTH_WEEKDAY = 'nth_weekday' # nth weekday of a month, e.g. the 4th Thursday of November
+LAST_WEEKDAY = 'last_weekday' # last weekday of a month, e.g. the last Monday of May
+EASTER = 'easter' # a number of days before or after Western Easter Sunday
+KINDS = (FIXED, NTH_WEEKDAY, LAST_WEEKDAY, EASTER)
+
+# Expanded years kept by a RuleSet
+CACHED_YEARS = 64
+
+# Rule: one recurring holiday; unused fields are 0, weekday counts from Monday as 0, offset is days from Easter,
+#   and first and last bound the years it happens in, inclusive, with None for no bound
+Rule = namedtuple('Rule', ['name', 'kind', 'month', 'day', 'weekday', 'nth', 'offset', 'first', 'last'])
+
+# fixed_date: make a rule for the same month and day every year; February 29 only happens in leap years
+#   name: (str) holiday name
+#   month: (int) month, 1 to 12
+#   day: (int) day of the month
+#   first: (int, def None) first year, or None for no bound
+#   last: (int, def None) last year, or None for no bound
+#   return: (Rule) rule
+def fixed_date(name, month, day, first=None, last=None):
+    return Rule(name, FIXED, month, day, 0, 0, 0, first, last)
+
+# nth_weekday: make a rule for the nth weekday of a month
+#   name: (str) holiday name
+#   month: (int) month, 1 to 12
+#   weekday: (int) weekday, Monday 0 to Sunday 6
+#   nth: (int) which one, 1 to 5; a 5th that a month doesn't have is skipped that year
+#   first: (int, def None) first year, or None for no bound
+#   last: (int, def None) last year, or None for no bound
+#   return: (Rule) rule
+def nth_weekday(name, month, weekday, nth, first=None, last=None):
+    return Rule(name, NTH_WEEKDAY, month, 0, weekday, nth, 0, first, last)
+
+# last_weekday: make a rule for the last weekday of a month
+#   name: (str) holiday name
+#   month: (int) month, 1 to 12
+#   weekday: (int) weekday, Monday 0 to Sunday 6
+#   first: (int, def None) first year, or None for no bound
+#   last: (int, def None) last year, or None for no bound
+#   return: (Rule) rule
+def last_weekday(name, month, weekday, first=None, last=None):
+    return Rule(name, LAST_WEEKDAY, month, 0, weekday, 0, 0, first, last)
+
+# easter_offset: make a rule for a number of days from Western Easter Sunday
+#   name: (str) holiday name
+#   offset: (int) days after Easter; negative for days before, e.g. -2 for Good Friday
+#   first: (int, def None) first year, or None for no bound
+#   last: (int, def None) last year, or None for no bound
+#   return: (Rule) rule
+def easter_offset(name, offset, first=None, last=None):
+    return Rule(name, EASTER, 0, 0, 0, 0, offset, first, last)
+
+# check_rule: make sure a rule can be expanded
+#   rule: (Rule) rule to check
+#   return: (Rule) the same rule
+def check_rule(rule):
+    if (rule.kind not in KINDS):
+        raise ValueError(f'Unknown rule kind "{rule.kind}"!')
+    if (rule.kind != EASTER and not 1 <= rule.month <= 12):
+        raise ValueError(f'Rule "{rule.name}" has no month {rule.month}!')
+    if (rule.kind == FIXED and not 1 <= rule.day <= (29 if rule.month == 2 else calendar.monthrange(2001, rule.month)[1])):
+        raise ValueError(f'Rule "{rule.name}" has no day {rule.day} in month {rule.month}!')
+    if (rule.kind in (NTH_WEEKDAY, LAST_WEEKDAY) and not 0 <= rule.weekday <= 6):
+        raise ValueError(f'Rule "{rule.name}" has no weekday {rule.weekday}!')
+    if (rule.kind == NTH_WEEKDAY and not 1 <= rule.nth <= 5):
+        raise ValueError(f'Rule "{rule.name}" cannot be weekday number {rule.nth} of a month!')
+    return rule
+
+# easter: get the date of Western Easter Sunday
+#   NOTE: the anonymous Gregorian algorithm
+#   year: (int) year
+#   return: (date) Easter Sunday
+def easter(year):
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+# occurrence: get the day a rule falls on in a year
+#   rule: (Rule) rule
+#   year: (int) year
+#   return: (int) ordinal of the day; None if the rule doesn't happen that year
+def occurrence(rule, year):
+    if ((rule.first != None and year < rule.first) or (rule.last != None and year > rule.last)):
+        return None
+    if (rule.kind == FIXED):
+        if (rule.month == 2 and rule.day == 29 and not calendar.isleap(year)):
+            return None
+        return date(year, rule.month, rule.day).toordinal()
+    if (rule.kind == EASTER):
+        return easter(year).toordinal() + rule.offset
+
+    # Weekdays count from the first or last day of the month
+    days = calendar.monthrange(year, rule.month)[1]
+    if (rule.kind == LAST_WEEKDAY):
+        last = date(year, rule.month, days)
+        return last.toordinal() - (last.weekday() - rule.weekday) % 7
+    day = 1 + (rule.weekday - date(year, rule.month, 1).weekday()) % 7 + 7 * (rule.nth - 1)
+    if (day > days):
+        return None
+    return date(year, rule.month, day).toordinal()
+
+# infer_rule: find a rule that gives exactly the dates a holiday was seen on, one per year in a run of years
+#   NOTE: the years must have no gaps, since the rule would give the holiday in the missing years too
+#   name: (str) holiday name
+#   ordinals: (list(int)) ordinals of the days it was seen on
+#   min_years: (int, def 3) fewest years it must be seen in to count as recurring
+#   return: (Rule) rule for the first to the last year seen; None if no rule fits
+def infer_rule(name, ordinals, min_years=3):
+    days = [date.fromordinal(ordinal) for ordinal in sorted(ordinals)]
+    years = [day.year for day in days]
+    if (len(years) < min_years or years != list(range(years[0], years[0] + len(years)))):
+        return None
+
+    # Try the simplest kinds first; each candidate comes from the first day and must fit every other day
+    first = days[0]
+    candidates = [fixed_date(name, first.month, first.day, first=years[0], last=years[-1])]
+    candidates.append(last_weekday(name, first.month, first.weekday(), first=years[0], last=years[-1]))
+    candidates.append(nth_weekday(name, first.month, first.weekday(), (first.day - 1) // 7 + 1, first=years[0], last=years[-1]))
+    candidates.append(easter_offset(name, first.toordinal() - easter(first.year).toordinal(), first=years[0], last=years[-1]))
+    for rule in candidates:
+        if (all(occurrence(rule, day.year) == day.toordinal() for day in days)):
+            return rule
+    return None
+
+# load_rules: read rules saved by save_rules
+#   f_loc: (str) location of the rules file
+#   return: (list(Rule)) rules in the order saved
+def load_rules(f_loc):
+    with open(f_loc, 'r') as f:
+        return [check_rule(Rule(**rule)) for rule in json.load(f)['rules']]
+
+# save_rules: write rules to a {"rules": [...]} JSON file
+#   f_loc: (str) location and name of file to save
+#   rules: (iterable(Rule)) rules to save
+def save_rules(f_loc, rules):
+    persistence.write_atomic(f_loc, json.dumps({'rules': [rule._asdict() for rule in rules]}).encode('utf-8'))
+
+# RuleSet: recurring holidays, expanded a year at a time only for the years being queried
+class RuleSet:
+
+    # Docstring
+    """
+    RuleSet
+    --------
+    + rules: list(Rule)
+    + version: int
+    + stats: dict
+    --------
+    __init__(cached_years=CACHED_YEARS): None
+    add(rule): bool
+    remove(name): int
+    between(start, end): generator(tuple(int, str))
+    find(name, ordinal): bool
+    Getters: rules, version, stats
+    """
+
+    # Initializer: starts with no rules
+    #   cached_years: (int) expanded years kept, least recently used dropped first; default CACHED_YEARS
+    def __init__(self, cached_years=CACHED_YEARS):
+        self._rules = []
+        self._lock = threading.Lock()
+        self._cached_years = cached_years
+        self._years = OrderedDict() # year -> sorted (ordinal, name) occurrences
+        self._version = 0 # goes up by one with every change to the rules
+        self._stats = {'hits': 0, 'expansions': 0}
+
+    # Rules getter
+    @property
+    def rules(self):
+        with self._lock:
+            return list(self._rules)
+
+    # Version getter: changes whenever the rules do, so anything built from them can tell when it is out of date
+    @property
+    def version(self):
+        return self._version
+
+    # Stats getter: years served from the cache and years expanded
+    @property
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, cached=len(self._years))
+
+    # __len__: number of rules
+    def __len__(self):
+        return len(self._rules)
+
+    # add: add a rule, dropping every expanded year
+    #   NOTE: the list of rules is replaced rather than appended to, so an expansion already running keeps the list it
+    #       started with and can tell it is out of date
+    #   rule: (Rule) rule to add
+    #   return: (bool) True if it was added; False if the same rule was already there
+    def add(self, rule):
+        check_rule(rule)
+        with self._lock:
+            if (rule in self._rules):
+                return False
+            self._rules = self._rules + [rule]
+            self._years.clear()
+            self._version += 1
+            return True
+
+    # remove: remove every rule for a holiday name, dropping every expanded year
+    #   name: (str) holiday name
+    #   return: (int) number of rules removed
+    def remove(self, name):
+        with self._lock:
+            kept = [rule for rule in self._rules if rule.name != name]
+            removed = len(self._rules) - len(kept)
+            if (removed > 0):
+                self._rules = kept
+                self._years.clear()
+                self._version += 1
+            return removed
+
+    # between: get the occurrences from a start day up to, but not including, an end day
+    #   NOTE: a generator that works through one year at a time, so long spans only hold the cached years
+    #   start: (int) ordinal of the first day, inclusive
+    #   end: (int) ordinal of the last day, exclusive
+    #   return: (generator(tuple(int, str))) (ordinal, name) of each occurrence, sorted by date
+    def between(self, start, end):
+        end = min(end, date.max.toordinal() + 1)
+        if (not self._rules or start >= end):
+            return
+        for year in range(date.fromordinal(start).year, date.fromordinal(end - 1).year + 1):
+            occurrences = self._year(year)
+            lo = bisect.bisect_left(occurrences, (start,))
+            hi = bisect.bisect_left(occurrences, (end,))
+            yield from occurrences[lo:hi]
+
+    # find: check whether a holiday is an occurrence of a rule
+    #   name: (str) holiday name
+    #   ordinal: (int) ordinal of the day
+    #   return: (bool) True if a rule for that name falls on that day
+    def find(self, name, ordinal):
+        if (not self._rules):
+            return False
+        occurrences = self._year(date.fromordinal(ordinal).year)
+        i = bisect.bisect_left(occurrences, (ordinal, name))
+        return i < len(occurrences) and occurrences[i] == (ordinal, name)
+
+    # _year: get the occurrences of every rule in a calendar year, from the cache if it has been expanded lately
+    #   NOTE: Easter offsets can reach into the years either side, so those are worked out from them too, as long as
+    #       they are years a date can be in
+    #   year: (int) year
+    #   return: (list(tuple(int, str))) (ordinal, name) of each occurrence, sorted
+    def _year(self, year):
+        with self._lock:
+            occurrences = self._years.get(year)
+            if (occurrences != None):
+                self._years.move_to_end(year)
+                self._stats['hits'] += 1
+                return occurrences
+            rules = self._rules
+
+        # Expand outside the lock; two threads expanding the same year get the same answer
+        first = date(year, 1, 1).toordinal()
+        last = date(year, 12, 31).toordinal()
+        found = []
+        for rule in rules:
+            for rule_year in (range(max(year - 1, MINYEAR), min(year + 1, MAXYEAR) + 1) if rule.kind == EASTER else (year,)):
+                ordinal = occurrence(rule, rule_year)
+                if (ordinal != None and first <= ordinal <= last):
+                    found.append((ordinal, rule.name))
+        found.sort()
+
+        with self._lock:
+            if (rules is self._rules):
+                self._years[year] = found
+                self._stats['expansions'] += 1
+                while (len(self._years) > self._cached_years):
+                    self._years.popitem(last=False)
+        return found
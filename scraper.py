@@ -0,0 +1,461 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from datetime import datetime
+from functools import lru_cache
+import hashlib
+import html as html_lib
+import io
+import json
+import multiprocessing
+import os
+import re
+import sys
+import threading
+import time
+
+import dates
+import instrument
+
+# NOTE: requests, BeautifulSoup and lxml are slow to import, so each is imported by the first function that needs it
+
+# lxml_etree: import lxml's etree on first use; lxml is optional, so without it the lxml parser backend is unavailable
+#   return: (module) lxml.etree; None if lxml is not installed
+@lru_cache(maxsize=None)
+def lxml_etree():
+    try:
+        from lxml import etree
+    except ImportError:
+        return None
+    return etree
+
+# Cache lifetimes: past years never change, the current and future years still might
+PAST_YEAR_TTL = 365 * 24 * 60 * 60
+CURRENT_YEAR_TTL = 24 * 60 * 60
+
+# PageCache: on-disk HTTP cache that stores page bodies with their validators
+class PageCache:
+
+    # Docstring
+    """
+    PageCache
+    --------
+    + cache_dir: str
+    + max_bytes: int
+    + stats: dict
+    --------
+    __init__(cache_dir, max_bytes=50000000): None
+    get(url): dict
+    put(url, body, etag, last_modified): None
+    touch(url): None
+    hit(): None
+    """
+
+    # Initializer: takes in the cache directory and size limit, and loads the index of cached pages
+    def __init__(self, cache_dir, max_bytes=50000000):
+        self._cache_dir = cache_dir
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'revalidated': 0, 'misses': 0, 'evictions': 0}
+
+        # Load index of cached pages; start empty if it is missing or unreadable
+        self._index = {}
+        os.makedirs(cache_dir, exist_ok=True)
+        try:
+            with open(self._indexPath(), 'r') as f:
+                self._index = json.load(f)
+        except (OSError, ValueError):
+            self._index = {}
+
+    # Getters
+
+    # Cache directory getter
+    @property
+    def cache_dir(self):
+        return self._cache_dir
+
+    # Size limit getter
+    @property
+    def max_bytes(self):
+        return self._max_bytes
+
+    # Counters getter: hits served without a request, 304 revalidations, full downloads and evictions
+    @property
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+    # get: look up a cached page
+    #   url: (str) URL of the page
+    #   return: (dict) entry with body, etag, last_modified and fetched time; None if not cached
+    def get(self, url):
+        with self._lock:
+            entry = self._index.get(url)
+            if (entry == None):
+                return None
+            try:
+                with open(os.path.join(self._cache_dir, entry['file']), 'r', encoding='utf-8') as f:
+                    body = f.read()
+            except OSError:
+                del self._index[url]
+                return None
+            entry['accessed'] = time.time()
+            return dict(entry, body=body)
+
+    # put: store a freshly downloaded page, evicting least recently used pages if over the size limit
+    #   url: (str) URL of the page
+    #   body: (str) text of the page
+    #   etag: (str) ETag header of the response, or None
+    #   last_modified: (str) Last-Modified header of the response, or None
+    def put(self, url, body, etag, last_modified):
+        with self._lock:
+            self._stats['misses'] += 1
+            name = hashlib.sha1(url.encode()).hexdigest() + '.html'
+            data = body.encode('utf-8')
+            self._writeFile(name, data)
+            now = time.time()
+            self._index[url] = {'file': name, 'etag': etag, 'last_modified': last_modified,
+                'fetched': now, 'accessed': now, 'size': len(data)}
+            self._evict()
+            self._saveIndex()
+
+    # touch: mark a cached page as fresh again after a 304 Not Modified response
+    #   url: (str) URL of the page
+    def touch(self, url):
+        with self._lock:
+            self._stats['revalidated'] += 1
+            entry = self._index.get(url)
+            if (entry != None):
+                entry['fetched'] = time.time()
+                entry['accessed'] = entry['fetched']
+                self._saveIndex()
+
+    # hit: count a page served from the cache without a request
+    def hit(self):
+        with self._lock:
+            self._stats['hits'] += 1
+
+    # _evict: drop least recently used pages until the total size is under the limit
+    def _evict(self):
+        total = sum(entry['size'] for entry in self._index.values())
+        for url in sorted(self._index, key=lambda url: self._index[url]['accessed']):
+            if (total <= self._max_bytes):
+                break
+            entry = self._index.pop(url)
+            total -= entry['size']
+            self._stats['evictions'] += 1
+            try:
+                os.remove(os.path.join(self._cache_dir, entry['file']))
+            except OSError:
+                pass
+
+    # _indexPath: location of the index file
+    def _indexPath(self):
+        return os.path.join(self._cache_dir, 'index.json')
+
+    # _saveIndex: write the index file
+    def _saveIndex(self):
+        self._writeFile('index.json', json.dumps(self._index).encode('utf-8'))
+
+    # _writeFile: write a file in the cache directory through a temporary file so it is never left half-written
+    #   name: (str) name of the file
+    #   data: (bytes) contents of the file
+    def _writeFile(self, name, data):
+        path = os.path.join(self._cache_dir, name)
+        with open(path + '.tmp', 'wb') as f:
+            f.write(data)
+        os.replace(path + '.tmp', path)
+
+# year_ttl: how long a cached page for a year stays fresh
+#   year: (int) year the page covers
+#   return: (int) seconds the page is fresh for
+def year_ttl(year):
+    if (year < datetime.today().year):
+        return PAST_YEAR_TTL
+    return CURRENT_YEAR_TTL
+
+# make_session: create a requests session with a connection pool shared by all fetches
+#   pool_size: (int, def 5) maximum number of connections kept open per host
+#   return: (requests.Session) pooled session
+def make_session(pool_size=5):
+    import requests
+    from requests.adapters import HTTPAdapter
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+# retryable: check whether a failed request is worth trying again
+#   error: (requests.RequestException) error the request failed with
+#   return: (bool) True for connection errors, timeouts and 5xx answers; False for 4xx answers and anything else
+def retryable(error):
+    import requests
+    if (isinstance(error, (requests.ConnectionError, requests.Timeout))):
+        return True
+    return isinstance(error, requests.HTTPError) and error.response != None and error.response.status_code >= 500
+
+# fetch_page: get the text of a page, retrying connection errors, timeouts and 5xx answers with exponential backoff
+#   NOTE: 4xx answers won't change on a retry, so they are raised straight away
+#   session: (requests.Session) session to make the request with
+#   url: (str) URL of the page
+#   timeout: (float, def 10) seconds to wait on the connection and on each read
+#   retries: (int, def 2) number of retries after the first attempt
+#   backoff: (float, def 0.5) seconds to wait before the first retry; doubles on each retry
+#   cache: (PageCache, def None) cache to serve from and revalidate against; None to always download
+#   ttl: (float, def 0) seconds a cached page is served without revalidating
+#   return: (str) text of the page; the stale cached page if revalidating it fails on a connection error, timeout or
+#       5xx answer
+def fetch_page(session, url, timeout=10, retries=2, backoff=0.5, cache=None, ttl=0):
+    import requests
+
+    # Serve fresh pages straight from the cache, and revalidate stale ones
+    headers = {}
+    entry = None
+    if (cache != None):
+        entry = cache.get(url)
+        if (entry != None):
+            if (time.time() - entry['fetched'] < ttl):
+                cache.hit()
+                instrument.count('fetch.cache_hits')
+                return entry['body']
+            if (entry['etag'] != None):
+                headers['If-None-Match'] = entry['etag']
+            if (entry['last_modified'] != None):
+                headers['If-Modified-Since'] = entry['last_modified']
+
+    attempt = 0
+    while (True):
+        try:
+            with instrument.span('fetch'):
+                response = session.get(url, timeout=timeout, headers=headers)
+
+            # Cached copy is still good
+            if (response.status_code == 304 and entry != None):
+                cache.touch(url)
+                instrument.count('fetch.not_modified')
+                return entry['body']
+
+            response.raise_for_status()
+            instrument.count('fetch.bytes', len(response.content))
+            if (cache != None):
+                cache.put(url, response.text, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+            return response.text
+
+        # Give up on errors a retry won't fix, or once out of retries; otherwise wait and try again
+        except requests.RequestException as e:
+            if (not retryable(e) or attempt >= retries):
+
+                # A stale page is better than none while the site is down or unreachable
+                if (entry != None and retryable(e)):
+                    print(f'Warning: could not revalidate {url}, using the cached page: {e}', file=sys.stderr)
+                    instrument.count('fetch.stale_served')
+                    return entry['body']
+                raise
+            instrument.count('fetch.retries')
+            time.sleep(backoff * (2 ** attempt))
+            attempt += 1
+
+# Patterns for the regex parser backend
+TABLE_PATTERN = re.compile(r'<table\b[^>]*\bid=["\']?holidays-table\b', re.IGNORECASE)
+TBODY_PATTERN = re.compile(r'<tbody\b[^>]*>(.*?)</tbody>', re.IGNORECASE | re.DOTALL)
+ROW_PATTERN = re.compile(r'<tr\b[^>]*>(.*?)</tr>', re.IGNORECASE | re.DOTALL)
+DATE_PATTERN = re.compile(r'<th\b[^>]*\bclass=["\']?nw\b[^>]*>(.*?)</th>', re.IGNORECASE | re.DOTALL)
+NAME_PATTERN = re.compile(r'<a\b[^>]*>(.*?)</a>', re.IGNORECASE | re.DOTALL)
+TAG_PATTERN = re.compile(r'<[^>]*>')
+
+# page_fingerprint: hash the body of a page's holidays table, so changes elsewhere on the page don't count
+#   NOTE: only finds where the table starts and ends, so it costs about one hash rather than a parse
+#   html: (str) text of the page
+#   return: (str) hex digest of the table body; of the whole page if there is no holidays table
+def page_fingerprint(html):
+    table = TABLE_PATTERN.search(html)
+    tbody = TBODY_PATTERN.search(html, table.end()) if table != None else None
+    body = tbody.group(1) if tbody != None else html
+    return hashlib.sha1(body.encode('utf-8')).hexdigest()
+
+# _cell_text: turn the inside of a cell into plain text
+#   cell: (str) HTML inside the cell
+#   return: (str) text with tags removed, entities decoded and whitespace trimmed
+def _cell_text(cell):
+    return html_lib.unescape(TAG_PATTERN.sub('', cell)).strip()
+
+# parse_rows_regex: scan the holidays table with compiled patterns, without building a document tree
+#   html: (str) text of the page
+#   return: (generator) (name, date) for each row, date without the year; None for rows that could not be read
+def parse_rows_regex(html):
+
+    # Only look inside the body of the holidays table
+    table = TABLE_PATTERN.search(html)
+    if (table == None):
+        raise ValueError('No holidays table in page!')
+    tbody = TBODY_PATTERN.search(html, table.end())
+    if (tbody == None):
+        raise ValueError('No holidays table in page!')
+
+    for row in ROW_PATTERN.finditer(tbody.group(1)):
+        date = DATE_PATTERN.search(row.group(1))
+        name = NAME_PATTERN.search(row.group(1))
+        if (date == None or name == None):
+            yield None
+        else:
+            yield (_cell_text(name.group(1)), _cell_text(date.group(1)))
+
+# parse_rows_lxml: stream through the holidays table with lxml's incremental parser
+#   html: (str) text of the page
+#   return: (generator) (name, date) for each row, date without the year; None for rows that could not be read
+def parse_rows_lxml(html):
+
+    in_table = False
+    in_tbody = False
+    found = False
+    for event, element in lxml_etree().iterparse(io.BytesIO(html.encode('utf-8')), events=('start', 'end'), html=True):
+
+        # Track whether the parser is inside the body of the holidays table
+        if (event == 'start'):
+            if (element.tag == 'table' and element.get('id') == 'holidays-table'):
+                in_table = True
+                found = True
+            elif (element.tag == 'tbody' and in_table):
+                in_tbody = True
+            continue
+
+        # Stop once the body of the holidays table is done
+        if (element.tag == 'tbody' and in_tbody):
+            break
+
+        # Read each finished row, then free it
+        if (element.tag == 'tr' and in_tbody):
+            date = element.find('th')
+            name = element.find('.//a')
+            if (date == None or name == None):
+                yield None
+            else:
+                yield (''.join(name.itertext()).strip(), ''.join(date.itertext()).strip())
+            element.clear()
+
+    if (not found):
+        raise ValueError('No holidays table in page!')
+
+# parse_rows_bs4: read the holidays table from a full BeautifulSoup tree
+#   html: (str) text of the page
+#   return: (generator) (name, date) for each row, date without the year; None for rows that could not be read
+def parse_rows_bs4(html):
+
+    # Pass into beautiful Soup
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
+    table = soup.find('table', attrs={'id':'holidays-table'})
+    if (table == None or table.find('tbody') == None):
+        raise ValueError('No holidays table in page!')
+
+    # Iterate through each holiday in the table
+    for datum in table.find('tbody').find_all('tr'):
+        date = datum.find('th', attrs={'class': 'nw'})
+        name = datum.find('a')
+        if (date == None or name == None):
+            yield None
+        else:
+            yield (name.get_text().strip(), date.get_text().strip())
+
+# Parser backends by name
+PARSERS = {'regex': parse_rows_regex, 'lxml': parse_rows_lxml, 'bs4': parse_rows_bs4}
+
+# parse_holidays_table: pull holidays out of a Time and Date holidays page
+#   html: (str) text of the page
+#   year: (int) year the page covers
+#   backend: (str, def 'regex') parser backend from PARSERS; if it cannot find the table, bs4 is tried instead
+#   return: (tuple(list(tuple(str, str)), int)) (name, date) rows with dates formatted as '%b %d, %Y',
+#       and the number of rows that could not be read
+@instrument.timed('parse')
+def parse_holidays_table(html, year, backend='regex'):
+
+    # Fall back to BeautifulSoup when lxml is not installed
+    if (backend == 'lxml' and lxml_etree() == None):
+        backend = 'bs4'
+
+    rows = []
+    failed = 0
+    try:
+        parsed = list(PARSERS[backend](html))
+    except ValueError:
+        if (backend == 'bs4'):
+            raise
+        parsed = list(parse_rows_bs4(html))
+
+    # Add the year to each date
+    for row in parsed:
+        if (row == None):
+            failed += 1
+        else:
+            rows.append((row[0], f'{row[1]}, {year}'))
+
+    instrument.count('parse.rows', len(rows))
+    instrument.count('parse.failed', failed)
+    return rows, failed
+
+# parse_page_rows: pull holidays out of a page as compact (name, ordinal) rows, ready to merge
+#   NOTE: takes and gives back only plain values, so it can run in a worker process of make_parse_pool; timers and
+#       counters recorded in a worker process stay there
+#   html: (str) text of the page
+#   year: (int) year the page covers
+#   backend: (str, def 'regex') parser backend from PARSERS
+#   return: (tuple(list(tuple(str, int)), int)) rows in page order with whitespace in names tidied and repeats
+#       dropped, and the number of rows that could not be read, bad dates included
+def parse_page_rows(html, year, backend='regex'):
+    rows, failed = parse_holidays_table(html, year, backend=backend)
+    ordinals = dates.parse_ordinals([date for name, date in rows], '%b %d, %Y', strict=False)
+    parsed = {}
+    for (name, date), ordinal in zip(rows, ordinals):
+        name = ' '.join(name.split())
+        if (ordinal == None or name == ''):
+            failed += 1
+        else:
+            parsed[(name, ordinal)] = None
+    return list(parsed), failed
+
+# make_parse_pool: start a pool of worker processes for parse_page_rows, so parsing can use more than one core
+#   NOTE: workers are spawned rather than forked, since forking while fetch threads hold locks is unsafe
+#   processes: (int) number of worker processes; 0 for no pool
+#   return: (concurrent.futures.ProcessPoolExecutor) pool to submit pages to; None if processes is 0
+def make_parse_pool(processes):
+    if (processes <= 0):
+        return None
+    return ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context('spawn'))
+
+# scrape_years: fetch and parse the pages for several years at once
+#   base_url: (str) URL that the year is appended to
+#   years: (iterable(int)) years to scrape
+#   workers: (int, def 5) number of pages fetched and parsed at the same time
+#   timeout: (float, def 10) seconds to wait on the connection and on each read
+#   retries: (int, def 2) number of retries for each page
+#   backoff: (float, def 0.5) seconds to wait before the first retry; doubles on each retry
+#   cache: (PageCache, def None) cache for the pages; past years are kept longer than current and future years
+#   parser: (str, def 'regex') parser backend from PARSERS
+#   processes: (int, def 0) worker processes to parse in; 0 to parse in the fetching threads
+#   return: (generator) (year, rows, failed, error) as each year finishes, with rows as from parse_page_rows;
+#       error is None on success, otherwise rows is empty and error is the exception raised
+def scrape_years(base_url, years, workers=5, timeout=10, retries=2, backoff=0.5, cache=None, parser='regex', processes=0):
+
+    # Fetch and parse in the same task so parsing one year overlaps with waiting on the others; with a process pool
+    #   the task waits on a worker process for the parse, leaving the GIL to the other fetches
+    def scrape_year(session, year):
+        html = fetch_page(session, base_url + str(year), timeout=timeout, retries=retries, backoff=backoff,
+            cache=cache, ttl=year_ttl(year))
+        if (parse_pool == None):
+            return parse_page_rows(html, year, parser)
+        return parse_pool.submit(parse_page_rows, html, year, parser).result()
+
+    years = list(years)
+    parse_pool = make_parse_pool(processes)
+    try:
+        with make_session(pool_size=max(workers, 1)) as session:
+            with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+                futures = {pool.submit(scrape_year, session, year): year for year in years}
+                for future in as_completed(futures):
+                    try:
+                        rows, failed = future.result()
+                        yield futures[future], rows, failed, None
+                    except Exception as e:
+                        yield futures[future], [], 0, e
+    finally:
+        if (parse_pool != None):
+            parse_pool.shutdown(cancel_futures=True)
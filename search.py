@@ -0,0 +1,227 @@
+from array import array
+from collections import namedtuple
+import bisect
+import re
+import unicodedata
+
+# Runs of anything but letters and digits split a name into tokens
+NON_WORD = re.compile(r'[^0-9a-z]+')
+
+# Most names scored for one query; broader queries score those holding the best tokens
+RANK_CAP = 1000
+
+# Least trigram similarity for a misspelt token to count as a match
+MIN_SIMILARITY = 0.25
+
+# SearchHit: one ranked name; kind is 'prefix' when every query token starts a token of the name, 'fuzzy' otherwise
+SearchHit = namedtuple('SearchHit', ['name', 'score', 'kind'])
+
+# normalize: split a name into lowercase tokens with accents and punctuation dropped
+#   name: (str) holiday name or query
+#   return: (list(str)) tokens in order
+def normalize(name):
+    name = unicodedata.normalize('NFKD', name)
+    name = ''.join(char for char in name if not unicodedata.combining(char)).lower()
+    return [token for token in NON_WORD.split(name) if token]
+
+# trigrams: get the three-letter pieces of a token, padded so its start and end count too
+#   token: (str) normalized token
+#   return: (set(str)) trigrams of the token
+def trigrams(token):
+    padded = f'  {token} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+# NameIndex: finds holiday names by token prefix and by fuzzy trigram match, kept up to date one holiday at a time
+class NameIndex:
+
+    # Docstring
+    """
+    NameIndex
+    --------
+    + size: int
+    --------
+    __init__(): None
+    add(name, ordinal): None
+    remove(name, ordinal): None
+    ordinals(name): list(int)
+    search(query, limit=10): list(SearchHit)
+    Getters: size
+    """
+
+    # Initializer: starts empty
+    def __init__(self):
+        self._name_ids = {} # name -> ID; IDs are kept after a name's last holiday goes, so postings never shrink
+        self._names = [] # name of each ID
+        self._ordinals = [] # dates of the holidays with each name; empty once they are all removed
+        self._name_tokens = [] # token IDs of each name, so names are not split again for every search
+        self._live = 0 # number of names with at least one holiday
+        self._token_ids = {} # token -> ID
+        self._tokens = [] # token of each ID
+        self._postings = [] # IDs of the names holding each token
+        self._trigrams = {} # trigram -> IDs of the tokens holding it
+        self._sorted_tokens = [] # tokens in order, for prefix ranges
+        self._sorted_dirty = False # True when new tokens are waiting to be sorted in
+
+    # Size getter: number of names with at least one holiday
+    @property
+    def size(self):
+        return self._live
+
+    # add: count a holiday under its name, indexing the name the first time it is seen
+    #   name: (str) name of the holiday
+    #   ordinal: (int) ordinal of the holiday's date
+    def add(self, name, ordinal):
+        name_id = self._name_ids.get(name)
+        if (name_id == None):
+            name_id = len(self._names)
+            self._name_ids[name] = name_id
+            self._names.append(name)
+            self._ordinals.append([])
+            token_ids = tuple({self._tokenId(token): None for token in normalize(name)})
+            self._name_tokens.append(token_ids)
+            for token_id in token_ids:
+                self._postings[token_id].append(name_id)
+        if (not self._ordinals[name_id]):
+            self._live += 1
+        self._ordinals[name_id].append(ordinal)
+
+    # remove: stop counting a holiday under its name; a name with no holidays left stops matching
+    #   name: (str) name of the holiday
+    #   ordinal: (int) ordinal of the holiday's date
+    def remove(self, name, ordinal):
+        name_id = self._name_ids.get(name)
+        if (name_id == None or ordinal not in self._ordinals[name_id]):
+            return
+        self._ordinals[name_id].remove(ordinal)
+        if (not self._ordinals[name_id]):
+            self._live -= 1
+
+    # ordinals: get the dates of the holidays with a name
+    #   name: (str) holiday name
+    #   return: (list(int)) ordinals of the dates, sorted
+    def ordinals(self, name):
+        name_id = self._name_ids.get(name)
+        if (name_id == None):
+            return []
+        return sorted(self._ordinals[name_id])
+
+    # search: find names for a query, best first
+    #   NOTE: every query token matches as a prefix, so partly typed queries work; if that gives fewer than limit
+    #       names, names with similarly spelt tokens are added after them
+    #   query: (str) words to look for
+    #   limit: (int, def 10) most names to return
+    #   return: (list(SearchHit)) ranked names
+    def search(self, query, limit=10):
+        query_tokens = normalize(query)
+        if (not query_tokens or limit <= 0):
+            return []
+        hits = self._prefixHits(query_tokens, limit)
+        if (len(hits) < limit):
+            found = {hit.name for hit in hits}
+            hits.extend(hit for hit in self._fuzzyHits(query_tokens, limit + len(hits)) if hit.name not in found)
+        return hits[:limit]
+
+    # _tokenId: get the ID of a token, adding it and its trigrams the first time it is seen
+    #   token: (str) normalized token
+    #   return: (int) ID of the token
+    def _tokenId(self, token):
+        token_id = self._token_ids.get(token)
+        if (token_id == None):
+            token_id = len(self._tokens)
+            self._token_ids[token] = token_id
+            self._tokens.append(token)
+            self._postings.append(array('i'))
+            for trigram in trigrams(token):
+                self._trigrams.setdefault(trigram, array('i')).append(token_id)
+            self._sorted_tokens.append(token)
+            self._sorted_dirty = True
+        return token_id
+
+    # _prefixTokens: get the IDs of the tokens that start with a prefix
+    #   prefix: (str) normalized prefix
+    #   return: (list(int)) token IDs, in token order
+    def _prefixTokens(self, prefix):
+
+        # New tokens are sorted in on the first search after they arrive
+        if (self._sorted_dirty):
+            self._sorted_tokens.sort()
+            self._sorted_dirty = False
+        lo = bisect.bisect_left(self._sorted_tokens, prefix)
+        hi = bisect.bisect_left(self._sorted_tokens, prefix + '\uffff')
+        return [self._token_ids[token] for token in self._sorted_tokens[lo:hi]]
+
+    # _prefixHits: rank names where every query token starts one of the name's tokens
+    #   query_tokens: (list(str)) normalized query
+    #   limit: (int) most names to return
+    #   return: (list(SearchHit)) ranked names
+    def _prefixHits(self, query_tokens, limit):
+
+        # Whole-token matches score 1; a partly typed token scores by how much of the token it covers
+        groups = []
+        for query_token in query_tokens:
+            token_ids = self._prefixTokens(query_token)
+            if (not token_ids):
+                return []
+            groups.append({token_id: len(query_token) / len(self._tokens[token_id]) for token_id in token_ids})
+        return self._ranked(groups, limit, 'prefix')
+
+    # _fuzzyHits: rank names by how closely their tokens are spelt to the query tokens
+    #   query_tokens: (list(str)) normalized query
+    #   limit: (int) most names to return
+    #   return: (list(SearchHit)) ranked names
+    def _fuzzyHits(self, query_tokens, limit):
+
+        # Tokens spelt like each query token score by the share of trigrams they have in common
+        groups = []
+        for query_token in query_tokens:
+            query_trigrams = trigrams(query_token)
+            shared = {}
+            for trigram in query_trigrams:
+                for token_id in self._trigrams.get(trigram, ()):
+                    shared[token_id] = shared.get(token_id, 0) + 1
+            scores = {}
+            for token_id, count in shared.items():
+                similarity = count / (len(query_trigrams) + len(self._tokens[token_id]) + 1 - count)
+                if (similarity >= MIN_SIMILARITY):
+                    scores[token_id] = similarity
+            groups.append(scores)
+        return self._ranked(groups, limit, 'fuzzy')
+
+    # _ranked: score names against groups of scored tokens, one group per query token
+    #   NOTE: names are read from the group holding the fewest names, best tokens first, and at most RANK_CAP
+    #       names are scored, so broad queries stay fast
+    #   groups: (list(dict)) token ID -> score, for each query token
+    #   limit: (int) most names to return
+    #   kind: (str) 'prefix' to need a match for every query token; 'fuzzy' to score missing ones as 0
+    #   return: (list(SearchHit)) ranked names
+    def _ranked(self, groups, limit, kind):
+        if (not any(groups)):
+            return []
+        anchor = min((group for group in groups if group),
+            key=lambda group: sum(len(self._postings[token_id]) for token_id in group))
+
+        hits = []
+        seen = set()
+        for token_id in sorted(anchor, key=lambda token_id: -anchor[token_id]):
+            for name_id in self._postings[token_id]:
+                if (name_id in seen or not self._ordinals[name_id]):
+                    continue
+                seen.add(name_id)
+
+                # Each query token counts its best match among the name's tokens
+                name_tokens = self._name_tokens[name_id]
+                score = 0.0
+                for group in groups:
+                    best = max([group.get(name_token, 0.0) for name_token in name_tokens])
+                    if (best == 0.0 and kind == 'prefix'):
+                        break
+                    score += best
+                else:
+                    hits.append(SearchHit(self._names[name_id], score / len(groups), kind))
+                if (len(seen) >= RANK_CAP):
+                    break
+            if (len(seen) >= RANK_CAP):
+                break
+
+        hits.sort(key=lambda hit: (-hit.score, len(hit.name), hit.name))
+        return hits[:limit]
@@ -0,0 +1,330 @@
+from datetime import datetime
+import datetime as dt
+import argparse
+import hashlib
+import json
+import os
+import socketserver
+import threading
+from urllib.parse import parse_qs
+from wsgiref.simple_server import WSGIServer, WSGIRequestHandler, make_server
+
+from main import HolidayList, parse_date
+import scraper
+import store
+
+# Weeks either side of the current week whose responses are kept rendered
+HOT_WEEKS = 4
+
+# Most read responses kept rendered; the cache is emptied when it grows past this
+MAX_CACHED = 4096
+
+# Largest request body accepted, in bytes
+MAX_BODY = 1 << 20
+
+# Longest date range answered, in days; recurring rules give holidays in every year, so a range has to end somewhere
+MAX_RANGE_DAYS = 200 * 366
+
+# Reason phrases of the statuses the service answers with
+STATUSES = {200: '200 OK', 304: '304 Not Modified', 400: '400 Bad Request', 404: '404 Not Found',
+    405: '405 Method Not Allowed', 413: '413 Payload Too Large'}
+
+# HTTPError: raised by request handlers to answer with an error status
+class HTTPError(Exception):
+
+    # Initializer: takes in the status and a message for the client
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+# HolidayApp: WSGI app that serves lookups and edits of a HolidayList as JSON
+class HolidayApp:
+
+    # Docstring
+    """
+    HolidayApp
+    --------
+    + holidays: HolidayList
+    + stats: dict
+    --------
+    __init__(holidays, hot_weeks=HOT_WEEKS): None
+    __call__(environ, start_response): list(bytes)
+    warm(): None
+    Getters: holidays, stats
+    --------
+    GET    /holidays?name=&date=      one holiday, or 404
+    GET    /weeks/<year>/<week>       holidays of an ISO week
+    GET    /range?from=&to=           holidays from a date up to, but not including, another
+    POST   /holidays                  add a {"name", "date"} record, or a list of them
+    DELETE /holidays?name=&date=      remove one holiday, or a list of records sent as the body
+    """
+
+    # Initializer: takes in the list to serve and how many weeks either side of this one to keep rendered
+    #   NOTE: the list is switched to concurrent mode, so every response is built from one snapshot without a lock
+    def __init__(self, holidays, hot_weeks=HOT_WEEKS):
+        self._holidays = holidays
+        self._holidays.concurrent = True
+        self._hot_weeks = hot_weeks
+        self._cache = {} # path and query -> ((list version, rules version), body, ETag)
+        self._lock = threading.Lock()
+        self._stats = {'requests': 0, 'cache_hits': 0, 'not_modified': 0}
+        self._warming = False # True while a background warm is waiting to start
+        self.warm()
+
+    # Getters
+
+    # Holidays getter
+    @property
+    def holidays(self):
+        return self._holidays
+
+    # Stats getter: request counts since the app started
+    @property
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+    # warm: render the weeks around the current week, so the most asked-for responses are ready before they are asked for
+    def warm(self):
+        today = datetime.today()
+        for offset in range(-self._hot_weeks, self._hot_weeks + 1):
+            year, week = (today + dt.timedelta(weeks=offset)).isocalendar()[:2]
+            self._read(f'/weeks/{year}/{week}', '', {})
+
+    # _warmSoon: warm in a background thread, so edits are answered without waiting; edits that come in
+    #   before the thread starts share its warm
+    def _warmSoon(self):
+        with self._lock:
+            if (self._warming):
+                return
+            self._warming = True
+        threading.Thread(target=self._warmPending, daemon=True).start()
+
+    # _warmPending: warm for every edit made up to now
+    def _warmPending(self):
+        with self._lock:
+            self._warming = False
+        self.warm()
+
+    # __call__: answer one request
+    def __call__(self, environ, start_response):
+        with self._lock:
+            self._stats['requests'] += 1
+        method = environ['REQUEST_METHOD']
+        path = environ.get('PATH_INFO', '')
+        query_string = environ.get('QUERY_STRING', '')
+        try:
+            query = {key: values[-1] for key, values in parse_qs(query_string).items()}
+
+            # Reads answer from the cache, and with 304 when the client already has the response
+            if (method in ('GET', 'HEAD')):
+                body, etag = self._read(path, query_string, query)
+                if (etag in [tag.strip() for tag in environ.get('HTTP_IF_NONE_MATCH', '').split(',')]):
+                    with self._lock:
+                        self._stats['not_modified'] += 1
+                    start_response(STATUSES[304], [('ETag', etag)])
+                    return [b'']
+                start_response(STATUSES[200], [('Content-Type', 'application/json'), ('Content-Length', str(len(body))),
+                    ('ETag', etag), ('Cache-Control', 'no-cache')])
+                return [b''] if method == 'HEAD' else [body]
+
+            # Edits go straight to the list; the new version makes every cached response out of date
+            if (path != '/holidays'):
+                raise HTTPError(404, f'No such resource: {path}')
+            if (method == 'POST'):
+                rows = self._rows(self._body(environ))
+                result = {'added': len(self._holidays.addHolidays(rows).added), 'received': len(rows)}
+            elif (method == 'DELETE'):
+                if ('name' in query or 'date' in query):
+                    rows = self._rows({'name': query.get('name'), 'date': query.get('date')})
+                else:
+                    rows = self._rows(self._body(environ))
+                result = {'removed': len(self._holidays.removeHolidays(rows).removed), 'received': len(rows)}
+                if (len(rows) == 1 and result['removed'] == 0):
+                    raise HTTPError(404, 'Holiday could not be found!')
+            else:
+                raise HTTPError(405, f'{method} is not allowed')
+            self._warmSoon()
+            return self._answer(start_response, 200, result)
+
+        # Errors go back to the client as JSON
+        except HTTPError as e:
+            return self._answer(start_response, e.status, {'error': str(e)})
+        except ValueError as e:
+            return self._answer(start_response, 400, {'error': str(e)})
+
+    # _read: get the body of a read endpoint, from the cache when neither the list nor the rules have changed since it
+    #   was rendered
+    #   NOTE: rule holidays come from the rules as they are when rendering, not from the snapshot, so the rules' version
+    #       is read before the snapshot is taken; a body rendered while the rules change is then kept under the old
+    #       version and is never served again
+    #   path: (str) path of the request
+    #   query_string: (str) query of the request, as sent
+    #   query: (dict) query of the request, decoded
+    #   return: (tuple(bytes, str)) body and its ETag
+    def _read(self, path, query_string, query):
+        key = f'{path}?{query_string}'
+        rules_version = self._holidays.rules_version
+        view = self._holidays.snapshot()
+        version = (view.version, rules_version)
+        cached = self._cache.get(key)
+        if (cached != None and cached[0] == version):
+            with self._lock:
+                self._stats['cache_hits'] += 1
+            return cached[1], cached[2]
+
+        # Render from the snapshot, which edits made meanwhile cannot change
+        body = json.dumps(self._render(view, path, query)).encode('utf-8')
+        etag = '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+        with self._lock:
+            if (len(self._cache) >= MAX_CACHED):
+                self._cache.clear()
+            self._cache[key] = (version, body, etag)
+        return body, etag
+
+    # _render: build the response of a read endpoint
+    #   view: (store.WeekView) snapshot of the list to answer from
+    #   path: (str) path of the request
+    #   query: (dict) query of the request, decoded
+    #   return: (dict) response to send as JSON
+    def _render(self, view, path, query):
+        parts = path.strip('/').split('/')
+
+        # One holiday by name and date
+        if (parts == ['holidays']):
+            if ('name' not in query or 'date' not in query):
+                raise HTTPError(400, 'find needs a name and a date')
+            holiday = view.find(query['name'], parse_date(query['date']))
+            if (holiday == None):
+                raise HTTPError(404, 'Holiday could not be found!')
+            return self._record(holiday)
+
+        # Holidays of an ISO week
+        if (len(parts) == 3 and parts[0] == 'weeks'):
+            year, week = int(parts[1]), int(parts[2])
+            if (week < 1 or week > 53):
+                raise HTTPError(400, 'week must be between 1 and 53')
+            holidays = view.week(year, week)
+            try:
+                monday = dt.date.fromisocalendar(year, week, 1).toordinal()
+                holidays = self._holidays.withRules(holidays, monday, monday + 7)
+            except ValueError:
+                pass
+            return {'year': year, 'week': week, 'holidays': [self._record(holiday) for holiday in holidays]}
+
+        # Holidays in a date range
+        if (parts == ['range']):
+            if ('from' not in query or 'to' not in query):
+                raise HTTPError(400, 'range needs from and to dates')
+            start, end = parse_date(query['from']), parse_date(query['to'])
+            if (start > end):
+                raise HTTPError(400, 'range must not end before it starts')
+            if ((end - start).days > MAX_RANGE_DAYS):
+                raise HTTPError(400, f'range can be at most {MAX_RANGE_DAYS} days long')
+            holidays = self._holidays.withRules(view.between(start, end), start.toordinal(), end.toordinal())
+            return {'from': query['from'], 'to': query['to'], 'holidays': [self._record(holiday) for holiday in holidays]}
+
+        raise HTTPError(404, f'No such resource: {path}')
+
+    # _record: turn a holiday into its JSON record
+    #   holiday: (Holiday) holiday to turn
+    #   return: (dict) {"name", "date"} record
+    def _record(self, holiday):
+        return {'name': holiday.name, 'date': holiday.date.strftime('%Y-%m-%d')}
+
+    # _body: read and decode the JSON body of a request
+    #   environ: (dict) WSGI environment of the request
+    #   return: (object) decoded body
+    def _body(self, environ):
+        try:
+            length = int(environ.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            raise HTTPError(400, 'Bad Content-Length')
+        if (length > MAX_BODY):
+            raise HTTPError(413, f'Body is larger than {MAX_BODY} bytes')
+        try:
+            return json.loads(environ['wsgi.input'].read(length) or b'null')
+        except json.JSONDecodeError as e:
+            raise HTTPError(400, f'Body is not JSON: {e.msg}')
+
+    # _rows: turn a record or list of records into (name, ordinal) rows, checking every one before anything is changed
+    #   records: (dict or list(dict)) {"name", "date"} records
+    #   return: (list(tuple(str, int))) rows in the order sent
+    def _rows(self, records):
+        if (type(records) == dict):
+            records = [records]
+        if (type(records) != list):
+            raise HTTPError(400, 'Send a {"name", "date"} record or a list of them')
+        rows = []
+        for record in records:
+            if (type(record) != dict or type(record.get('name')) != str or type(record.get('date')) != str):
+                raise HTTPError(400, 'Every record needs a "name" and a "date" string')
+            rows.append((record['name'], parse_date(record['date']).toordinal()))
+        return rows
+
+    # _answer: send a JSON response
+    #   start_response: (function) WSGI start_response
+    #   status: (int) HTTP status
+    #   result: (dict) response to send as JSON
+    #   return: (list(bytes)) body
+    def _answer(self, start_response, status, result):
+        body = json.dumps(result).encode('utf-8')
+        start_response(STATUSES[status], [('Content-Type', 'application/json'), ('Content-Length', str(len(body)))])
+        return [body]
+
+# ThreadingWSGIServer: WSGI server that answers each connection in its own thread
+class ThreadingWSGIServer(socketserver.ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+# QuietHandler: request handler that does not log each request
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+# make_holiday_server: create a threaded HTTP server for a list
+#   holidays: (HolidayList) list to serve
+#   host: (str) address to listen on; default '127.0.0.1'
+#   port: (int) port to listen on; 0 picks a free port; default 8000
+#   quiet: (bool) True to not log each request; default True
+#   return: (ThreadingWSGIServer) server, ready for serve_forever
+def make_holiday_server(holidays, host='127.0.0.1', port=8000, quiet=True):
+    return make_server(host, port, HolidayApp(holidays), server_class=ThreadingWSGIServer,
+        handler_class=QuietHandler if quiet else WSGIRequestHandler)
+
+# main: load holidays and serve them until interrupted
+def main():
+    parser = argparse.ArgumentParser(description='Serve holidays over HTTP as JSON.')
+    parser.add_argument('--host', default='127.0.0.1', help='address to listen on')
+    parser.add_argument('--port', type=int, default=8000, help='port to listen on')
+    parser.add_argument('--data', default='data/holidays.json', help='JSON file to load holidays from; edits are not saved to it')
+    parser.add_argument('--store', default=None, help='snapshot to keep holidays in instead of --data; edits are saved to its append log')
+    parser.add_argument('--rules', default='data/rules.json', help='JSON file of recurring holidays to serve alongside the list')
+    parser.add_argument('--engine', default='objects', choices=sorted(store.ENGINES), help='storage engine of the list')
+    parser.add_argument('--scrape', action='store_true', help='merge in holidays from Time and Date in the background')
+    parser.add_argument('--verbose', action='store_true', help='log each request')
+    args = parser.parse_args()
+
+    # Load the list, and start serving before any scrape is done
+    holidays = HolidayList(engine=args.engine, concurrent=True)
+    if (args.store != None):
+        holidays.openLog(args.store)
+    elif (os.path.exists(args.data)):
+        holidays.readJSON(args.data)
+    if (os.path.exists(args.rules)):
+        holidays.readRules(args.rules)
+    if (args.scrape):
+        holidays.scrapeInBackground(cache=scraper.PageCache('data/cache'))
+
+    server = make_holiday_server(holidays, args.host, args.port, quiet=not args.verbose)
+    print(f'Serving {holidays.numHolidays()} holidays on http://{args.host}:{server.server_port}/', flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        holidays.closeLog()
+
+if __name__ == "__main__":
+    main()
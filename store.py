@@ -0,0 +1,829 @@
+from array import array
+from datetime import datetime, date as date_cls
+import bisect
+import sys
+import threading
+
+import dates
+
+# A bulk removal of at least 1/COMPACT_SHARE of a store rebuilds it in one pass instead of moving rows one at a time
+COMPACT_SHARE = 8
+
+# NameTable: interned holiday names shared by columnar stores, so each name is kept once
+class NameTable:
+
+    # Docstring
+    """
+    NameTable
+    --------
+    + names: list(str)
+    --------
+    __init__(): None
+    intern(name): int
+    lookup(name): int
+    __getitem__(name_id): str
+    """
+
+    # Initializer: starts with no names
+    def __init__(self):
+        self._names = []
+        self._ids = {}
+        self._lock = threading.Lock()
+
+    # Names getter
+    @property
+    def names(self):
+        return self._names
+
+    # intern: get the ID of a name, adding it to the table if needed
+    #   name: (str) holiday name
+    #   return: (int) ID of the name
+    def intern(self, name):
+        name_id = self._ids.get(name)
+        if (name_id == None):
+            with self._lock:
+                name_id = self._ids.get(name)
+                if (name_id == None):
+                    name_id = len(self._names)
+                    self._names.append(sys.intern(name))
+                    self._ids[self._names[name_id]] = name_id
+        return name_id
+
+    # lookup: get the ID of a name without adding it
+    #   name: (str) holiday name
+    #   return: (int) ID of the name; None if the name is not in the table
+    def lookup(self, name):
+        return self._ids.get(name)
+
+    # Name by ID
+    def __getitem__(self, name_id):
+        return self._names[name_id]
+
+# Name table shared by every columnar store unless one is given
+SHARED_NAMES = NameTable()
+
+# HolidayView: lightweight holiday made from a row of a columnar store
+class HolidayView:
+
+    # Docstring
+    """
+    HolidayView
+    --------
+    + name: str
+    + date: datetime
+    --------
+    __init__(name, ordinal): None
+    __str__(): str
+    Getters: name, date, ordinal
+    """
+
+    __slots__ = ('_name', '_ordinal')
+
+    # Initializer: takes in holiday name and proleptic Gregorian ordinal of its date
+    def __init__(self, name, ordinal):
+        self._name = name
+        self._ordinal = ordinal
+
+    # String format: return name of holiday
+    def __str__(self):
+        return self._name
+
+    # Name getter
+    @property
+    def name(self):
+        return self._name
+
+    # Date getter
+    @property
+    def date(self):
+        return datetime.fromordinal(self._ordinal)
+
+    # Ordinal getter
+    @property
+    def ordinal(self):
+        return self._ordinal
+
+# ObjectStore: keeps each holiday object, indexed by (name, date), ISO week and date order
+class ObjectStore:
+
+    # Docstring
+    """
+    ObjectStore
+    --------
+    __init__(): None
+    add(holiday_obj): bool
+    addMany(holidays): list(bool)
+    find(name, date): Holiday
+    remove(name, date): bool
+    removeRows(rows): list(tuple(str, int))
+    week(year, week_number): list(Holiday)
+    between(start, end): list(Holiday)
+    records(date_format='%Y-%m-%d'): generator
+    rows(): generator
+    __len__(): int
+    __iter__(): iterator
+    """
+
+    def __init__(self):
+        self._holidays = []
+        self._holiday_index = {} # (name, date) -> position in _holidays
+        self._week_index = {} # (ISO year, ISO week) -> holidays in that week
+        self._date_order = [] # (date, name) keys sorted by date for range queries
+        self._date_order_dirty = False # True when _date_order needs to be re-sorted
+
+    # add: add a holiday unless one with the same name and date is already stored
+    #   holiday_obj: (Holiday) holiday to add
+    #   return: (bool) True if added; False if already stored
+    def add(self, holiday_obj):
+
+        # Skip holidays that are already stored
+        key = (holiday_obj.name, holiday_obj.date)
+        if (key in self._holiday_index):
+            return False
+
+        # Add holiday and index its position
+        self._holiday_index[key] = len(self._holidays)
+        self._holidays.append(holiday_obj)
+        self._indexDate(holiday_obj)
+        return True
+
+    # addMany: add a batch of holidays, skipping any already stored; ISO weeks are worked out for the whole batch at once
+    #   holidays: (list(Holiday)) holidays to add
+    #   return: (list(bool)) True for each holiday added; False for each already stored
+    def addMany(self, holidays):
+        years, weeks = dates.iso_weeks([holiday_obj.date.toordinal() for holiday_obj in holidays])
+        added = []
+        for holiday_obj, year, week_number in zip(holidays, years, weeks):
+            key = (holiday_obj.name, holiday_obj.date)
+            if (key in self._holiday_index):
+                added.append(False)
+                continue
+            self._holiday_index[key] = len(self._holidays)
+            self._holidays.append(holiday_obj)
+            self._indexDate(holiday_obj, (year, week_number))
+            added.append(True)
+        return added
+
+    # find: look up a holiday by name and date
+    #   name: (str) name of the holiday
+    #   date: (datetime) date of the holiday
+    #   return: (Holiday) holiday if found; None otherwise
+    def find(self, name, date):
+        j = self._holiday_index.get((name, date))
+        if (j == None):
+            return None
+        return self._holidays[j]
+
+    # remove: remove a holiday by name and date
+    #   NOTE: the last holiday takes the removed holiday's place, so iteration order is not preserved
+    #   name: (str) name of the holiday
+    #   date: (datetime) date of the holiday
+    #   return: (bool) True if a holiday was removed; False otherwise
+    def remove(self, name, date):
+
+        # Find index of item
+        j = self._holiday_index.pop((name, date), None)
+        if (j == None):
+            return False
+
+        # Delete object by moving the last holiday into its slot
+        self._unindexDate(self._holidays[j])
+        last = self._holidays.pop()
+        if (j < len(self._holidays)):
+            self._holidays[j] = last
+            self._holiday_index[(last.name, last.date)] = j
+        return True
+
+    # removeRows: remove a batch of holidays by name and date ordinal
+    #   NOTE: iteration order is not preserved
+    #   rows: (iterable(tuple(str, int))) (name, ordinal) pairs
+    #   return: (list(tuple(str, int))) rows that were removed, in the order given
+    def removeRows(self, rows):
+        removed = [(name, ordinal) for name, ordinal in dict.fromkeys(rows)
+            if (name, datetime.fromordinal(ordinal)) in self._holiday_index]
+
+        # A few holidays are moved out one at a time
+        if (len(removed) * COMPACT_SHARE < len(self._holidays)):
+            for name, ordinal in removed:
+                self.remove(name, datetime.fromordinal(ordinal))
+            return removed
+
+        # Many holidays: keep the rest and index them again from scratch
+        gone = {(name, datetime.fromordinal(ordinal)) for name, ordinal in removed}
+        kept = [holiday for holiday in self._holidays if (holiday.name, holiday.date) not in gone]
+        self._holidays = []
+        self._holiday_index = {}
+        self._week_index = {}
+        self._date_order = []
+        self._date_order_dirty = False
+        self.addMany(kept)
+        return removed
+
+    # week: get the holidays of an ISO week
+    #   year: (int) ISO year
+    #   week_number: (int) ISO week number
+    #   return: (list(Holiday)) holidays in that week, sorted by date
+    def week(self, year, week_number):
+        return sorted(self._week_index.get((year, week_number), []), key=lambda holiday: holiday.date)
+
+    # between: get the holidays from a start date up to, but not including, an end date
+    #   start: (datetime) first date, inclusive
+    #   end: (datetime) last date, exclusive
+    #   return: (list(Holiday)) holidays in that range, sorted by date
+    def between(self, start, end):
+
+        # Re-sort the date order if holidays were added out of order
+        if (self._date_order_dirty):
+            self._date_order = sorted((date, name) for name, date in self._holiday_index)
+            self._date_order_dirty = False
+
+        # Binary search for both ends of the range
+        lo = bisect.bisect_left(self._date_order, (start,))
+        hi = bisect.bisect_left(self._date_order, (end,))
+
+        # Look up each holiday in the range
+        return [self._holidays[self._holiday_index[(name, date)]] for date, name in self._date_order[lo:hi]]
+
+    # records: name and formatted date of every holiday
+    #   date_format: (str, def '%Y-%m-%d') format of the dates
+    #   return: (generator) (name, date_str) for each holiday
+    def records(self, date_format='%Y-%m-%d'):
+        for holiday in self._holidays:
+            yield (holiday.name, holiday.date.strftime(date_format))
+
+    # rows: name and date ordinal of every holiday
+    #   return: (generator) (name, ordinal) for each holiday
+    def rows(self):
+        for holiday in self._holidays:
+            yield (holiday.name, holiday.date.toordinal())
+
+    # Number of holidays
+    def __len__(self):
+        return len(self._holidays)
+
+    # Iterate through holidays
+    def __iter__(self):
+        return iter(self._holidays)
+
+    # _indexDate: add a holiday to the week buckets and the sorted date order
+    #   holiday_obj: (Holiday) holiday that was just added
+    #   week_key: (tuple(int, int)) ISO year and ISO week of the holiday, if already known; default None
+    def _indexDate(self, holiday_obj, week_key=None):
+
+        # Bucket by ISO year and ISO week
+        if (week_key == None):
+            week_key = tuple(holiday_obj.date.isocalendar()[:2])
+        self._week_index.setdefault(week_key, []).append(holiday_obj)
+
+        # Appending in date order keeps the array sorted; otherwise re-sort on the next range query
+        key = (holiday_obj.date, holiday_obj.name)
+        if (not self._date_order_dirty and self._date_order and key < self._date_order[-1]):
+            self._date_order_dirty = True
+        self._date_order.append(key)
+
+    # _unindexDate: remove a holiday from the week buckets and the sorted date order
+    #   holiday_obj: (Holiday) holiday that is about to be removed
+    def _unindexDate(self, holiday_obj):
+
+        # Drop from its week bucket, and drop the bucket once empty
+        iso = holiday_obj.date.isocalendar()
+        bucket = self._week_index[(iso[0], iso[1])]
+        bucket.remove(holiday_obj)
+        if (not bucket):
+            del self._week_index[(iso[0], iso[1])]
+
+        # Drop from the sorted order; a dirty order is rebuilt from the main index anyway
+        if (not self._date_order_dirty):
+            key = (holiday_obj.date, holiday_obj.name)
+            del self._date_order[bisect.bisect_left(self._date_order, key)]
+
+# ColumnarStore: keeps holidays as columns of date ordinals and name IDs, bucketed by day
+class ColumnarStore:
+
+    # Docstring
+    """
+    ColumnarStore
+    --------
+    + names: NameTable
+    --------
+    __init__(names=SHARED_NAMES): None
+    add(holiday_obj): bool
+    addRow(name, ordinal): bool
+    addRows(rows): int
+    find(name, date): HolidayView
+    remove(name, date): bool
+    removeRows(rows): list(tuple(str, int))
+    week(year, week_number): list(HolidayView)
+    between(start, end): list(HolidayView)
+    records(date_format='%Y-%m-%d'): generator
+    rows(): generator
+    __len__(): int
+    __iter__(): iterator
+    """
+
+    # Initializer: takes in the name table to intern names into
+    def __init__(self, names=SHARED_NAMES):
+        self._names = names
+        self._ordinals = array('i') # date of each row as a proleptic Gregorian ordinal
+        self._name_ids = array('i') # name of each row as an ID in the name table
+        self._day_index = {} # ordinal -> rows on that day
+
+    # Name table getter
+    @property
+    def names(self):
+        return self._names
+
+    # add: add a holiday unless one with the same name and date is already stored
+    #   holiday_obj: (Holiday) holiday to add; only its name and date are kept
+    #   return: (bool) True if added; False if already stored
+    def add(self, holiday_obj):
+        return self.addRow(holiday_obj.name, holiday_obj.date.toordinal())
+
+    # addRow: add a holiday from its name and date ordinal
+    #   name: (str) name of the holiday
+    #   ordinal: (int) proleptic Gregorian ordinal of the date
+    #   return: (bool) True if added; False if already stored
+    def addRow(self, name, ordinal):
+
+        # Skip holidays that are already stored
+        name_id = self._names.intern(name)
+        if (self._findRow(name_id, ordinal) != -1):
+            return False
+
+        # Append row and bucket it by day
+        row = len(self._ordinals)
+        self._ordinals.append(ordinal)
+        self._name_ids.append(name_id)
+        bucket = self._day_index.get(ordinal)
+        if (bucket == None):
+            self._day_index[ordinal] = array('i', [row])
+        else:
+            bucket.append(row)
+        return True
+
+    # addRows: add a batch of holidays from their names and date ordinals
+    #   rows: (iterable(tuple(str, int))) (name, ordinal) pairs
+    #   return: (int) number of holidays added
+    def addRows(self, rows):
+        added = 0
+        for name, ordinal in rows:
+            if (self.addRow(name, ordinal)):
+                added += 1
+        return added
+
+    # find: look up a holiday by name and date
+    #   name: (str) name of the holiday
+    #   date: (datetime) date of the holiday
+    #   return: (HolidayView) holiday if found; None otherwise
+    def find(self, name, date):
+        name_id = self._names.lookup(name)
+        if (name_id == None):
+            return None
+        row = self._findRow(name_id, date.toordinal())
+        if (row == -1):
+            return None
+        return self._view(row)
+
+    # remove: remove a holiday by name and date
+    #   NOTE: the last row takes the removed row's place, so iteration order is not preserved
+    #   name: (str) name of the holiday
+    #   date: (datetime) date of the holiday
+    #   return: (bool) True if a holiday was removed; False otherwise
+    def remove(self, name, date):
+
+        # Find row of item
+        name_id = self._names.lookup(name)
+        if (name_id == None):
+            return False
+        ordinal = date.toordinal()
+        row = self._findRow(name_id, ordinal)
+        if (row == -1):
+            return False
+
+        # Drop row from its day bucket
+        bucket = self._day_index[ordinal]
+        bucket.remove(row)
+        if (not bucket):
+            del self._day_index[ordinal]
+
+        # Move the last row into the freed slot
+        last = len(self._ordinals) - 1
+        if (row != last):
+            last_ordinal = self._ordinals[last]
+            self._ordinals[row] = last_ordinal
+            self._name_ids[row] = self._name_ids[last]
+            last_bucket = self._day_index[last_ordinal]
+            last_bucket[last_bucket.index(last)] = row
+        self._ordinals.pop()
+        self._name_ids.pop()
+        return True
+
+    # removeRows: remove a batch of holidays by name and date ordinal
+    #   NOTE: row order is not preserved
+    #   rows: (iterable(tuple(str, int))) (name, ordinal) pairs
+    #   return: (list(tuple(str, int))) rows that were removed, in the order given
+    def removeRows(self, rows):
+        removed = []
+        gone = set()
+        for name, ordinal in dict.fromkeys(rows):
+            name_id = self._names.lookup(name)
+            if (name_id != None and self._findRow(name_id, ordinal) != -1):
+                removed.append((name, ordinal))
+                gone.add((name_id, ordinal))
+
+        # A few rows are moved out one at a time
+        if (len(removed) * COMPACT_SHARE < len(self._ordinals)):
+            for name, ordinal in removed:
+                self.remove(name, datetime.fromordinal(ordinal))
+            return removed
+
+        # Many rows: copy the rest into new columns and bucket them again
+        ordinals = array('i')
+        name_ids = array('i')
+        day_index = {}
+        for ordinal, name_id in zip(self._ordinals, self._name_ids):
+            if ((name_id, ordinal) in gone):
+                continue
+            bucket = day_index.get(ordinal)
+            if (bucket == None):
+                day_index[ordinal] = array('i', [len(ordinals)])
+            else:
+                bucket.append(len(ordinals))
+            ordinals.append(ordinal)
+            name_ids.append(name_id)
+        self._ordinals = ordinals
+        self._name_ids = name_ids
+        self._day_index = day_index
+        return removed
+
+    # week: get the holidays of an ISO week
+    #   year: (int) ISO year
+    #   week_number: (int) ISO week number
+    #   return: (list(HolidayView)) holidays in that week, sorted by date
+    def week(self, year, week_number):
+        try:
+            monday = date_cls.fromisocalendar(year, week_number, 1).toordinal()
+        except ValueError:
+            return []
+        return self._days(monday, monday + 7)
+
+    # between: get the holidays from a start date up to, but not including, an end date
+    #   start: (datetime) first date, inclusive
+    #   end: (datetime) last date, exclusive
+    #   return: (list(HolidayView)) holidays in that range, sorted by date
+    def between(self, start, end):
+        return self._days(start.toordinal(), end.toordinal())
+
+    # records: name and formatted date of every holiday, read straight from the columns
+    #   date_format: (str, def '%Y-%m-%d') format of the dates
+    #   return: (generator) (name, date_str) for each holiday
+    def records(self, date_format='%Y-%m-%d'):
+
+        # Each day is only formatted once
+        formatted = {}
+        names = self._names
+        for ordinal, name_id in zip(self._ordinals, self._name_ids):
+            date_str = formatted.get(ordinal)
+            if (date_str == None):
+                date_str = date_cls.fromordinal(ordinal).strftime(date_format)
+                formatted[ordinal] = date_str
+            yield (names[name_id], date_str)
+
+    # rows: name and date ordinal of every holiday, read straight from the columns
+    #   return: (generator) (name, ordinal) for each holiday
+    def rows(self):
+        names = self._names
+        for ordinal, name_id in zip(self._ordinals, self._name_ids):
+            yield (names[name_id], ordinal)
+
+    # Number of holidays
+    def __len__(self):
+        return len(self._ordinals)
+
+    # Iterate through holidays, making each view as it is reached
+    def __iter__(self):
+        for row in range(len(self._ordinals)):
+            yield self._view(row)
+
+    # _findRow: find the row holding a name on a day
+    #   name_id: (int) ID of the name
+    #   ordinal: (int) ordinal of the date
+    #   return: (int) row; -1 if not stored
+    def _findRow(self, name_id, ordinal):
+        for row in self._day_index.get(ordinal, ()):
+            if (self._name_ids[row] == name_id):
+                return row
+        return -1
+
+    # _days: get the holidays on a span of days
+    #   first: (int) ordinal of first day, inclusive
+    #   last: (int) ordinal of last day, exclusive
+    #   return: (list(HolidayView)) holidays on those days, sorted by date
+    def _days(self, first, last):
+
+        # Walk whichever is smaller: the days in the span or the days that have holidays
+        if (last - first <= len(self._day_index)):
+            days = range(first, last)
+        else:
+            days = sorted(ordinal for ordinal in self._day_index if first <= ordinal < last)
+
+        holidays = []
+        for ordinal in days:
+            for row in self._day_index.get(ordinal, ()):
+                holidays.append(self._view(row))
+        return holidays
+
+    # _view: make a holiday view for a row
+    #   row: (int) row in the columns
+    #   return: (HolidayView) view of the row
+    def _view(self, row):
+        return HolidayView(self._names[self._name_ids[row]], self._ordinals[row])
+
+# SnapshotStore: serves holidays from a memory-mapped snapshot, with later edits kept alongside it
+class SnapshotStore:
+
+    # Docstring
+    """
+    SnapshotStore
+    --------
+    + snapshot: persistence.Snapshot
+    --------
+    __init__(snapshot, names=SHARED_NAMES): None
+    add(holiday_obj): bool
+    addRow(name, ordinal): bool
+    addRows(rows): int
+    find(name, date): HolidayView
+    remove(name, date): bool
+    removeRows(rows): list(tuple(str, int))
+    week(year, week_number): list(HolidayView)
+    between(start, end): list(HolidayView)
+    records(date_format='%Y-%m-%d'): generator
+    rows(): generator
+    __len__(): int
+    __iter__(): iterator
+    """
+
+    # Initializer: takes in the snapshot to serve, and the name table for holidays added afterwards
+    def __init__(self, snapshot, names=SHARED_NAMES):
+        self._snapshot = snapshot
+        self._added = ColumnarStore(names) # holidays added since the snapshot was written
+        self._removed = set() # (name, ordinal) of snapshot holidays removed since
+
+    # Snapshot getter
+    @property
+    def snapshot(self):
+        return self._snapshot
+
+    # add: add a holiday unless one with the same name and date is already stored
+    #   holiday_obj: (Holiday) holiday to add; only its name and date are kept
+    #   return: (bool) True if added; False if already stored
+    def add(self, holiday_obj):
+        return self.addRow(holiday_obj.name, holiday_obj.date.toordinal())
+
+    # addRow: add a holiday from its name and date ordinal
+    #   name: (str) name of the holiday
+    #   ordinal: (int) proleptic Gregorian ordinal of the date
+    #   return: (bool) True if added; False if already stored
+    def addRow(self, name, ordinal):
+
+        # Holidays in the snapshot only need their removal undone
+        if (self._snapshot.find(name, ordinal)):
+            if ((name, ordinal) in self._removed):
+                self._removed.discard((name, ordinal))
+                return True
+            return False
+        return self._added.addRow(name, ordinal)
+
+    # addRows: add a batch of holidays from their names and date ordinals
+    #   rows: (iterable(tuple(str, int))) (name, ordinal) pairs
+    #   return: (int) number of holidays added
+    def addRows(self, rows):
+        added = 0
+        for name, ordinal in rows:
+            if (self.addRow(name, ordinal)):
+                added += 1
+        return added
+
+    # find: look up a holiday by name and date
+    #   name: (str) name of the holiday
+    #   date: (datetime) date of the holiday
+    #   return: (HolidayView) holiday if found; None otherwise
+    def find(self, name, date):
+        ordinal = date.toordinal()
+        if (self._snapshot.find(name, ordinal) and (name, ordinal) not in self._removed):
+            return HolidayView(name, ordinal)
+        return self._added.find(name, date)
+
+    # remove: remove a holiday by name and date
+    #   name: (str) name of the holiday
+    #   date: (datetime) date of the holiday
+    #   return: (bool) True if a holiday was removed; False otherwise
+    def remove(self, name, date):
+        ordinal = date.toordinal()
+        if (self._snapshot.find(name, ordinal)):
+            if ((name, ordinal) in self._removed):
+                return False
+            self._removed.add((name, ordinal))
+            return True
+        return self._added.remove(name, date)
+
+    # removeRows: remove a batch of holidays by name and date ordinal
+    #   rows: (iterable(tuple(str, int))) (name, ordinal) pairs
+    #   return: (list(tuple(str, int))) rows that were removed
+    def removeRows(self, rows):
+
+        # Snapshot holidays are only marked; holidays added since go through the columnar store in one batch
+        removed = []
+        added_rows = []
+        for name, ordinal in dict.fromkeys(rows):
+            if (not self._snapshot.find(name, ordinal)):
+                added_rows.append((name, ordinal))
+            elif ((name, ordinal) not in self._removed):
+                self._removed.add((name, ordinal))
+                removed.append((name, ordinal))
+        removed.extend(self._added.removeRows(added_rows))
+        return removed
+
+    # week: get the holidays of an ISO week
+    #   year: (int) ISO year
+    #   week_number: (int) ISO week number
+    #   return: (list(HolidayView)) holidays in that week, sorted by date
+    def week(self, year, week_number):
+        try:
+            monday = date_cls.fromisocalendar(year, week_number, 1).toordinal()
+        except ValueError:
+            return []
+        return self._days(monday, monday + 7)
+
+    # between: get the holidays from a start date up to, but not including, an end date
+    #   start: (datetime) first date, inclusive
+    #   end: (datetime) last date, exclusive
+    #   return: (list(HolidayView)) holidays in that range, sorted by date
+    def between(self, start, end):
+        return self._days(start.toordinal(), end.toordinal())
+
+    # records: name and formatted date of every holiday
+    #   date_format: (str, def '%Y-%m-%d') format of the dates
+    #   return: (generator) (name, date_str) for each holiday
+    def records(self, date_format='%Y-%m-%d'):
+        formatted = {}
+        for name, ordinal in self.rows():
+            date_str = formatted.get(ordinal)
+            if (date_str == None):
+                date_str = date_cls.fromordinal(ordinal).strftime(date_format)
+                formatted[ordinal] = date_str
+            yield (name, date_str)
+
+    # rows: name and date ordinal of every holiday
+    #   return: (generator) (name, ordinal) for each holiday
+    def rows(self):
+        for row in self._snapshot.rows():
+            if (row not in self._removed):
+                yield row
+        yield from self._added.rows()
+
+    # Number of holidays
+    def __len__(self):
+        return len(self._snapshot) - len(self._removed) + len(self._added)
+
+    # Iterate through holidays, making each view as it is reached
+    def __iter__(self):
+        for name, ordinal in self.rows():
+            yield HolidayView(name, ordinal)
+
+    # _days: get the holidays on a span of days
+    #   first: (int) ordinal of first day, inclusive
+    #   last: (int) ordinal of last day, exclusive
+    #   return: (list(HolidayView)) holidays on those days, sorted by date
+    def _days(self, first, last):
+        holidays = [HolidayView(name, ordinal) for name, ordinal in self._snapshot.days(first, last)
+            if (name, ordinal) not in self._removed]
+        holidays.extend(self._added._days(first, last))
+        holidays.sort(key=lambda holiday: holiday.ordinal)
+        return holidays
+
+# WeekView: read-only copy of a store split into ISO weeks; a change makes a new view instead of changing this one,
+#   so a reader holding a view never sees a half-made change and needs no lock
+class WeekView:
+
+    # Docstring
+    """
+    WeekView
+    --------
+    + version: int
+    --------
+    __init__(weeks, count, version): None
+    build(source, version): WeekView
+    changed(source, ordinals, version): WeekView
+    find(name, date): Holiday
+    week(year, week_number): list(Holiday)
+    between(start, end): list(Holiday)
+    __len__(): int
+    __iter__(): iterator
+    Getters: version
+    """
+
+    __slots__ = ('_years', '_count', '_version')
+
+    # Initializer: takes in ISO year -> {ISO week -> tuple of holidays sorted by date}, the number of holidays,
+    #   and the version of the list the view was made from
+    #   NOTE: weeks are grouped by year so a change only copies the weeks of the years it touches
+    def __init__(self, years, count, version):
+        self._years = years
+        self._count = count
+        self._version = version
+
+    # build: make a view of everything in a store
+    #   source: (store) store to copy, such as an ObjectStore
+    #   version: (int) version of the list the store belongs to
+    #   return: (WeekView) new view
+    @classmethod
+    def build(cls, source, version):
+
+        # Every store lists its rows in the same order it iterates its holidays, so the weeks line up
+        iso_years, iso_weeks = dates.iso_weeks([ordinal for name, ordinal in source.rows()])
+        years = {}
+        for holiday, year, week_number in zip(source, iso_years, iso_weeks):
+            years.setdefault(year, {}).setdefault(week_number, []).append(holiday)
+        for weeks in years.values():
+            for week_number, holidays in weeks.items():
+                weeks[week_number] = tuple(sorted(holidays, key=lambda holiday: holiday.date))
+        return cls(years, len(source), version)
+
+    # changed: make a view with the weeks of some days copied again from the store; every other week is shared
+    #   source: (store) store the changes were made to
+    #   ordinals: (iterable(int)) ordinals of the days that changed
+    #   version: (int) version of the list after the changes
+    #   return: (WeekView) new view
+    def changed(self, source, ordinals, version):
+        years = dict(self._years)
+        copied = set()
+        for year, week_number in {date_cls.fromordinal(ordinal).isocalendar()[:2] for ordinal in ordinals}:
+
+            # Copy each touched year once; untouched years stay shared with this view
+            if (year not in copied):
+                years[year] = dict(years.get(year, {}))
+                copied.add(year)
+            holidays = source.week(year, week_number)
+            if (holidays):
+                years[year][week_number] = tuple(holidays)
+            else:
+                years[year].pop(week_number, None)
+        return WeekView(years, len(source), version)
+
+    # Version getter
+    @property
+    def version(self):
+        return self._version
+
+    # find: look up a holiday by name and date
+    #   name: (str) name of the holiday
+    #   date: (datetime) date of the holiday
+    #   return: (Holiday) holiday if found; None otherwise
+    def find(self, name, date):
+        iso = date.isocalendar()
+        for holiday in self._years.get(iso[0], {}).get(iso[1], ()):
+            if (holiday.name == name and holiday.date == date):
+                return holiday
+        return None
+
+    # week: get the holidays of an ISO week
+    #   year: (int) ISO year
+    #   week_number: (int) ISO week number
+    #   return: (list(Holiday)) holidays in that week, sorted by date
+    def week(self, year, week_number):
+        return list(self._years.get(year, {}).get(week_number, ()))
+
+    # between: get the holidays from a start date up to, but not including, an end date
+    #   start: (datetime) first date, inclusive
+    #   end: (datetime) last date, exclusive
+    #   return: (list(Holiday)) holidays in that range, sorted by date
+    def between(self, start, end):
+
+        # Walk only the weeks that have holidays, from the one holding start to the one holding the day before end,
+        #   so a range of thousands of years costs no more than the weeks the list fills
+        holidays = []
+        if (start >= end):
+            return holidays
+        first = start.isocalendar()[:2]
+        last = date_cls.fromordinal(end.toordinal() - 1).isocalendar()[:2]
+        for year in sorted(year for year in self._years if first[0] <= year <= last[0]):
+            weeks = self._years[year]
+            for week_number in sorted(weeks):
+                if (first <= (year, week_number) <= last):
+                    holidays.extend(holiday for holiday in weeks[week_number] if start <= holiday.date < end)
+        return holidays
+
+    # Number of holidays
+    def __len__(self):
+        return self._count
+
+    # Iterate through holidays, week by week
+    def __iter__(self):
+        for year in sorted(self._years):
+            weeks = self._years[year]
+            for week_number in sorted(weeks):
+                yield from weeks[week_number]
+
+# Storage engines by name
+ENGINES = {'objects': ObjectStore, 'columnar': ColumnarStore}
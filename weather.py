@@ -0,0 +1,397 @@
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import datetime as dt
+import sqlite3
+import sys
+import threading
+import time
+
+import scraper
+
+# Location: place to get weather for; query is used by the forecast API, lat and lon by the historical API
+Location = namedtuple('Location', ['query', 'lat', 'lon'])
+
+# Default location of the weather lookups
+MINNEAPOLIS = Location('minneapolis,us', '44.986656', '-93.2650')
+
+# Seconds a forecast, or today's weather, is kept before it is asked for again
+FORECAST_TTL = 10 * 60
+
+# Historical data only goes this many days back, counting today
+PAST_DAYS = 5
+
+# Forecast data only goes this many days ahead
+FORECAST_DAYS = 16
+
+# _midnight: get the start of a day
+#   day: (datetime) any time on the day; None for today
+#   return: (datetime) midnight at the start of the day
+def _midnight(day=None):
+    if (day == None):
+        day = datetime.today()
+    return datetime(day.year, day.month, day.day)
+
+# is_available: check whether the APIs have weather for a day
+#   day: (datetime) midnight of the day
+#   today: (datetime) midnight of today
+#   return: (bool) True for the last few days and the forecast days
+def is_available(day, today):
+    return -PAST_DAYS < (day - today).days <= FORECAST_DAYS
+
+# WeatherError: raised when the weather API cannot give an answer
+class WeatherError(Exception):
+    pass
+
+# TokenBucket: rate limiter that lets calls through at a steady rate, with bursts up to a capacity
+class TokenBucket:
+
+    # Docstring
+    """
+    TokenBucket
+    --------
+    + rate: float
+    + capacity: int
+    --------
+    __init__(rate, capacity): None
+    acquire(): None
+    """
+
+    # Initializer: takes in tokens added per second and the most tokens that can build up
+    def __init__(self, rate, capacity):
+        self._rate = rate
+        self._capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    # Rate getter
+    @property
+    def rate(self):
+        return self._rate
+
+    # Capacity getter
+    @property
+    def capacity(self):
+        return self._capacity
+
+    # acquire: take a token, waiting until one is available
+    def acquire(self):
+        while (True):
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+                self._updated = now
+                if (self._tokens >= 1):
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self._rate
+            time.sleep(wait)
+
+# WeatherProvider: gets daily weather from the forecast and historical APIs, with caching and rate limiting
+class WeatherProvider:
+
+    # Docstring
+    """
+    WeatherProvider
+    --------
+    + stats: dict
+    --------
+    __init__(future_url, past_url, headers, workers=5, rate=1.0, burst=5, forecast_ttl=FORECAST_TTL, timeout=10): None
+    week(location=MINNEAPOLIS, today=None): dict
+    days(location, days, today=None): dict
+    """
+
+    # Initializer: takes in the API URLs and headers, and how hard the APIs may be called
+    #   future_url: (str) forecast API URL
+    #   past_url: (str) historical API URL
+    #   headers: (dict) headers sent with every call, such as API keys
+    #   workers: (int) historical days asked for at the same time
+    #   rate: (float) calls per second allowed by the API quota
+    #   burst: (int) calls that may be made at once before the rate applies
+    #   forecast_ttl: (float) seconds a forecast, or today's weather, is kept
+    #   timeout: (float) seconds to wait on each call
+    def __init__(self, future_url, past_url, headers, workers=5, rate=1.0, burst=5, forecast_ttl=FORECAST_TTL, timeout=10):
+        self._future_url = future_url
+        self._past_url = past_url
+        self._headers = headers
+        self._workers = workers
+        self._forecast_ttl = forecast_ttl
+        self._timeout = timeout
+        self._bucket = TokenBucket(rate, burst)
+        self._session = scraper.make_session(pool_size=workers)
+        self._cache = {} # (location, 'YYYY-MM-DD') -> (weather, expiry time or None to keep forever)
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'calls': 0}
+
+    # Counters getter: days served from the cache and calls made to the APIs
+    @property
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+    # week: get the weather for each day of the week containing today
+    #   NOTE: days with no data, such as more than 5 days back, are 'n/a'
+    #   location: (Location) place to get weather for; default Minneapolis
+    #   today: (datetime) day to treat as today; default now
+    #   return: (dict) 'YYYY-MM-DD' -> weather for Monday through Sunday
+    def week(self, location=MINNEAPOLIS, today=None):
+
+        # Lay out the days of the week
+        today = _midnight(today)
+        days = [today + dt.timedelta(days=i - today.weekday()) for i in range(7)]
+        weather = {day.strftime('%Y-%m-%d'): 'n/a' for day in days}
+        weather.update(self.days(location, days, today))
+        return weather
+
+    # days: get the weather for any days the APIs have data for
+    #   location: (Location) place to get weather for
+    #   days: (list(datetime)) days to get
+    #   today: (datetime) day to treat as today; default now
+    #   return: (dict) 'YYYY-MM-DD' -> weather; days with no data are left out
+    def days(self, location, days, today=None):
+
+        # Serve whatever is still fresh from the cache
+        today = _midnight(today)
+        weather = {}
+        missing = []
+        for day in days:
+            cached = self._cached(location, day.strftime('%Y-%m-%d'))
+            if (cached != None):
+                weather[day.strftime('%Y-%m-%d')] = cached
+            elif (is_available(day, today)):
+                missing.append(day)
+
+        # Forecast comes back in one call; each past day needs its own call, so make those at the same time
+        future = [day for day in missing if day > today]
+        past = [day for day in missing if day <= today]
+        with ThreadPoolExecutor(max_workers=max(self._workers, 1)) as pool:
+            forecast = pool.submit(self._forecast, location, today, future) if future else None
+            for day, day_weather in zip(past, pool.map(lambda day: self._past(location, day, today), past)):
+                weather[day.strftime('%Y-%m-%d')] = day_weather
+            if (forecast != None):
+                weather.update(forecast.result())
+
+        return weather
+
+    # _forecast: get forecast weather for days after today
+    #   location: (Location) place to get weather for
+    #   today: (datetime) day to treat as today
+    #   days: (list(datetime)) days after today to fill in
+    #   return: (dict) 'YYYY-MM-DD' -> weather
+    def _forecast(self, location, today, days):
+        count = (max(days) - today).days
+        data = self._call(self._future_url, {"q": location.query, "cnt": f'{count}', "units": "imperial"})
+        try:
+            forecast = data['list']
+            weather = {}
+            for day in days:
+                day_str = day.strftime('%Y-%m-%d')
+                weather[day_str] = forecast[(day - today).days - 1]['weather'][0]['main']
+                self._store(location, day_str, weather[day_str], time.time() + self._forecast_ttl)
+            return weather
+        except (KeyError, IndexError, TypeError):
+            raise WeatherError('Weather API sent a forecast that could not be read!')
+
+    # _past: get historical weather for today or an earlier day
+    #   location: (Location) place to get weather for
+    #   day: (datetime) day to get
+    #   today: (datetime) day to treat as today
+    #   return: (str) weather
+    def _past(self, location, day, today):
+
+        # Ask for the same time of day as now, like the API's current conditions
+        now = datetime.now()
+        moment = day.replace(hour=now.hour, minute=now.minute, second=now.second)
+        data = self._call(self._past_url, {"lat": location.lat, "lon": location.lon, "dt": f'{int(moment.timestamp())}'})
+        try:
+            day_weather = data['current']['weather'][0]['main']
+        except (KeyError, IndexError, TypeError):
+            raise WeatherError('Weather API sent historical data that could not be read!')
+
+        # Past days never change; today's weather still can
+        expires = time.time() + self._forecast_ttl if day >= today else None
+        self._store(location, day.strftime('%Y-%m-%d'), day_weather, expires)
+        return day_weather
+
+    # _call: make one rate-limited API call
+    #   url: (str) API URL
+    #   params: (dict) query parameters
+    #   return: (dict) decoded JSON response
+    def _call(self, url, params):
+        import requests # slow to import, so only once a call is made
+        self._bucket.acquire()
+        with self._lock:
+            self._stats['calls'] += 1
+        try:
+            response = self._session.get(url, headers=self._headers, params=params, timeout=self._timeout)
+        except requests.RequestException:
+            raise WeatherError('Could not connect to Weather API! Please check your connection!')
+        if (response.status_code == 429):
+            raise WeatherError('Ran out of queries to Weather API!')
+        if (response.status_code != 200):
+            raise WeatherError(f'Weather API returned an error ({response.status_code})!')
+        try:
+            return response.json()
+        except ValueError:
+            raise WeatherError('Weather API sent a response that could not be read!')
+
+    # _cached: look up a day in the cache
+    #   location: (Location) place of the weather
+    #   day_str: (str) day formatted as '%Y-%m-%d'
+    #   return: (str) weather if cached and fresh; None otherwise
+    def _cached(self, location, day_str):
+        with self._lock:
+            entry = self._cache.get((location, day_str))
+            if (entry == None or (entry[1] != None and entry[1] < time.time())):
+                return None
+            self._stats['hits'] += 1
+            return entry[0]
+
+    # _store: put a day in the cache
+    #   location: (Location) place of the weather
+    #   day_str: (str) day formatted as '%Y-%m-%d'
+    #   day_weather: (str) weather
+    #   expires: (float) time the entry expires; None to keep it forever
+    def _store(self, location, day_str, day_weather, expires):
+        with self._lock:
+            self._cache[(location, day_str)] = (day_weather, expires)
+
+# WeatherStore: local table of daily weather keyed by (location, day), so views never wait on the APIs
+class WeatherStore:
+
+    # Docstring
+    """
+    WeatherStore
+    --------
+    + db_loc: str
+    --------
+    __init__(db_loc=':memory:'): None
+    putMany(rows): None
+    lookup(location, first, last): dict
+    close(): None
+    """
+
+    # Initializer: takes in the location of the database file; ':memory:' keeps it in memory only
+    def __init__(self, db_loc=':memory:'):
+        self._db_loc = db_loc
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(db_loc, check_same_thread=False)
+        self._db.execute('CREATE TABLE IF NOT EXISTS weather (location TEXT NOT NULL, day TEXT NOT NULL, weather TEXT NOT NULL, '
+            'kind TEXT NOT NULL, fetched REAL NOT NULL, PRIMARY KEY (location, day)) WITHOUT ROWID')
+        self._db.commit()
+
+    # Database location getter
+    @property
+    def db_loc(self):
+        return self._db_loc
+
+    # putMany: save a batch of days; observed weather is never replaced by a forecast
+    #   rows: (iterable(tuple(str, str, str, str))) (location query, 'YYYY-MM-DD', weather, 'observed' or 'forecast')
+    def putMany(self, rows):
+        now = time.time()
+        with self._lock:
+            self._db.executemany('INSERT INTO weather VALUES (?, ?, ?, ?, ?) ON CONFLICT (location, day) DO UPDATE SET '
+                'weather = excluded.weather, kind = excluded.kind, fetched = excluded.fetched '
+                "WHERE weather.kind = 'forecast' OR excluded.kind = 'observed'",
+                [(location, day, day_weather, kind, now) for location, day, day_weather, kind in rows])
+            self._db.commit()
+
+    # lookup: get the saved weather for a span of days
+    #   location: (Location) place of the weather
+    #   first: (str) first day, inclusive, formatted as '%Y-%m-%d'
+    #   last: (str) last day, inclusive, formatted as '%Y-%m-%d'
+    #   return: (dict) 'YYYY-MM-DD' -> weather for the days that are saved
+    def lookup(self, location, first, last):
+        with self._lock:
+            return dict(self._db.execute('SELECT day, weather FROM weather WHERE location = ? AND day BETWEEN ? AND ?',
+                (location.query, first, last)))
+
+    # close: close the database
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+# fetch_into: get weather for days from the APIs and save it in a store
+#   provider: (WeatherProvider) where weather comes from
+#   store: (WeatherStore) where weather is saved
+#   location: (Location) place to get weather for
+#   days: (list(datetime)) days to get
+#   today: (datetime) day to treat as today; default now
+#   return: (dict) 'YYYY-MM-DD' -> weather for the days the APIs had
+def fetch_into(provider, store, location, days, today=None):
+    today = _midnight(today)
+    weather = provider.days(location, days, today)
+    today_str = today.strftime('%Y-%m-%d')
+    store.putMany([(location.query, day, day_weather, 'observed' if day < today_str else 'forecast')
+        for day, day_weather in weather.items()])
+    return weather
+
+# WeatherPrefetcher: background thread that keeps a weather store filled with recent observations and forecasts
+class WeatherPrefetcher:
+
+    # Docstring
+    """
+    WeatherPrefetcher
+    --------
+    + last_error: WeatherError
+    --------
+    __init__(provider, store, locations=(MINNEAPOLIS,), interval=FORECAST_TTL): None
+    refresh(): int
+    start(): None
+    stop(): None
+    """
+
+    # Initializer: takes in where weather comes from, where it goes, which places to keep, and how often
+    #   interval: (float) seconds between refreshes
+    def __init__(self, provider, store, locations=(MINNEAPOLIS,), interval=FORECAST_TTL):
+        self._provider = provider
+        self._store = store
+        self._locations = list(locations)
+        self._interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+        self._last_error = None
+
+    # Last error getter: the error from the last refresh, or None if it worked
+    @property
+    def last_error(self):
+        return self._last_error
+
+    # refresh: load every available day for every location into the store
+    #   return: (int) number of days saved
+    def refresh(self):
+        today = _midnight()
+        days = [today + dt.timedelta(days=i) for i in range(1 - PAST_DAYS, FORECAST_DAYS + 1)]
+        saved = 0
+        self._last_error = None
+        for location in self._locations:
+            try:
+                saved += len(fetch_into(self._provider, self._store, location, days, today))
+            except WeatherError as e:
+                self._last_error = e
+        return saved
+
+    # start: refresh now and then every interval, in a background thread
+    def start(self):
+        if (self._thread != None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    # stop: stop the background thread
+    def stop(self):
+        self._stop.set()
+        if (self._thread != None):
+            self._thread.join()
+
+    # _run: refresh until stopped
+    #   NOTE: an unexpected error is printed and the next refresh tried as usual, so one bad refresh doesn't end the thread
+    def _run(self):
+        while (not self._stop.is_set()):
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f'Weather refresh failed: {e!r}', file=sys.stderr)
+            self._stop.wait(self._interval)